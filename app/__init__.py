@@ -10,7 +10,11 @@ from flask import Flask
 from sqlalchemy import create_engine
 import json
 
+from app.json_provider import OrjsonProvider
 from data_management.data_state import DataState
+from data_management.response_cache import ResponseCache
+from data_management.upload_jobs import UploadJobs
+from detectors.result_cache import DetectorResultCache
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 # from data_management.data_integration import *
 
@@ -73,6 +77,8 @@ def load_database_info():
 load_dotenv()
 
 app = Flask(__name__)
+#encodes the numpy and pandas values the endpoints return, see json_provider
+app.json = OrjsonProvider(app)
 #sets the URL to the DB url specified for the local postgresql db on my local machine specified in .env
 
 host, port, user, password, db_name = load_database_info()
@@ -83,6 +89,12 @@ connection = psycopg2.connect(host=host, port=port, user=user, password=password
 create_database_if_not_exists(connection, db_name)
 
 data_state_manager = DataState()
+#results of the detectors per column, reused for the columns a wrangle or a new upload did not change
+detector_cache = DetectorResultCache()
+#responses of the plot and summary endpoints per state of the session, see cached_views
+response_cache = ResponseCache()
+#uploads running in the background, see /api/upload-status
+upload_jobs = UploadJobs()
 
 #engine to use pandas with the db
 engine = create_engine(f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db_name}")
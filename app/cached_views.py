@@ -0,0 +1,50 @@
+#Buckaroo Project - October 18, 2026
+#This file lets the plot and summary endpoints serve the responses they already made for the same state and parameters
+
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from app import data_state_manager, response_cache
+
+
+def response_key():
+    """:return: the cache key of the request, (dataset, state version, endpoint, parameters in any order)"""
+    return (data_state_manager.dataset, data_state_manager.current_state_version(), request.path,
+            tuple(sorted(request.args.items(multi=True))))
+
+class CachedResponse(Response):
+    """a response held in response_cache, only the successful responses are cached so it is one too"""
+
+def succeeded(result):
+    """
+    the failures are answered with Success or success false, they are neither cached nor tagged
+    :param result: what an endpoint returned, a dictionary or a CachedResponse, read before it is encoded
+    """
+    if isinstance(result, CachedResponse):
+        return True
+    return isinstance(result, dict) and result.get("Success", result.get("success")) is True
+
+def cached_view(view):
+    """
+    Wraps an endpoint reading the tables of the wrangling session so a request it answered before for the same state is
+    served from response_cache
+    :param view: the endpoint function
+    :return: the wrapped endpoint
+    """
+    @wraps(view)
+    def cached(*args, **kwargs):
+        key = response_key()
+        found = response_cache.get(key)
+        if found is not None:
+            body, mimetype = found
+            return CachedResponse(body, mimetype=mimetype)
+        result = view(*args, **kwargs)
+        success = succeeded(result)
+        response = make_response(result)
+        if response.status_code == 200 and success:
+            body = response.get_data()
+            response_cache.put(key, body, response.mimetype)
+            return CachedResponse(body, mimetype=response.mimetype)
+        return response
+    return cached
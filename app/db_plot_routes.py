@@ -5,6 +5,7 @@ from flask import request
 
 from app import app, engine
 from app.service_helpers import group_by_attribute, clean_table_name
+from app.state_etags import stored_table_etag
 from data_management.data_attribute_summary_integration import *
 from data_management.data_integration import *
 from data_management.data_scatterplot_integration import generate_scatterplot_sample_data
@@ -14,6 +15,7 @@ from data_management.data_scatterplot_integration import generate_scatterplot_sa
 
 
 @app.get("/api/plots/1-d-histogram-data-db")
+@stored_table_etag
 def get_1d_histogram_db():
     """
     Endpoint to return data to be used to construct the 1d histogram in the view, this endpoint expects the following parameters:
@@ -39,6 +41,7 @@ def get_1d_histogram_db():
         return {"Success": False, "Error": str(e)}
 
 @app.get("/api/plots/2-d-histogram-data-db")
+@stored_table_etag
 def get_2d_histogram_db():
     """
     Endpoint to return data to be used to construct the 1d histogram in the view, this endpoint expects the following parameters:
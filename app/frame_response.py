@@ -0,0 +1,73 @@
+#Buckaroo Project - October 18, 2026
+#This file helps the endpoints send tables in the format the view asks for
+
+import json
+
+import pyarrow as pa
+from flask import Response, jsonify, request
+
+arrow_stream_type = "application/vnd.apache.arrow.stream"
+# ?format=columns sends one array per column instead of one object per row
+columns_format = "columns"
+
+
+def response_format():
+    """
+    :return: "arrow" when the request's Accept header prefers the arrow IPC stream, "columns" for ?format=columns,
+    "records" otherwise, the format every endpoint answered with before
+    """
+    if request.accept_mimetypes.best_match(["application/json", arrow_stream_type]) == arrow_stream_type:
+        return "arrow"
+    if request.args.get("format") == columns_format:
+        return "columns"
+    return "records"
+
+def column_lists(data_frame):
+    """
+    :return: dictionary of structure { column: values }, the numeric columns are sent as their arrays which the json
+    provider encodes without making python values, NaN as null
+    """
+    return {str(column): data_frame[column].to_numpy() if data_frame[column].dtype.kind in "biuf"
+            else data_frame[column].tolist() for column in data_frame.columns}
+
+def arrow_column(values):
+    """the column as arrow, the numeric columns share their buffer, a column mixing types is sent as text"""
+    try:
+        return pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array(values.astype(object).where(values.isna(), values.astype(str)), from_pandas=True)
+
+def arrow_stream(data_frame, metadata=None):
+    """
+    :param metadata: json serializable fields sent along with the table in the metadata of its schema, under "buckaroo"
+    :return: the bytes of the table in the arrow IPC stream format
+    """
+    table = pa.Table.from_arrays([arrow_column(data_frame[column]) for column in data_frame.columns],
+                                 names=[str(column) for column in data_frame.columns])
+    if metadata:
+        table = table.replace_schema_metadata({"buckaroo": json.dumps(metadata)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def frame_response(data_frame, records, key=None, **fields):
+    """
+    Answers with a table in the format the request asks for, see response_format
+    :param data_frame: the table to send
+    :param records: makes the records the endpoint sends by default from the table
+    :param key: the field of the json response holding the table, None when the table is the whole response
+    :param fields: the other fields of the json response, sent in the schema metadata of an arrow response
+    :return: the flask response
+    """
+    chosen_format = response_format()
+    if chosen_format == "arrow":
+        response = Response(arrow_stream(data_frame, fields), mimetype=arrow_stream_type)
+    else:
+        table = column_lists(data_frame) if chosen_format == "columns" else records(data_frame)
+        response = jsonify(table if key is None else {**fields, key: table})
+    response.vary.add("Accept")
+    return response
+
+def plain_records(data_frame):
+    return data_frame.to_dict("records")
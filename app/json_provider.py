@@ -0,0 +1,69 @@
+#Buckaroo Project - October 18, 2026
+#This file lets the endpoints return numpy and pandas values as they are, orjson encodes them in one pass
+
+import datetime
+
+import numpy as np
+import orjson
+import pandas as pd
+from flask.json.provider import DefaultJSONProvider
+
+# numpy arrays and scalars are encoded natively, NaN and infinity as null, int keys like the row ids as strings
+orjson_options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def encode_value(value):
+    """
+    Called by orjson for the values it does not encode natively
+    :param value: the value to encode
+    :return: a value orjson encodes
+    """
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, pd.Interval):
+        return {"x0": value.left, "x1": value.right}
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict("records")
+    if isinstance(value, (pd.Series, pd.Index, pd.Categorical)):
+        return value.tolist()
+    # orjson only encodes the numeric arrays laid out in C order, a column of a dataframe is often a strided view
+    if isinstance(value, np.ndarray) and value.dtype.kind in "biuf" and not value.flags.c_contiguous:
+        return np.ascontiguousarray(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def plain_keys(value):
+    """the value with its numpy dictionary keys made python ones, which OPT_NON_STR_KEYS does not take"""
+    if isinstance(value, dict):
+        return {key.item() if isinstance(key, np.generic) else key: plain_keys(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain_keys(item) for item in value]
+    return value
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    The flask json provider of the app, keeps the settings of the default provider (sort_keys, the indent of a debug
+    response) and encodes with orjson
+    """
+    def dumps(self, obj, **kwargs):
+        options = orjson_options
+        if kwargs.get("sort_keys", self.sort_keys):
+            options |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            options |= orjson.OPT_INDENT_2
+        try:
+            encoded = orjson.dumps(obj, default=encode_value, option=options)
+        except orjson.JSONEncodeError:
+            encoded = orjson.dumps(plain_keys(obj), default=encode_value, option=options)
+        return encoded.decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
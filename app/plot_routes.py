@@ -3,8 +3,11 @@
 
 from flask import request
 
-from app import app
-from app.service_helpers import group_by_attribute
+from app import app, response_cache
+from app.cached_views import cached_view
+from app.frame_response import frame_response, plain_records
+from app.service_helpers import group_by_attribute, get_column_profile
+from app.state_etags import state_etag
 from data_management.data_attribute_summary_integration import *
 from data_management.data_integration import *
 from data_management.data_scatterplot_integration import generate_scatterplot_sample_data
@@ -14,6 +17,8 @@ from data_management.data_scatterplot_integration import generate_scatterplot_sa
 
 
 @app.get("/api/plots/1-d-histogram-data")
+@state_etag
+@cached_view
 def get_1d_histogram():
     """
     Endpoint to return data to be used to construct the 1d histogram in the view, this endpoint expects the following parameters:
@@ -37,6 +42,8 @@ def get_1d_histogram():
 
 
 @app.get("/api/plots/2-d-histogram-data")
+@state_etag
+@cached_view
 def get_2d_histogram():
     """
     Endpoint to return data to be used to construct the 1d histogram in the view - user will pass in parameters for the axis that is filled in
@@ -56,6 +63,8 @@ def get_2d_histogram():
         return {"Success": False, "Error": str(e)}
 
 @app.get("/api/plots/scatterplot")
+@state_etag
+@cached_view
 def get_scatterplot_data():
     x_column_name = request.args.get("x_column")
     y_column_name = request.args.get("y_column")
@@ -72,6 +81,8 @@ def get_scatterplot_data():
 
 
 @app.get("/api/plots/group-by")
+@state_etag
+@cached_view
 def get_group_by():
     """
     Endpoint to return the data according to the specified column the user wishes to group by a specific attribute - ex. group ages by continent
@@ -79,11 +90,13 @@ def get_group_by():
     """
     column_a_name = request.args.get("column_a")
     group_by_name = request.args.get("group_by")
-    df = data_state_manager.get_current_state()["df"]
+    current_state = data_state_manager.get_current_state()
+    df = current_state["df"]
     column_a = df[column_a_name]
     group_by = df[group_by_name]
     try:
-        if is_categorical(column_a) and is_categorical(group_by):
+        if is_categorical(column_a, get_column_profile(current_state, column_a_name)) and \
+                is_categorical(group_by, get_column_profile(current_state, group_by_name)):
             new_df = group_by_attribute(df, column_a_name, group_by_name).to_json()
             return {"Success": True, "group_by": new_df}
         return {"Success": False, "Error": "Both column input to the group_by are not categorical"}
@@ -101,9 +114,7 @@ def undo():
         data_state_manager.undo()
         # the current state dictionary made up of {"df":wrangled_df,"error_df":new_error_df}
         print(data_state_manager.get_current_state())
-        current_df = data_state_manager.get_current_state()["df"].to_dict("records")
-        # print(current_df)
-        return {"success": True, "df": current_df}
+        return frame_response(data_state_manager.get_current_state()["df"], plain_records, key="df", success=True)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -119,14 +130,14 @@ def redo():
         data_state_manager.redo()
         # the current state dictionary made up of {"df":wrangled_df,"error_df":new_error_df}
         print(data_state_manager.get_current_state())
-        current_df = data_state_manager.get_current_state()["df"].to_dict("records")
-        # print(current_df)
-        return {"success": True, "df": current_df}
+        return frame_response(data_state_manager.get_current_state()["df"], plain_records, key="df", success=True)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
 @app.get("/api/plots/summaries")
+@state_etag
+@cached_view
 def attribute_summaries():
     """
     Populates the error attribute summaries
@@ -143,4 +154,9 @@ def attribute_summaries():
         return {"success": False, "error": str(e)}
 
 
-
+@app.get("/api/plots/cache-statistics")
+def cache_statistics():
+    """
+    :return: the entries, bytes, hits and misses of the cache of the plot and summary responses
+    """
+    return {"success": True, "data": response_cache.statistics()}
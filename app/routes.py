@@ -2,17 +2,29 @@
 #This file handles all endpoints from the front-end
 
 
-import numpy as np
+import os
+import tempfile
+
 import pandas as pd
 from flask import request, render_template
 
 from app import app
 from app import connection, engine
-from app.service_helpers import clean_table_name, get_whole_table_query, run_detectors, create_error_dict, \
-    init_session_data_state, fetch_detected_and_undetected_current_dataset_from_db
-from app import data_state_manager
+from app.service_helpers import clean_table_name, run_detectors_with_timings, create_error_dict, \
+    get_errors_in_range_query, init_session_data_state, uploaded_file_size, store_csv_in_chunks, start_dataset_session
+from app import data_state_manager, upload_jobs
+from app.frame_response import frame_response, plain_records
 from app.set_id_column import set_id_column
+from data_management.bulk_load import bulk_load
+from data_management.file_formats import file_format, read_upload
+from data_management.row_window import default_window_rows, fetch_row_window
+from data_management.schema_inference import infer_schema
+from data_management.table_layout import organize_table
+from detectors.in_database import run_sql_detectors
 
+# files larger than this are streamed through the detectors in blocks instead of being loaded whole, ?mode=stream
+# streams files of any size and ?mode=async streams them in a background job
+chunked_upload_bytes = 256 * 1024 * 1024
 
 @app.post("/api/upload")
 def upload_csv():
@@ -22,27 +34,114 @@ def upload_csv():
     """
     #get the file path from the DataFrame object sent by the user's upload in the view
     csv_file = request.files['file']
+    # the blocks of a plain csv can be streamed, the other formats are read whole
+    plain_csv = file_format(csv_file.stream) == "csv"
+    if plain_csv and request.args.get("mode") == "async":
+        return start_upload_job(csv_file)
+    if plain_csv and (request.args.get("mode") == "stream" or uploaded_file_size(csv_file.stream) > chunked_upload_bytes):
+        return upload_large_csv(csv_file)
 
-    #parse the file into a csv using pandas
-    dataframe = pd.read_csv(csv_file)
+    #parse the file into a dataframe, csv (plain, gzip or zstd), parquet and feather/arrow are detected from its bytes
+    dataframe = read_upload(csv_file.stream)
+    # ?detection=database runs the detectors inside postgres on the stored table instead of in pandas
+    if request.args.get("detection") == "database":
+        return upload_with_database_detection(dataframe, csv_file.filename)
 
     # run the detectors on the uploaded file for the starting data state
     table_with_id_added = set_id_column(dataframe)
-    detected_data = run_detectors(dataframe)
+    detected_data, detector_timings = run_detectors_with_timings(table_with_id_added, has_id_column=True)
     cleaned_table_name = clean_table_name(csv_file.filename)
 
     try:
         #insert the undetected dataframe
-        rows_inserted = table_with_id_added.to_sql(cleaned_table_name, engine, if_exists='replace')
-        detected_rows_inserted = detected_data.to_sql("errors"+cleaned_table_name, engine, if_exists='replace')
-        return{"success": True, "rows for undetected data": rows_inserted, "rows_for_detected": detected_rows_inserted}
+        table_load = bulk_load(engine, cleaned_table_name, table_with_id_added,
+                               schema=infer_schema(table_with_id_added))
+        error_load = bulk_load(engine, "errors"+cleaned_table_name, detected_data.to_dataframe())
+        layout = organize_table(engine, cleaned_table_name, table_load["rows"], cluster=cluster_requested())
+        return{"success": True, "rows for undetected data": table_load["rows"], "rows_for_detected": error_load["rows"],
+               "detector_timings": detector_timings, "load": {"table": table_load, "errors": error_load},
+               "layout": layout}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+def upload_with_database_detection(dataframe, filename):
+    """
+    Stores the table first, then fills its error table with the detectors installed in the database
+    :return: whether it was completed successfully
+    """
+    table_with_id_added = set_id_column(dataframe)
+    cleaned_table_name = clean_table_name(filename)
+    try:
+        table_load = bulk_load(engine, cleaned_table_name, table_with_id_added,
+                               schema=infer_schema(table_with_id_added))
+        detected_rows_inserted = run_sql_detectors(engine, cleaned_table_name)
+        layout = organize_table(engine, cleaned_table_name, table_load["rows"], cluster=cluster_requested())
+        return{"success": True, "rows for undetected data": table_load["rows"], "rows_for_detected": detected_rows_inserted,
+               "load": {"table": table_load}, "layout": layout}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def upload_large_csv(csv_file):
+    """
+    Handles an upload too large to load at once. The multipart body was already read in chunks into a temporary file by
+    the request parser, which keeps uploads past a few hundred kilobytes on disk, the file is then read in blocks that
+    each get their ID range, are copied to the database and flagged, with their errors copied as they are found
+    :return: whether it was completed successfully
+    """
+    cleaned_table_name = clean_table_name(csv_file.filename)
+    try:
+        table_load, error_load = store_csv_in_chunks(csv_file.stream, cleaned_table_name, engine)
+        layout = organize_table(engine, cleaned_table_name, table_load["rows"], cluster=cluster_requested())
+        return{"success": True, "rows for undetected data": table_load["rows"], "rows_for_detected": error_load["rows"],
+               "load": {"table": table_load, "errors": error_load}, "layout": layout}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+def start_upload_job(csv_file):
+    """
+    Saves the upload to a temporary file, the request's copy is gone once it returns, and streams it into the
+    database on a background worker
+    :return: the id of the job to poll /api/upload-status with
+    """
+    cleaned_table_name = clean_table_name(csv_file.filename)
+    cluster = cluster_requested()
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as saved_file:
+        csv_file.save(saved_file)
+
+    def run_upload(job):
+        try:
+            with open(saved_file.name, "rb") as f:
+                table_load, error_load = store_csv_in_chunks(f, cleaned_table_name, engine, on_progress=job.update)
+            layout = organize_table(engine, cleaned_table_name, table_load["rows"], cluster=cluster)
+            return {"rows for undetected data": table_load["rows"], "rows_for_detected": error_load["rows"],
+                    "load": {"table": table_load, "errors": error_load}, "layout": layout}
+        finally:
+            os.remove(saved_file.name)
+
+    job = upload_jobs.submit(csv_file.filename, run_upload)
+    return {"success": True, "job_id": job.job_id}
+
+def cluster_requested():
+    """:return: whether the upload asked for its table to be clustered by ID with ?cluster=true, see organize_table"""
+    return request.args.get("cluster", "false").lower() == "true"
+
+@app.get("/api/upload-status")
+def upload_status():
+    """
+    Reports how far along a background upload is
+    :return: the phase of the job (queued/parse/detect/load/index/done/failed), the rows processed, the rows of the
+    file once counted, the estimated seconds left and whether the table can already be read
+    """
+    job = upload_jobs.get(request.args.get("job_id"))
+    if job is None:
+        return {"success": False, "error": "Unknown upload job"}
+    return {"success": True, **job.status()}
+
 @app.get("/api/get-sample")
 def get_sample():
     """
-    Constructs a postgresql query to get the undetected table data from the database
+    Starts the wrangling session on the stored table, loading it from the database only when the session does not
+    already hold its current version, and returns its first rows
     :return: a dictionary of the table dataa
     """
     filename = request.args.get("filename")
@@ -52,21 +151,45 @@ def get_sample():
 
     if not filename:
         return {"success": False, "error": "Filename required"}
-    QUERY = get_whole_table_query(cleaned_table_name,False) + " LIMIT "+ data_size
     try:
-        fetch_detected_and_undetected_current_dataset_from_db(cleaned_table_name,engine)
-        # sample_dataframe = pd.read_sql_query(QUERY, engine).to_dict(orient="records")
-        sample_dataframe_as_dictionary = pd.read_sql_query(QUERY, engine).replace(np.nan, None).to_dict(orient="records")
-        # print("First row:", sample_dataframe_as_dictionary[0])  # See what keys exist
-        return sample_dataframe_as_dictionary
+        # the session holds the whole stored table, the sample is its first rows
+        start_dataset_session(cleaned_table_name,engine)
+        sample_dataframe = data_state_manager.get_original_df().head(int(data_size))
+        # records by default, the arrow stream or the column lists when the view asks for them, see frame_response
+        return frame_response(sample_dataframe, plain_records)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+@app.get("/api/get-rows")
+def get_rows():
+    """
+    Returns a window of rows of the stored table with their errors, for the table view to page through, the windows
+    follow each other by ID instead of by offset so any window is as fast to get as the first, see row_window.
+    The request takes the filename, after (the ID of the last row it has, left out for the first window), limit, sort
+    (a column, ID by default), order (asc or desc) and filter_column with filter_value to keep the rows of one value
+    :return: the rows, their errors as { column: { row_id: [errorTypes] } } and next_after, the after of the next window
+    or None after the last one
+    """
+    filename = request.args.get("filename")
+    if not filename:
+        return {"success": False, "error": "Filename required"}
+    try:
+        window = fetch_row_window(engine, clean_table_name(filename), after=request.args.get("after"),
+                                  limit=request.args.get("limit", default_window_rows),
+                                  sort_column=request.args.get("sort", "ID"),
+                                  descending=request.args.get("order", "asc").lower() == "desc",
+                                  filter_column=request.args.get("filter_column"),
+                                  filter_value=request.args.get("filter_value"))
+        return {"success": True, **window}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
 @app.get("/api/get-errors")
 def get_errors():
     """
-    Constructs a postgresql query to get the error table corresponding to the current file from the database
+    Constructs a postgresql query to get the errors of the rows with an id up to datasize from the error table of the
+    current file
     :return: a dictionary of the error table
     """
     filename = request.args.get("filename")
@@ -75,10 +198,11 @@ def get_errors():
     cleaned_table_name = clean_table_name(filename)
     if not filename:
         return {"success": False, "error": "Filename required"}
-    query = get_whole_table_query(cleaned_table_name,True)
+    # only the errors of the requested rows are read
+    query = get_errors_in_range_query(cleaned_table_name, 1, data_size_int)
     try:
-        full_error_df = pd.read_sql_query(query, engine)
-        data_sized_error_dictionary = create_error_dict(full_error_df,data_size_int)
+        error_df = pd.read_sql_query(query, engine)
+        data_sized_error_dictionary = create_error_dict(error_df,data_size_int)
         return data_sized_error_dictionary
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -1,26 +1,37 @@
 #Buckaroo Project - June 1, 2025
 #This file helps deliver on endpoint services
 
+import os
 import re
+import time
 
+import numpy as np
 import pandas as pd
 
-from app import data_state_manager
+from app import data_state_manager, detector_cache
 from app.set_id_column import set_id_column
-from detectors.anomaly import anomaly
-from detectors.datatype_mismatch import datatype_mismatch
-from detectors.incomplete import incomplete
-from detectors.missing_value import missing_value
+from data_management.bulk_load import column_types, copy_rows, create_error_table, create_table, error_table_types, \
+    load_report
+from data_management.file_formats import strip_upload_extension
+from data_management.schema_inference import restored_select_query, save_schema
+from detectors.chunked import chunk_row_count, detect_in_chunks, error_types
+from detectors.error_table import ErrorTable, as_error_table
+from detectors.result_cache import run_detectors_cached
+from detectors.incremental import build_statistics, detect_after_impute, detect_after_remove
+from detectors.type_profile import ColumnProfile
 
 
 def clean_table_name(csv_name):
     """
     Cleans the file name so that it is ready to be used to make a table in the database, it needs to:
-    - Remove file extension (.csv), replace spaces/special chars with underscores, ensure it starts with a letter (SQL requirement)
+    - Remove file extension (.csv, or the extension of another accepted format like .parquet or .csv.gz), replace spaces/special chars with underscores, ensure it starts with a letter (SQL requirement)
     :param csv_name: csv name from user upload
     :return: cleaned name without
     """
-    if ".csv" in csv_name:
+    stripped_name = strip_upload_extension(csv_name)
+    if stripped_name is not None:
+        csv_name = stripped_name
+    elif ".csv" in csv_name:
         csv_name = csv_name[0:len(csv_name)-4]
 
     clean_name = re.sub(r'[^a-zA-Z0-9_]', '_', csv_name)
@@ -28,31 +39,58 @@ def clean_table_name(csv_name):
         clean_name = 'table' + clean_name
     return clean_name.lower()
 
-def init_session_data_state(df,error_df,data_state_manager):
-    table_dict = {"df":df,"error_df":error_df}
+def init_session_data_state(df,error_df,data_state_manager,dataset=None):
     print("current session main df:", df)
     print("current session error df:", error_df)
-    data_state_manager.set_original_df(df)
-    data_state_manager.set_original_error_table(error_df)
-    data_state_manager.set_current_state(table_dict)
+    # the statistics the detectors are updated from after a wrangle are taken in one fused pass as the session starts,
+    # so the first wrangle is as incremental as the next ones
+    data_state_manager.start_session(df, error_df, dataset, build_statistics(set_id_column(df)))
 
-def update_data_state(wrangled_df, new_error_df):
-    new_state = {"df":wrangled_df,"error_df":new_error_df}
+def update_data_state(wrangled_df, new_error_df, statistics=None, profile=None):
+    new_state = {"df":wrangled_df,"error_df":new_error_df,"statistics":statistics,"profile":profile}
     data_state_manager.set_current_state(new_state)
 
-def fetch_detected_and_undetected_current_dataset_from_db(cleaned_table_name,engine):
+def fetch_detected_and_undetected_current_dataset_from_db(cleaned_table_name,engine,dataset=None):
     try:
-        full_df_query = get_whole_table_query(cleaned_table_name,False)
+        full_df_query = get_stored_table_query(cleaned_table_name,engine)
         error_df_query = get_whole_table_query(cleaned_table_name,True)
         undetected_df = pd.read_sql_query(full_df_query, engine)
-        detected_df = pd.read_sql_query(error_df_query, engine)
+        detected_df = ErrorTable.from_dataframe(pd.read_sql_query(error_df_query, engine))
         # set the first datastate for later wrangling purposes
         print("starting initial data-state:")
-        init_session_data_state(undetected_df, detected_df, data_state_manager)
+        init_session_data_state(undetected_df, detected_df, data_state_manager, dataset)
 
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def stored_dataset_version(cleaned_table_name, engine):
+    """
+    :return: the oids of the table and of its error table, every upload replaces both tables so a new upload of the
+    same name gets a new version, None for a table missing from the database
+    """
+    with engine.connect() as connection:
+        with connection.connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)::oid, to_regclass(%s)::oid",
+                           (f'"{cleaned_table_name}"', f'"errors{cleaned_table_name}"'))
+            version = cursor.fetchone()
+    return None if version[0] is None else tuple(version)
+
+def start_dataset_session(cleaned_table_name, engine):
+    """
+    Starts a wrangling session on a stored table, the table and its errors are only read from the database when the
+    session is not already holding that version of them, otherwise the session restarts from the tables it holds
+    """
+    version = stored_dataset_version(cleaned_table_name, engine)
+    if version is None:
+        raise ValueError(f"No table named {cleaned_table_name}")
+    dataset = (cleaned_table_name, version)
+    if data_state_manager.dataset == dataset and data_state_manager.get_original_df() is not None:
+        data_state_manager.restart_session()
+        return
+    failed = fetch_detected_and_undetected_current_dataset_from_db(cleaned_table_name, engine, dataset)
+    if failed is not None:
+        raise ValueError(failed["error"])
+
 def get_whole_table_query(table_name, get_errors):
     name = clean_table_name(table_name)
     if get_errors:
@@ -61,6 +99,14 @@ def get_whole_table_query(table_name, get_errors):
     query = f"SELECT * FROM {name}"
     return query
 
+def get_stored_table_query(table_name, engine):
+    """
+    :return: the query reading the whole table with the columns stored typed given back as the text they were
+    uploaded as, see schema_inference
+    """
+    with engine.connect() as connection:
+        return restored_select_query(connection, clean_table_name(table_name))
+
 def get_range_of_ids_query(min_id,max_id,table_name, get_errors):
     name = clean_table_name(table_name)
     if get_errors:
@@ -69,68 +115,201 @@ def get_range_of_ids_query(min_id,max_id,table_name, get_errors):
     query = f"SELECT * FROM {name} WHERE " + "'ID'" + f" BETWEEN {min_id} AND {max_id}"
     return query
 
-def get_values_for_df_melt(df):
-  values = []
-  columns = df.columns
-  for column in columns:
-    if column not in ('ID', "Unnamed: 0", "column_id","error_type","row_id"):
-      values.append(column)
-  return values
-
-def perform_melt(dfs):
-  df_combined = pd.DataFrame()
-  for df in dfs:
-    melted_df = pd.melt(df, id_vars='ID', value_vars=get_values_for_df_melt(df))
-    melted_df.rename(columns={'ID': 'row_id','variable':'column_id','value':'error_type'}, inplace=True)
-    df_combined = pd.concat([df_combined,melted_df])
-  nan_mask = df_combined['error_type'].isna()
-  df_combined = df_combined[~nan_mask]
-  df_combined.reset_index(drop=True, inplace=True)
-
-  return df_combined
-
 def run_detectors(data_frame):
     """
-    Runs all 4 detectors on the data and returns a dataframe of the complete errors
+    Runs all 4 detectors on the data and returns a table of the complete errors
     :param data_frame:
-    :return:
+    :return: an ErrorTable holding the errors of every detector
+    """
+    return run_detectors_with_timings(data_frame)[0]
+
+def run_detectors_with_timings(data_frame, has_id_column=False):
+    """
+    Runs all 4 detectors on the data, sharded over a thread pool that shares the table instead of copying it, the
+    columns whose content was already detected take their results from the detector cache
+    :param data_frame:
+    :param has_id_column: whether the data already went through set_id_column, its ID column is then not checked again
+    :return: an ErrorTable holding the errors of every detector and dictionary of structure { stage: seconds }
+    """
+    if not has_id_column:
+        data_frame = set_id_column(data_frame)
+    return run_detectors_cached(data_frame, detector_cache)
+
+def uploaded_file_size(uploaded_file):
+    """
+    :param uploaded_file: a seekable file object
+    :return: the size of the file in bytes, the file is left at its start
+    """
+    uploaded_file.seek(0, os.SEEK_END)
+    size = uploaded_file.tell()
+    uploaded_file.seek(0)
+    return size
+
+def store_csv_in_chunks(csv_file, cleaned_table_name, engine, chunk_size=chunk_row_count, on_progress=None):
+    """
+    Detects the errors of a csv too large to load at once and stores it with its error table, every block of the table
+    and its errors are copied to the database during the flagging pass of the detectors, so neither the table nor its
+    errors are held whole in memory
+    :param csv_file: a seekable file object holding the csv
+    :param cleaned_table_name: the name of the table to create
+    :param engine: the database engine
+    :param chunk_size: the number of rows of a block
+    :param on_progress: called with the phase and the rows it processed, the phases of detect_in_chunks and "index"
+    once the table is committed and its error table is being built
+    :return: the load reports of the table and of its errors, see bulk_load
+    """
+    error_table_name = "errors" + cleaned_table_name
+    staging_name = error_table_name + "_staging"
+    rows_inserted = 0
+    errors_inserted = 0
+    load_seconds = {"table": 0.0, "errors": 0.0}
+    columns = []
+    raw_connection = engine.raw_connection()
+    cursor = raw_connection.cursor()
+    def store_chunk(chunk):
+        nonlocal rows_inserted, columns
+        start = time.perf_counter()
+        if rows_inserted == 0:
+            columns = list(chunk.columns)
+            create_table(cursor, cleaned_table_name, column_types(chunk, infer_objects=False))
+            # the blocks are stored as they come, so nothing of an earlier upload of the table is restored
+            save_schema(cursor, cleaned_table_name, None)
+            create_table(cursor, staging_name, error_table_types)
+        copy_rows(cursor, cleaned_table_name, chunk, rows_inserted)
+        rows_inserted += len(chunk)
+        load_seconds["table"] += time.perf_counter() - start
+
+    def store_errors(errors):
+        nonlocal errors_inserted
+        start = time.perf_counter()
+        copy_rows(cursor, staging_name, errors.to_dataframe(), errors_inserted)
+        errors_inserted += len(errors)
+        load_seconds["errors"] += time.perf_counter() - start
+
+    try:
+        detect_in_chunks(csv_file, chunk_size, on_chunk=store_chunk, on_errors=store_errors, on_progress=on_progress)
+        if rows_inserted == 0:
+            create_table(cursor, staging_name, error_table_types)
+        # the table can be read while its error table is built
+        raw_connection.commit()
+        if on_progress is not None:
+            on_progress("index", rows_inserted)
+        start = time.perf_counter()
+        create_error_table(cursor, error_table_name, staging_name, columns, error_types)
+        load_seconds["errors"] += time.perf_counter() - start
+        raw_connection.commit()
+    finally:
+        cursor.close()
+        raw_connection.close()
+    return load_report(rows_inserted, load_seconds["table"]), load_report(errors_inserted, load_seconds["errors"])
+
+def get_detector_statistics(state):
     """
-    df_with_id = set_id_column(data_frame)
-    anomaly_df = pd.DataFrame(anomaly(df_with_id.copy())).rename_axis("ID", axis="index").reset_index()
-    incomplete_df = pd.DataFrame(incomplete(df_with_id.copy())).rename_axis("ID", axis="index").reset_index()
-    missing_value_df = pd.DataFrame(missing_value(df_with_id.copy())).rename_axis("ID", axis="index").reset_index()
-    datatype_mismatch_df = pd.DataFrame(datatype_mismatch(df_with_id.copy())).rename_axis("ID", axis="index").reset_index()
-    frames = [anomaly_df, incomplete_df, missing_value_df,datatype_mismatch_df]
-    return perform_melt(frames)
+    Returns the column statistics of a data state, computing them the first time a state without them is wrangled
+    :param state: a data state dictionary
+    :return: dictionary of structure { column: ColumnStatistics }
+    """
+    if state.get("statistics") is None:
+        state["statistics"] = build_statistics(set_id_column(state["df"]))
+    return state["statistics"]
+
+def get_column_profile(state, column):
+    """
+    Returns the type profile of a column of a data state, a column is profiled the first time it is asked for
+    :param state: a data state dictionary
+    :param column: the column name
+    :return: the ColumnProfile of the column
+    """
+    if state.get("profile") is None:
+        state["profile"] = {}
+    if column not in state["profile"]:
+        state["profile"][column] = ColumnProfile.from_series(state["df"][column])
+    return state["profile"][column]
+
+def get_current_column_profile(column):
+    return get_column_profile(data_state_manager.get_current_state(), column)
+
+def profile_without_columns(state, columns):
+    """
+    The type profile of a data state without the columns a wrangle changed, the other columns are shared
+    :param state: the data state the wrangle was applied to
+    :param columns: the columns the wrangle changed
+    :return: dictionary of structure { column: ColumnProfile }
+    """
+    profile = state.get("profile") or {}
+    return {column: column_profile for column, column_profile in profile.items() if column not in columns}
+
+def run_detectors_after_remove(current_state, wrangled_df, removed_ids):
+    """
+    Re-evaluates the detectors after rows were removed, only the columns whose statistics changed are checked again
+    :param current_state: the data state the rows were removed from
+    :param wrangled_df: the table without the removed rows
+    :param removed_ids: the ids of the removed rows
+    :return: the ErrorTable and the column statistics of the wrangled table
+    """
+    current_df = current_state["df"]
+    removed_rows = current_df[current_df['ID'].isin(removed_ids)]
+    return detect_after_remove(wrangled_df, as_error_table(current_state["error_df"]),
+                               get_detector_statistics(current_state), removed_rows)
+
+def run_detectors_after_impute(current_state, wrangled_df, column, imputed_ids):
+    """
+    Re-evaluates the detectors after the values of some rows in a column were imputed, only that column is checked again
+    :param current_state: the data state the values were imputed in
+    :param wrangled_df: the table with the imputed values
+    :param column: the imputed column
+    :param imputed_ids: the ids of the imputed rows
+    :return: the ErrorTable and the column statistics of the wrangled table
+    """
+    current_df = current_state["df"]
+    previous_values = current_df.loc[current_df['ID'].isin(imputed_ids), column]
+    return detect_after_impute(wrangled_df, as_error_table(current_state["error_df"]),
+                               get_detector_statistics(current_state), column, imputed_ids, previous_values)
 
 def get_error_dist(error_df,normal_df):
-    res = error_df.pivot_table("row_id", index="error_type", columns='column_id', aggfunc="count")
-    res_mask = res.fillna(0)
+    """
+    Computes the fraction of rows holding each error type in each column
+    :param error_df: ErrorTable or long dataframe of the errors
+    :param normal_df: the main table the errors belong to
+    :return: dataframe with an error_type column and one column per column holding errors
+    """
+    errors = as_error_table(error_df)
+    column_count = len(errors.column_names)
+    counts = np.bincount(errors.error_code.astype(np.int64) * column_count + errors.column_code,
+                         minlength=len(errors.error_types) * column_count)
+    counts = counts.reshape(len(errors.error_types), column_count)
+    res = pd.DataFrame(counts, index=pd.Index(errors.error_types, name="error_type"),
+                       columns=pd.Index(errors.column_names, name="column_id"))
+    # only keep the error types and columns that hold errors, sorted like a pivot table
+    res = res.loc[counts.sum(axis=1) > 0, counts.sum(axis=0) > 0].sort_index().sort_index(axis=1)
     total_ids = normal_df['ID'].count()
-    res_mask.iloc[:, 0:] = res_mask.iloc[:, 0:].div(total_ids)
+    res_mask = res.div(total_ids)
 
     # Flatten the multi-level columns
     res_mask = res_mask.reset_index()
     return res_mask
 
 def create_error_dict(df, error_size):
+    """
+    Groups the errors of the rows with an id between 1 and error_size by column and row
+    :param df: ErrorTable or long dataframe of the errors
+    :param error_size: the largest id to return errors for
+    :return: dictionary of structure { column: { row_id: [errorTypes] } }
+    """
     try:
-        error_size_df = df[df['row_id'].between(1, error_size)]
-        result_dict = {}
-        for _, row in error_size_df.iterrows():
-            col = row['column_id']
-            row_id = row['row_id']
-            error_type = row['error_type']
-            if pd.notna(error_type):
-                if col not in result_dict:
-                    result_dict[col] = {}
-                if row_id not in result_dict[col]:
-                    result_dict[col][row_id] = []
-                result_dict[col][row_id].append(error_type)
-        return result_dict
+        return as_error_table(df).between_ids(1, error_size).to_nested_dict()
     except Exception as e:
         return {"success": False, "error in the error_dictionary service helper": str(e)}
 
+def get_errors_in_range_query(table_name, min_id, max_id):
+    """
+    :return: the query reading the errors of the rows with an id between min_id and max_id, in the order they are
+    stored, the range is read through the row_id index of the error table, see table_layout
+    """
+    name = clean_table_name(table_name)
+    return (f"SELECT row_id, column_id, error_type FROM errors{name} "
+            f'WHERE row_id BETWEEN {int(min_id)} AND {int(max_id)} ORDER BY "index"')
+
 def group_by_attribute(df, column_a, group_by):
     ret = df.pivot_table("ID", index=column_a, columns=group_by, aggfunc="count")
     return ret
@@ -160,39 +339,23 @@ def slice_data_by_min_max_ranges(min_val,max_val,df,error_df):
     sliced_max_df = df[df["ID" or "index"] <= max_val_int]
     sliced_min_max_df = sliced_max_df[sliced_max_df["ID" or "index"] >= min_val_int]
 
+    if isinstance(error_df, ErrorTable):
+        return sliced_min_max_df, error_df.between_ids(min_val_int, max_val_int)
+
     sliced_error_max_df = error_df[error_df["row_id"] <= max_val_int]
     sliced_min_max_error_df = sliced_error_max_df[sliced_error_max_df["row_id"] >= min_val_int]
 
     return sliced_min_max_df, sliced_min_max_error_df
 
-def is_categorical(column_a):
-    value_counts = column_a.value_counts()
-    type_count = {}
-    type_key = {}
-    largest_type = 0
-    value_type = None
-    # populate the count of each type in the column
-    for key, value in value_counts.items():
-        type_of_key = type(key).__name__
-        if (isinstance(key, str)) and (bool(re.fullmatch(r'^\d+(\.\d+)?$', key.strip()))): type_of_key = "numeric"
-        if type_of_key in type_count:
-            type_count[type_of_key] += value
-            if type_of_key in type_key:
-                type_key[type_of_key].append(key)
-        else:
-            type_count[type_of_key] = value
-            type_key[type_of_key] = [key]
-    types = type_count.items()
-    for key, value in types:
-        if value > largest_type:
-            largest_type = value
-            value_type = key
-    if value_type == "str":
-        return True
-    if value_type is None:
-        return True
-    else:
-        return False
+def is_categorical(column_a, profile=None):
+    """
+    :param column_a: the column to check
+    :param profile: the ColumnProfile of the column when it is already known, otherwise the column is profiled
+    :return: whether strings are the most common type of the column
+    """
+    if profile is None:
+        profile = ColumnProfile.from_series(column_a)
+    return profile.is_categorical()
 
 def create_bins_for_a_numeric_column(column,bin_count):
     return pd.cut(column, bins=bin_count)
\ No newline at end of file
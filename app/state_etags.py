@@ -0,0 +1,63 @@
+#Buckaroo Project - October 18, 2026
+#This file lets the plot and summary endpoints answer a request for data the view already has with 304 Not Modified
+
+import hashlib
+import uuid
+from functools import wraps
+
+from flask import make_response, request
+
+from app import data_state_manager, engine
+from app.cached_views import succeeded
+from app.service_helpers import clean_table_name, stored_dataset_version
+
+# the versions of the data state start over with the process, the tags of a restarted server must not match the old ones
+process_token = uuid.uuid4().hex
+
+
+def request_etag(*version):
+    """
+    :param version: the values naming the version of the data the response is made from
+    :return: the tag of the response to this request, made from the version, the endpoint and its parameters in any
+    order
+    """
+    parameters = sorted(request.args.items(multi=True))
+    return hashlib.sha1(repr((version, request.path, parameters)).encode()).hexdigest()
+
+def conditional_view(view, current_version):
+    """
+    Wraps an endpoint so its successful responses carry an ETag and a request sending the tag back in If-None-Match is
+    answered with 304 without running the endpoint. A failure gets no tag, the next request runs the endpoint again
+    :param view: the endpoint function
+    :param current_version: returns the values naming the version of the data the endpoint reads
+    :return: the wrapped endpoint
+    """
+    @wraps(view)
+    def conditional(*args, **kwargs):
+        etag = request_etag(*current_version())
+        # only the successful responses are tagged, a tag sent back is one of theirs, * is not taken for a tag
+        if request.if_none_match.is_strong(etag):
+            response = make_response("", 304)
+        else:
+            result = view(*args, **kwargs)
+            success = succeeded(result)
+            response = make_response(result)
+            if not (200 <= response.status_code < 300 and success):
+                return response
+        response.set_etag(etag)
+        # the browser asks again every time, sending the tag, instead of guessing how long the data stays the same
+        response.cache_control.no_cache = True
+        return response
+    return conditional
+
+def state_etag(view):
+    """for the endpoints reading the tables of the wrangling session, the tag follows the version of its state"""
+    return conditional_view(view, lambda: (process_token, data_state_manager.dataset, data_state_manager.version))
+
+def stored_table_version():
+    tablename = request.args.get("tablename")
+    return (stored_dataset_version(clean_table_name(tablename), engine) if tablename else None,)
+
+def stored_table_etag(view):
+    """for the endpoints reading the stored table named by ?tablename, the tag follows the oids of the table"""
+    return conditional_view(view, stored_table_version)
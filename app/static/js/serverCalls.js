@@ -1,10 +1,19 @@
+// files larger than this are uploaded with ?mode=async, the server answers with a job to poll instead of the result
+const asyncUploadBytes = 256 * 1024 * 1024;
+// how often the status of a background upload is asked for
+const uploadPollMilliseconds = 1000;
+
 /**
- * Sends the user uploaded file to the endpoint in the server to add it to the DB - un-finished
- * @param {} fileToSend
+ * Sends the user uploaded file to the endpoint in the server to add it to the DB, a large file is stored by a
+ * background job which is polled until it is done
+ * @param {} fileToSend the FormData holding the file
+ * @param onProgress called with the status of the background job each time it is polled
+ * @returns {Promise<boolean>} whether the table was stored
  */
-async function uploadFileToDB(fileToSend){
+async function uploadFileToDB(fileToSend, onProgress = () => {}){
     console.log("starting upload");
-        const url = "/api/upload"
+        const file = fileToSend.get("file");
+        const url = file && file.size > asyncUploadBytes ? "/api/upload?mode=async" : "/api/upload"
         try {
             const response = await fetch(url, {
               method: "POST",
@@ -13,16 +22,46 @@ async function uploadFileToDB(fileToSend){
             if (!response.ok) {
                 throw new Error(`Response status: ${response.status}`);
             }
-            if(response.statusText === "OK"){
-                /** Add a way to tell the user that the csv was uploaded successfully*/
-                return true
+            const result = await response.json();
+            if (!result.success) {
+                throw new Error(result.error);
+            }
+            // only an async upload answers with a job, the other uploads are stored once they answer
+            if (result.job_id !== undefined) {
+                await waitForUploadJob(result.job_id, onProgress);
             }
+            return true
         } catch (error) {
                 console.error(error.message);
                 /** Also should add something which tells the user on the UI that the error occurred */
+                return false
             }
 }
 
+/**
+ * Polls /api/upload-status until the background upload is done
+ * @param jobId the job_id the upload answered with
+ * @param onProgress called with the status of the job each time it is polled
+ * @returns {Promise<any>} the status of the finished job, throws when the job failed
+ */
+export async function waitForUploadJob(jobId, onProgress = () => {}) {
+    const params = new URLSearchParams({job_id: jobId});
+    while (true) {
+        const response = await fetch(`/api/upload-status?${params}`, {method: "GET"});
+        if (!response.ok) {
+            throw new Error(`Response status: ${response.status}`);
+        }
+        const status = await response.json();
+        if (!status.success) {
+            throw new Error(status.error);
+        }
+        onProgress(status);
+        if (status.phase === "done") return status;
+        if (status.phase === "failed") throw new Error(status.error);
+        await new Promise(resolve => setTimeout(resolve, uploadPollMilliseconds));
+    }
+}
+
 /**
  * Get the 200 line sample rows from the full datatable stored in the database
  * @returns {Promise<void>}
@@ -67,6 +106,35 @@ async function getErrorData(filename,dataSize) {
     }
 }
 
+/**
+ * Get a window of rows of the stored table with their errors, for the table view to page through
+ * @param filename
+ * @param after the ID of the last row of the previous window, null for the first window
+ * @param limit the number of rows of the window
+ * @param sort the column to order the rows by, ties are ordered by ID
+ * @param order "asc" or "desc"
+ * @param filterColumn a column to keep the rows of one value of, null to keep every row
+ * @param filterValue the value of filterColumn to keep
+ * @returns {Promise<any>} the rows, their errors and next_after, the after of the next window or null after the last
+ */
+export async function queryRowWindow(filename, after = null, limit = 100, sort = "ID", order = "asc",
+                                     filterColumn = null, filterValue = null) {
+    const params = new URLSearchParams({filename: filename, limit: limit, sort: sort, order: order});
+    if (after !== null) params.append("after", after);
+    if (filterColumn !== null) {
+        params.append("filter_column", filterColumn);
+        params.append("filter_value", filterValue);
+    }
+    const url = `/api/get-rows?${params}`
+    try{
+        const response = await fetch(url, {method: "GET"});
+        return await response.json();
+    }
+    catch (error){
+        console.error(error.message)
+    }
+}
+
 /**
  * Get the data for the 1d histogram in the view
  * @returns {Promise<void>}
@@ -4,7 +4,9 @@
 from flask import request
 
 from app import app
-from app.service_helpers import run_detectors, update_data_state
+from app.frame_response import frame_response, plain_records
+from app.service_helpers import update_data_state, run_detectors_after_remove, run_detectors_after_impute, \
+    profile_without_columns
 from wranglers.impute_average import impute_average_on_ids
 from wranglers.remove_data import remove_data
 from app import data_state_manager
@@ -34,14 +36,16 @@ def wrangle_remove():
         current_state = data_state_manager.get_current_state()
         current_df = current_state["df"]
         wrangled_df = remove_data(current_df, points_to_remove_array)
-        new_error_df = run_detectors(wrangled_df)
-        new_state = {"df": wrangled_df, "error_df": new_error_df}
+        # only re-run the detectors on the columns the removed rows change
+        new_error_df, statistics = run_detectors_after_remove(current_state, wrangled_df, points_to_remove_array)
+        # removing rows changes every column, so none of the type profile is kept
+        new_state = {"df": wrangled_df, "error_df": new_error_df, "statistics": statistics, "profile": None}
         data_state_manager.push_right_table_stack(new_state)
         if preview == "yes":
             data_state_manager.pop_right_table_stack()
             return {"success": True, "new-state": None}
         else:
-            return {"success": True, "new-state": wrangled_df}
+            return frame_response(wrangled_df, plain_records, key="new-state", success=True)
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -72,18 +76,16 @@ def wrangle_impute():
         current_df = current_state["df"]
         # remove the points from the df
         wrangled_df = impute_average_on_ids(axis,current_df, points_to_remove_array)
-        # run the detectors on the new df
-        new_error_df = run_detectors(wrangled_df)
+        # run the detectors on the imputed column of the new df
+        new_error_df, statistics = run_detectors_after_impute(current_state, wrangled_df, axis, points_to_remove_array)
 
         if preview == "no":
             # update the table state of the app
-            update_data_state(wrangled_df, new_error_df)
+            update_data_state(wrangled_df, new_error_df, statistics, profile_without_columns(current_state, [axis]))
             # the current state dictionary made up of {"df":wrangled_df,"error_df":new_error_df}
             new_state = data_state_manager.get_current_state()
-            new_df = new_state["df"].to_dict("records")
-            new_error_df = new_state["error_df"].to_dict("records")
-            return {"success": True, "new-state": new_df}
+            return frame_response(new_state["df"], plain_records, key="new-state", success=True)
         else:
-            return {"success": True, "new-state": wrangled_df.to_dict("records")}
+            return frame_response(wrangled_df, plain_records, key="new-state", success=True)
     except Exception as e:
         return {"success": False, "error": str(e)}
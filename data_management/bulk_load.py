@@ -0,0 +1,167 @@
+"""
+Loads dataframes into PostgreSQL with COPY FROM STDIN instead of the batched INSERTs of DataFrame.to_sql
+
+The tables get the same layout to_sql gives them, an "index" column holding the position of each row followed by the
+columns of the frame, with the types to_sql would infer written out explicitly. The rows are sent as csv in blocks of
+copy_block_rows, so the text of a single block is held in memory at a time. Frames with more than
+parallel_load_rows rows are split into contiguous slices loaded over several connections at once. Error tables found
+block by block are staged and ordered in the database, see create_error_table. A schema from
+schema_inference.infer_schema gives columns narrower types than to_sql would
+"""
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from psycopg2 import sql
+
+from data_management.schema_inference import database_values, save_schema
+
+copy_block_rows = 50000
+# frames with more rows than this are loaded over parallel_load_workers connections
+parallel_load_rows = 1000000
+parallel_load_workers = 4
+# written for missing cells, a block whose text holds the marker gets a longer one
+null_marker = "\\N"
+# the columns of an ErrorTable stored with its index
+error_table_types = {"index": "BIGINT", "row_id": "BIGINT", "column_id": "TEXT", "error_type": "TEXT"}
+
+
+def postgres_type(column):
+    """
+    :param column: a pandas series
+    :return: the type to_sql would give the column in PostgreSQL
+    """
+    if isinstance(column.dtype, pd.DatetimeTZDtype):
+        return "TIMESTAMP WITH TIME ZONE"
+    inferred = pd.api.types.infer_dtype(column, skipna=True)
+    if inferred in ("datetime64", "datetime"):
+        return "TIMESTAMP WITHOUT TIME ZONE"
+    if inferred == "timedelta64":
+        return "INTERVAL"
+    if inferred == "floating":
+        return "REAL" if column.dtype == "float32" else "DOUBLE PRECISION"
+    if inferred == "integer":
+        return "INTEGER" if column.dtype in ("int8", "int16", "int32", "uint8", "uint16") else "BIGINT"
+    if inferred == "boolean":
+        return "BOOLEAN"
+    if inferred == "date":
+        return "DATE"
+    if inferred == "time":
+        return "TIME"
+    return "TEXT"
+
+def column_types(data_frame, infer_objects=True, schema=None):
+    """
+    :param infer_objects: whether the type of object columns is inferred from their values, when the frame is the first
+    block of a larger table the later blocks can hold other types, so its object columns are stored as text
+    :param schema: the types inferred for the columns, see schema_inference.infer_schema, the other columns get the
+    type to_sql would give them
+    :return: dictionary of structure { column: postgres type }, starting with the index column
+    """
+    column_type_map = {"index": "BIGINT"}
+    for column in data_frame.columns:
+        if schema is not None and str(column) in schema:
+            column_type_map[str(column)] = schema[str(column)]["type"]
+        elif not infer_objects and data_frame[column].dtype == "object":
+            column_type_map[str(column)] = "TEXT"
+        else:
+            column_type_map[str(column)] = postgres_type(data_frame[column])
+    return column_type_map
+
+def create_table(cursor, table_name, column_type_map):
+    """replaces the table with an empty one of the given columns"""
+    cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(table_name)))
+    columns = sql.SQL(", ").join(sql.SQL("{} {}").format(sql.Identifier(column), sql.SQL(column_type))
+                                 for column, column_type in column_type_map.items())
+    cursor.execute(sql.SQL("CREATE TABLE {} ({})").format(sql.Identifier(table_name), columns))
+
+def block_null_marker(block):
+    """:return: a null marker which is not a value of the block"""
+    marker = null_marker
+    text_columns = [column for column in block.columns if block[column].dtype == "object"]
+    while any(block[column].eq(marker).any() for column in text_columns):
+        marker += "N"
+    return marker
+
+def copy_rows(cursor, table_name, data_frame, first_index=0):
+    """
+    Streams the rows of the frame into an existing table, block by block
+    :param first_index: the value of the index column of the first row
+    """
+    columns = sql.SQL(", ").join(sql.Identifier(column) for column in ["index"] + [str(c) for c in data_frame.columns])
+    for start in range(0, len(data_frame), copy_block_rows):
+        block = data_frame.iloc[start:start + copy_block_rows]
+        marker = block_null_marker(block)
+        buffer = io.StringIO()
+        block.set_axis(pd.RangeIndex(first_index + start, first_index + start + len(block))) \
+            .to_csv(buffer, header=False, na_rep=marker)
+        buffer.seek(0)
+        copy = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL {})").format(
+            sql.Identifier(table_name), columns, sql.Literal(marker))
+        cursor.copy_expert(copy.as_string(cursor), buffer)
+
+def create_error_table(cursor, table_name, staging_name, column_names, error_types):
+    """
+    Replaces the error table with the errors copied block by block into the staging table, in the order the detectors
+    give on a whole table: by error type, then column, then the order the errors were staged in. The sort runs in the
+    database, then the staging table is dropped
+    :param column_names: the columns of the data table in order
+    :param error_types: the error types in order
+    """
+    cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(table_name)))
+    cursor.execute(sql.SQL(
+        'CREATE TABLE {} AS SELECT row_number() OVER (ORDER BY array_position(%s, error_type), '
+        'array_position(%s, column_id), "index") - 1 AS "index", row_id, column_id, error_type FROM {} ORDER BY 1'
+    ).format(sql.Identifier(table_name), sql.Identifier(staging_name)), (list(error_types), list(column_names)))
+    cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(staging_name)))
+
+def load_slice(engine, table_name, data_frame, first_index):
+    """copies a slice of the rows over a connection of its own"""
+    raw_connection = engine.raw_connection()
+    try:
+        with raw_connection.cursor() as cursor:
+            copy_rows(cursor, table_name, data_frame, first_index)
+        raw_connection.commit()
+    finally:
+        raw_connection.close()
+
+def bulk_load(engine, table_name, data_frame, parallel=True, schema=None):
+    """
+    Replaces a table with the rows of a dataframe
+    :param engine: the database engine
+    :param table_name: the name of the table
+    :param data_frame: the rows to store, its index is replaced by the position of each row like to_sql does for a
+    frame with a default index
+    :param parallel: whether frames past parallel_load_rows are loaded over several connections, the slices commit on
+    their own so a failed load can leave part of the rows behind
+    :param schema: the types inferred for the columns, see schema_inference.infer_schema, recorded so the typed text
+    columns can be read back as they were
+    :return: dictionary of structure { "rows", "seconds", "rows_per_second" }
+    """
+    start = time.perf_counter()
+    column_type_map = column_types(data_frame, schema=schema)
+    if schema:
+        data_frame = database_values(data_frame, schema)
+    raw_connection = engine.raw_connection()
+    try:
+        with raw_connection.cursor() as cursor:
+            create_table(cursor, table_name, column_type_map)
+            save_schema(cursor, table_name, schema)
+            if not parallel or len(data_frame) <= parallel_load_rows:
+                copy_rows(cursor, table_name, data_frame)
+        raw_connection.commit()
+    finally:
+        raw_connection.close()
+
+    if parallel and len(data_frame) > parallel_load_rows:
+        slice_rows = -(-len(data_frame) // parallel_load_workers)
+        with ThreadPoolExecutor(max_workers=parallel_load_workers) as executor:
+            loads = [executor.submit(load_slice, engine, table_name, data_frame.iloc[first:first + slice_rows], first)
+                     for first in range(0, len(data_frame), slice_rows)]
+            for load in loads:
+                load.result()
+    return load_report(len(data_frame), time.perf_counter() - start)
+
+def load_report(rows, seconds):
+    return {"rows": rows, "seconds": seconds, "rows_per_second": rows / seconds if seconds > 0 else float(rows)}
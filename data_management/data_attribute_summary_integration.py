@@ -3,7 +3,7 @@ Converts the current datastate data into JSON the view can use
 """
 import pandas as pd
 
-from app.service_helpers import get_error_dist, is_categorical
+from app.service_helpers import get_error_dist, is_categorical, get_current_column_profile
 from data_management.data_integration import get_filtered_dataframes
 
 
@@ -14,20 +14,24 @@ def generate_complete_json(min_id, max_id):
     return {
         "columnErrors": convert_error_list_to_dict(error_list),
         "attributes": list(main_df.columns),
-        "attributeDistributions": build_attribute_distributions(main_df)
+        "attributeDistributions": build_attribute_distributions(main_df, {column: get_current_column_profile(column) for column in main_df.columns})
     }
 
-def get_attribute_stats(df, column):
-    if is_categorical(df[column]):
+def get_attribute_stats(df, column, profile=None):
+    if is_categorical(df[column], profile):
         print("made it through the categorical")
         return get_categorical_stats(df, column)
     return get_numeric_stats(df, column)
 
-def build_attribute_distributions(main_df):
+def build_attribute_distributions(main_df, profile=None):
+    """
+    :param profile: dictionary of structure { column: ColumnProfile } of the whole columns when it is known
+    """
+    profile = profile or {}
     distributions = {}
     for col in main_df.columns:
         print("getting the distribution for:",col)
-        distributions[col] = get_attribute_stats(main_df, col)
+        distributions[col] = get_attribute_stats(main_df, col, profile.get(col))
         print("finished getting the distribution for:", col)
     # print("got the distribution")
     return distributions
@@ -47,9 +51,9 @@ def get_numeric_stats(df, column):
     df[column] = df[column].astype('int64')
     return {
         "numeric": {
-            "mean": df[column].mean().item(),
-            "min": df[column].min().item(),
-            "max": df[column].max().item()
+            "mean": df[column].mean(),
+            "min": df[column].min(),
+            "max": df[column].max()
         }
     }
 
@@ -5,10 +5,12 @@ to render the data
 """
 from app import data_state_manager
 from app.service_helpers import is_categorical, create_bins_for_a_numeric_column, get_error_dist, \
-    slice_data_by_min_max_ranges
+    slice_data_by_min_max_ranges, get_current_column_profile
 import pandas as pd
 import numpy as np
 
+from detectors.error_table import ErrorTable, as_error_table
+
 
 #main drivers
 def generate_1d_histogram_data(column_name, number_of_bins, min_id, max_id):
@@ -30,11 +32,13 @@ def get_filtered_dataframes(min_id, max_id):
 
 def get_relevant_errors(error_df, column_names):
     """Get errors that relate to the specified columns"""
+    if isinstance(error_df, ErrorTable):
+        return error_df.for_columns(column_names)
     return error_df[error_df['column_id'].isin(column_names)]
 
 #Column processing
-def get_column_bin_assignments(dataframe, column_name, number_of_bins):
-    """Create bin assignments for any column type"""
+def get_column_bin_assignments(dataframe, column_name, number_of_bins, profile=None):
+    """Create bin assignments for any column type, profile is the ColumnProfile of the whole column when it is known"""
     column_data = dataframe[column_name].dropna()
 
     if len(column_data) == 0:
@@ -44,7 +48,7 @@ def get_column_bin_assignments(dataframe, column_name, number_of_bins):
         bin_assignments = np.zeros(len(dataframe), dtype=int)
         return bin_assignments, scale_data, "categorical"
 
-    if is_categorical(column_data):
+    if is_categorical(column_data, profile):
         unique_categories = column_data.unique()
         category_to_bin = {category: index for index, category in enumerate(unique_categories)}
         bin_assignments = dataframe[column_name].map(category_to_bin).values
@@ -89,11 +93,9 @@ def count_items_per_bin(row_to_bin_mapping):
 def count_errors_per_bin(relevant_errors, row_to_bin_mapping):
     """Count errors by type in each bin"""
     errors_per_bin = {}
+    relevant_errors = as_error_table(relevant_errors)
 
-    for _, error_row in relevant_errors.iterrows():
-        row_id = error_row['row_id']
-        error_type = error_row['error_type']
-
+    for row_id, error_type in zip(relevant_errors.row_id.tolist(), relevant_errors.error_type().tolist()):
         if row_id in row_to_bin_mapping:
             bin_coordinates = row_to_bin_mapping[row_id]
 
@@ -109,8 +111,7 @@ def count_errors_per_bin(relevant_errors, row_to_bin_mapping):
 def create_scale_info(scale_data, column_type):
     """Create scale information for histogram axes"""
     if column_type == "categorical":
-        categories = scale_data.tolist() if hasattr(scale_data, 'tolist') else list(scale_data)
-        return {"numeric": [], "categorical": categories}
+        return {"numeric": [], "categorical": list(scale_data)}
     else:
         ranges = [{"x0": int(interval.left), "x1": int(interval.right)} for interval in scale_data]
         return {"numeric": ranges, "categorical": []}
@@ -130,7 +131,7 @@ def generate_histogram_data(column_names, numbers_of_bins, min_id, max_id):
 
     for column_name, number_of_bins in zip(column_names, numbers_of_bins):
         bin_assignments, scale_data, column_type = get_column_bin_assignments(
-            main_df, column_name, number_of_bins
+            main_df, column_name, number_of_bins, get_current_column_profile(column_name)
         )
         all_bin_assignments.append(bin_assignments)
         all_scale_data.append(scale_data)
@@ -6,17 +6,19 @@ import random
 import numpy as np
 import pandas as pd
 
-from app.service_helpers import is_categorical
+from app.service_helpers import is_categorical, get_current_column_profile
 from data_management.data_integration import get_filtered_dataframes
+from detectors.error_table import as_error_table
 
 def generate_scatterplot_sample_data(x_column, y_column, min_id, max_id, error_sample_size, total_sample_size):
     """Generate scatterplot data in the required JSON format"""
     # Get filtered data
     main_df, error_df = get_filtered_dataframes(min_id, max_id)
+    error_df = as_error_table(error_df).for_columns([x_column, y_column])
     print("got the dfs")
     # Determine column types
-    x_type = get_column_type_for_scatterplot(main_df, x_column)
-    y_type = get_column_type_for_scatterplot(main_df, y_column)
+    x_type = get_column_type_for_scatterplot(main_df, x_column, get_current_column_profile(x_column))
+    y_type = get_column_type_for_scatterplot(main_df, y_column, get_current_column_profile(y_column))
     print("got the types")
     # Sample data directly using the more efficient approach
     sampled_ids = sample_scatterplot_data(
@@ -41,23 +43,20 @@ def generate_scatterplot_sample_data(x_column, y_column, min_id, max_id, error_s
         "scaleY": scale_y
     }
 
-def get_column_type_for_scatterplot(dataframe, column_name):
+def get_column_type_for_scatterplot(dataframe, column_name, profile=None):
     """Determine if column is categorical or numeric for scatterplot"""
     column_data = dataframe[column_name].dropna()
 
     if len(column_data) == 0:
         return "categorical"  # Handle all-null case
 
-    return "categorical" if is_categorical(column_data) else "numeric"
+    return "categorical" if is_categorical(column_data, profile) else "numeric"
 
 
 def get_errors_for_id(error_df, row_id, x_column, y_column):
     """Get list of error types for a specific ID and columns"""
-    relevant_errors = error_df[
-        (error_df['row_id'] == row_id) &
-        (error_df['column_id'].isin([x_column, y_column]))
-        ]
-    return relevant_errors['error_type'].tolist()
+    relevant_errors = as_error_table(error_df).for_columns([x_column, y_column])
+    return relevant_errors.take(relevant_errors.row_id == row_id).error_type().tolist()
 
 
 def get_column_value_for_scatterplot(dataframe, row_id, column_name, column_type):
@@ -72,11 +71,7 @@ def get_column_value_for_scatterplot(dataframe, row_id, column_name, column_type
     if pd.isna(value):
         return "null"
 
-    # Convert numpy/pandas types to native Python types - this
-    # needs to happen so that it can convert it to JSON later on when the endpoint returns the data
-    if hasattr(value, 'item'):
-        return value.item()
-
+    # numpy values are returned as they are, the app's json provider encodes them
     return value
 
 
@@ -122,8 +117,8 @@ def get_scale_info_for_scatterplot(dataframe, column_name, column_type):
 def sample_scatterplot_data(main_df, error_df, x_column, y_column, error_sample_size, total_sample_size):
     """Directly sample data for scatterplot following the JavaScript pattern"""
     # Get IDs that have errors in the specified columns
-    relevant_errors = error_df[error_df['column_id'].isin([x_column, y_column])]
-    error_ids = set(relevant_errors['row_id'].unique())
+    relevant_errors = as_error_table(error_df).for_columns([x_column, y_column])
+    error_ids = set(np.unique(relevant_errors.row_id).tolist())
 
     # Split main dataframe into error and non-error rows
     error_rows = main_df[main_df['ID'].isin(error_ids)].copy()
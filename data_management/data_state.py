@@ -13,6 +13,9 @@ class DataState:
     for redo: pop from right stack, push to top of left stack, return top of right
     for current table: return top of left stack
 
+    version counts the changes of the current state and never goes back, an undo is a change too, the plot endpoints
+    tag their responses with it (see app/state_etags), dataset names the stored table the session was loaded from and
+    the version of that table, see start_session
     """
 
     def __init__(self):
@@ -21,20 +24,29 @@ class DataState:
         self.right_state_stack = []
         self.original_error_table = None
         self.original_df = None
+        self.original_statistics = None
         self.original_cached_for_current_session = False
         self.current_error_dist = None
+        self.version = 0
+        self.dataset = None
 
     """
     Setter,Getter functions for the data state management
     """
 
     def push_left_table_stack(self, table):
+        self.version += 1
+        self.stamp_state(table)
         self.left_state_stack.append(table)
     def push_right_table_stack(self, table):
+        self.version += 1
+        self.stamp_state(table)
         self.right_state_stack.append(table)
     def pop_left_table_stack(self):
+        self.version += 1
         return self.left_state_stack.pop()
     def pop_right_table_stack(self):
+        self.version += 1
         return self.right_state_stack.pop()
 
     def set_original_error_table(self, original_error_table):
@@ -48,6 +60,17 @@ class DataState:
         return self.original_df
 
 
+    def stamp_state(self, table):
+        """a state keeps the version it was first pushed at while undo and redo move it between the stacks"""
+        if isinstance(table, dict):
+            table.setdefault("state_version", self.version)
+    def current_state_version(self):
+        """the version the current state was made at, the same again after undoing back to it"""
+        current_state = self.get_current_state()
+        if isinstance(current_state, dict) and "state_version" in current_state:
+            return current_state["state_version"]
+        return self.version
+
     #give the top df on the right stack
     def get_current_state(self):
         if len(self.right_state_stack) > 0:
@@ -68,11 +91,36 @@ class DataState:
         if len(self.left_state_stack) > 0:
             prev_state = self.left_state_stack.pop()
             self.right_state_stack.append(prev_state)
+            self.version += 1
 
     def redo(self):
         right_table_stack_len = len(self.right_state_stack)
         if right_table_stack_len > 1:
             next_state = self.right_state_stack.pop()
             self.left_state_stack.append(next_state)
+            self.version += 1
+
+    """
+    Sessions, a session starts from the original tables with empty stacks
+    """
+    def start_session(self, original_df, original_error_table, dataset=None, original_statistics=None):
+        """
+        :param dataset: the (table name, table version) the tables were loaded from, a later session of the same
+        dataset can restart from them instead of loading them again
+        :param original_statistics: the column statistics of the original table the detectors are updated from, kept
+        on the original state of every restart
+        """
+        self.set_original_df(original_df)
+        self.set_original_error_table(original_error_table)
+        self.original_statistics = original_statistics
+        self.dataset = dataset
+        self.restart_session()
+
+    def restart_session(self):
+        """drops the wrangling done since the session started, the current state is the original tables again"""
+        self.left_state_stack = []
+        self.right_state_stack = []
+        self.push_right_table_stack({"df": self.original_df, "error_df": self.original_error_table,
+                                     "statistics": self.original_statistics})
 
 
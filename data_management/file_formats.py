@@ -0,0 +1,134 @@
+"""
+Reads an uploaded file into a dataframe with the readers of pyarrow, whatever its format
+
+The format is found from the first bytes of the file, not its name:
+    gzip / zstd - a compressed csv, decompressed as it is parsed
+    parquet - "PAR1"
+    feather / arrow - the arrow IPC file format ("ARROW1", which feather v2 is) or the IPC stream format
+    csv - anything else
+The csv reader of pyarrow parses blocks of the file on all the cores where pd.read_csv uses one. It is set up to give
+the table pd.read_csv would: quoted values can hold line breaks, the same strings count as missing, only the words true
+and false are booleans and the columns pyarrow would read as dates or timestamps are kept as their text. A file pyarrow
+can't parse, like rows short of cells which pandas fills, a header pandas would rename, repeated or empty names, and a
+column of integers too large for int64, which pyarrow reads as floats where pandas keeps every digit, are read by
+pandas itself. The arrow table is handed to pandas without a copy of the numeric columns, the text columns
+become the python strings the detectors work on
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+import pyarrow.parquet as parquet
+
+# the strings pd.read_csv reads as missing by default
+csv_null_values = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN", "<NA>",
+                   "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+csv_true_values = ["True", "TRUE", "true"]
+csv_false_values = ["False", "FALSE", "false"]
+compressions = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+# pyarrow reads a column of integers as floats once one of them doesn't fit an int64
+int64_limit = 2.0 ** 63
+integer_pattern = r"^\s*[+-]?\d+\s*$"
+# the extensions of the files the upload accepts, the table is named after the file without them
+upload_extensions = [".csv.gz", ".csv.zst", ".parquet", ".feather", ".arrow", ".csv"]
+
+
+def detect_format(head):
+    """
+    :param head: the first bytes of the file, 8 are enough
+    :return: "gzip", "zstd", "parquet", "arrow", "arrow_stream" or "csv"
+    """
+    for magic, compression in compressions.items():
+        if head.startswith(magic):
+            return compression
+    if head.startswith(b"PAR1"):
+        return "parquet"
+    if head.startswith(b"ARROW1"):
+        return "arrow"
+    # an IPC stream starts with the continuation marker of its first message
+    if head.startswith(b"\xff\xff\xff\xff"):
+        return "arrow_stream"
+    return "csv"
+
+def file_format(uploaded_file):
+    """:return: the format of a seekable file object, see detect_format, the file is left at its start"""
+    uploaded_file.seek(0)
+    head = uploaded_file.read(8)
+    uploaded_file.seek(0)
+    return detect_format(head)
+
+def read_upload(uploaded_file):
+    """
+    :param uploaded_file: a seekable file object holding a csv, compressed csv, parquet or arrow file
+    :return: the dataframe of the file
+    """
+    upload_format = file_format(uploaded_file)
+    if upload_format == "parquet":
+        return arrow_to_pandas(parquet.read_table(uploaded_file))
+    if upload_format == "arrow":
+        return arrow_to_pandas(feather.read_table(uploaded_file))
+    if upload_format == "arrow_stream":
+        return arrow_to_pandas(pa.ipc.open_stream(uploaded_file).read_all())
+    compression = upload_format if upload_format in compressions.values() else None
+    return read_csv(uploaded_file, compression)
+
+def read_csv(uploaded_file, compression=None):
+    """reads a csv the way pd.read_csv does, see the module docstring"""
+    data = pa.input_stream(uploaded_file, compression=compression).read()
+    convert_options = dict(null_values=csv_null_values, strings_can_be_null=True, true_values=csv_true_values,
+                           false_values=csv_false_values)
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+    try:
+        table = pa_csv.read_csv(pa.BufferReader(data), parse_options=parse_options,
+                                convert_options=pa_csv.ConvertOptions(**convert_options))
+    except pa.ArrowInvalid:
+        return pd.read_csv(io.BytesIO(data))
+    names = table.column_names
+    if len(set(names)) != len(names) or "" in names:
+        return pd.read_csv(io.BytesIO(data))
+    if has_int64_overflow(data, table, parse_options, convert_options):
+        return pd.read_csv(io.BytesIO(data))
+
+    temporal = [field.name for field in table.schema if pa.types.is_temporal(field.type)]
+    if len(temporal) > 0:
+        text_options = pa_csv.ConvertOptions(include_columns=temporal, **convert_options,
+                                             column_types={name: pa.string() for name in temporal})
+        as_text = pa_csv.read_csv(pa.BufferReader(data), parse_options=parse_options, convert_options=text_options)
+        for name in temporal:
+            table = table.set_column(names.index(name), name, as_text.column(name))
+    # pd.read_csv reads a column of nothing but missing cells as floats
+    for index, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(index, field.name, table.column(index).cast(pa.float64()))
+    return arrow_to_pandas(table)
+
+def has_int64_overflow(data, table, parse_options, convert_options):
+    """:return: whether a column read as floats holds integers too large for int64, written without a decimal point"""
+    large = [field.name for field in table.schema if pa.types.is_floating(field.type) and
+             (pc.max(pc.abs(table.column(field.name))).as_py() or 0) >= int64_limit]
+    if len(large) == 0:
+        return False
+    text_options = pa_csv.ConvertOptions(include_columns=large, **convert_options,
+                                         column_types={name: pa.string() for name in large})
+    as_text = pa_csv.read_csv(pa.BufferReader(data), parse_options=parse_options, convert_options=text_options)
+    return any(pc.all(pc.match_substring_regex(as_text.column(name), integer_pattern)).as_py() for name in large)
+
+def arrow_to_pandas(table):
+    """converts without a copy of the columns pandas can share with arrow, the table is released as it goes"""
+    data_frame = table.to_pandas(split_blocks=True, self_destruct=True, date_as_object=False)
+    # missing text comes from arrow as None, pd.read_csv gives NaN
+    for column in data_frame.columns:
+        if data_frame[column].dtype == "object" and data_frame[column].isna().any():
+            data_frame[column] = data_frame[column].where(data_frame[column].notna(), np.nan)
+    return data_frame
+
+def strip_upload_extension(filename):
+    """:return: the name of the file without the extension of its format, None when it has none of them"""
+    for extension in upload_extensions:
+        if filename.lower().endswith(extension):
+            return filename[:len(filename) - len(extension)]
+    return None
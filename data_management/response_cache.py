@@ -0,0 +1,62 @@
+"""
+Cache of the encoded responses of the plot and summary endpoints
+
+A plot is fully set by the dataset of the session, the state it is drawn from and the endpoint with its parameters, see
+app/cached_views for the key. A state keeps its version through undo and redo, so going back to a state serves the
+plots drawn from it before without computing them again. The least recently used responses are evicted once the cache
+holds more than max_bytes of them
+"""
+import threading
+from collections import OrderedDict
+
+max_cached_bytes = 128 * 1024 * 1024
+
+
+class ResponseCache:
+    def __init__(self, max_bytes=max_cached_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """:return: the cached (body, mimetype) of the key, None when it is not cached"""
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.cached_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def put(self, key, body, mimetype):
+        """
+        :param body: the encoded response as bytes
+        :param mimetype: the mimetype it is sent with
+        """
+        with self.lock:
+            if key in self.entries:
+                self.cached_bytes -= len(self.entries.pop(key)[0])
+            self.entries[key] = (body, mimetype)
+            self.cached_bytes += len(body)
+            while self.cached_bytes > self.max_bytes and len(self.entries) > 0:
+                _, (evicted, _) = self.entries.popitem(last=False)
+                self.cached_bytes -= len(evicted)
+
+    def statistics(self):
+        """:return: dictionary of the entries, bytes, hits and misses of the cache"""
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.cached_bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
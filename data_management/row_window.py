@@ -0,0 +1,145 @@
+"""
+Reads a window of rows of a stored table for the table view, with the errors of those rows
+
+The windows are paged with a keyset instead of an OFFSET: the request names the ID of the last row it has, and the next
+window starts right after it in the order of the sort, (sort column, ID) or ID alone. Every window is a range scan of a
+btree whatever its position in the table, where an OFFSET reads and drops all the rows before it. The ID column has its
+primary key and the other columns a btree on (column, ID), built as the table is loaded, see table_layout. A window is
+never left to build an index, a column without one is read with a sort. The nulls of a sort column come after its
+values in ascending order and before them in descending order, the way a btree holds them, a window reaching across
+them is read as two ranges
+
+The text columns are indexed on the first prefix_characters of their values, so they are sorted by that prefix, then
+by the whole value: the index gives the order of the prefixes and only the rows sharing a prefix are sorted
+"""
+import pandas as pd
+from psycopg2 import sql
+
+from data_management.schema_inference import date_formats, restored_select_list, stored_columns
+from data_management.table_layout import prefix, prefix_characters, text_columns
+from detectors.error_table import ErrorTable
+
+default_window_rows = 100
+max_window_rows = 5000
+
+
+def sort_key(column, texts):
+    """:return: the expressions the rows are ordered by for a sort on the column, the prefix first for a text column"""
+    if column in texts:
+        return [prefix(column), sql.Identifier(column)]
+    return [sql.Identifier(column)]
+
+def filter_condition(column, typed_columns, texts):
+    """
+    :return: the condition of a column equal to a value written as the view shows it, using the column's index, with
+    the number of times it takes the value
+    """
+    if column in typed_columns:
+        postgres_type, text_format = typed_columns[column]
+        if text_format in date_formats:
+            return sql.SQL("{} = to_date(%s, {})").format(sql.Identifier(column),
+                                                          sql.Literal(date_formats[text_format])), 1
+        return sql.SQL("{} = CAST(%s AS {})").format(sql.Identifier(column), sql.SQL(postgres_type)), 1
+    if column in texts:
+        return sql.SQL("{} = left(%s, {}) AND {} = %s").format(
+            prefix(column), sql.Literal(prefix_characters), sql.Identifier(column)), 2
+    return sql.SQL("{} = %s").format(sql.Identifier(column)), 1
+
+def keyset_segments(sort_column, descending, sort_values, after, texts):
+    """
+    :param sort_values: the values of the sort key of the row the window starts after, see sort_key
+    :return: the conditions of the rows after the row (sort_values, after) in the order of the window, with their
+    params, each a range of the btree, the rows of the first come before the rows of the second. The nulls are a
+    segment of their own, a condition reaching past them would not be a range of the btree
+    """
+    if sort_column == "ID":
+        return [(sql.SQL('"ID" {} %s').format(sql.SQL("<" if descending else ">")), [after])]
+    column = sql.Identifier(sort_column)
+    key = sql.SQL(", ").join(sort_key(sort_column, texts))
+    is_null = sort_values[-1] is None
+    if not descending and not is_null:
+        return [(sql.SQL('({}, "ID") > ({}, %s)').format(key, placeholders(sort_values)), [*sort_values, after]),
+                (sql.SQL("{} IS NULL").format(column), [])]
+    if not descending:
+        return [(sql.SQL('{} IS NULL AND "ID" > %s').format(column), [after])]
+    if is_null:
+        return [(sql.SQL('{} IS NULL AND "ID" < %s').format(column), [after]),
+                (sql.SQL("{} IS NOT NULL").format(column), [])]
+    return [(sql.SQL('({}, "ID") < ({}, %s)').format(key, placeholders(sort_values)), [*sort_values, after])]
+
+def placeholders(values):
+    return sql.SQL(", ").join(sql.Placeholder() * len(values))
+
+def window_errors(cursor, table_name, row_ids):
+    """:return: dictionary of structure { column: { row_id: [errorTypes] } } of the rows, like create_error_dict"""
+    cursor.execute(sql.SQL('SELECT row_id, column_id, error_type FROM {} WHERE row_id = ANY(%s) ORDER BY "index"')
+                   .format(sql.Identifier("errors" + table_name)), (row_ids,))
+    error_df = pd.DataFrame(cursor.fetchall(), columns=["row_id", "column_id", "error_type"])
+    return ErrorTable.from_dataframe(error_df).to_nested_dict()
+
+def fetch_row_window(engine, table_name, after=None, limit=default_window_rows, sort_column="ID", descending=False,
+                     filter_column=None, filter_value=None):
+    """
+    :param engine: the database engine
+    :param table_name: the cleaned name of the table
+    :param after: the ID of the last row of the previous window, None for the first window
+    :param limit: the most rows of the window, at most max_window_rows
+    :param sort_column: the column the rows are ordered by, ties are ordered by ID
+    :param descending: whether the order is descending
+    :param filter_column: a column the rows are kept by, None to keep every row
+    :param filter_value: the value of filter_column of the rows kept, written as the view shows it
+    :return: dictionary of structure { "rows": [row dictionaries], "errors": { column: { row_id: [errorTypes] } },
+    "next_after": the ID to ask the next window after, None after the last window }
+    """
+    limit = max(1, min(int(limit), max_window_rows))
+    raw_connection = engine.raw_connection()
+    try:
+        with raw_connection.cursor() as cursor:
+            columns, typed_columns = stored_columns(cursor, table_name)
+            if len(columns) == 0:
+                raise ValueError(f"No table named {table_name}")
+            for column in (sort_column, filter_column):
+                if column is not None and column not in columns:
+                    raise ValueError(f"No column named {column}")
+            texts = text_columns(cursor, table_name)
+
+            conditions, params = [], []
+            if filter_column is not None:
+                condition, value_count = filter_condition(filter_column, typed_columns, texts)
+                conditions.append(condition)
+                params.extend([filter_value] * value_count)
+            segments = [(None, [])]
+            if after is not None:
+                sort_values = [None]
+                if sort_column != "ID":
+                    cursor.execute(sql.SQL('SELECT {} FROM {} WHERE "ID" = %s').format(
+                        sql.SQL(", ").join(sort_key(sort_column, texts)), sql.Identifier(table_name)), (after,))
+                    found = cursor.fetchone()
+                    if found is None:
+                        raise ValueError(f"No row with the ID {after}")
+                    sort_values = list(found)
+                segments = keyset_segments(sort_column, descending, sort_values, after, texts)
+
+            direction = sql.SQL("DESC" if descending else "ASC")
+            key = sort_key(sort_column, texts) if sort_column != "ID" else []
+            order = sql.SQL(", ").join(sql.SQL("{} {}").format(expression, direction)
+                                       for expression in key + [sql.Identifier("ID")])
+            # one row past the window tells whether there is a next one
+            rows = []
+            for segment, segment_params in segments:
+                segment_conditions = conditions + ([segment] if segment is not None else [])
+                query = sql.SQL("SELECT {} FROM {} {} ORDER BY {} LIMIT %s").format(
+                    restored_select_list(columns, typed_columns), sql.Identifier(table_name),
+                    sql.SQL("WHERE ") + sql.SQL(" AND ").join(segment_conditions) if segment_conditions
+                    else sql.SQL(""), order)
+                cursor.execute(query, params + segment_params + [limit + 1 - len(rows)])
+                rows.extend(dict(zip(columns, row)) for row in cursor.fetchall())
+                if len(rows) > limit:
+                    break
+            has_next = len(rows) > limit
+            rows = rows[:limit]
+            errors = window_errors(cursor, table_name, [row["ID"] for row in rows])
+        raw_connection.commit()
+    finally:
+        raw_connection.close()
+    return {"rows": rows, "errors": errors, "next_after": rows[-1]["ID"] if has_next else None}
@@ -0,0 +1,143 @@
+"""
+Picks the narrowest PostgreSQL type of every column of an uploaded table, instead of TEXT for every object column
+
+    integer columns - INTEGER when their values fit in 4 bytes, BIGINT otherwise
+    text columns - DATE, INTEGER, BIGINT or NUMERIC when every value is written the one way the type writes it back,
+                   so the stored value gives back the exact string of the file
+    everything else - the type to_sql would give it, see bulk_load.postgres_type, text columns holding anything else,
+                      like the missing strings or a mix of numbers and words the type mismatch detector reports, stay TEXT
+
+The columns stored as another type than the text they came from are recorded in buckaroo_schema with the way to write
+them back, restored_select_query reads a table with those columns turned back into their original strings, so the
+data the detectors and the view get does not change with the storage type
+"""
+import re
+
+import pandas as pd
+from psycopg2 import sql
+
+schema_table = "buckaroo_schema"
+# the date formats text columns are tried with, and the to_char pattern giving the same text back
+date_formats = {
+    "%m/%d/%y": "MM/DD/YY",
+    "%m/%d/%Y": "MM/DD/YYYY",
+    "%Y-%m-%d": "YYYY-MM-DD",
+    "%d/%m/%Y": "DD/MM/YYYY",
+    "%d/%m/%y": "DD/MM/YY",
+    "%Y/%m/%d": "YYYY/MM/DD",
+}
+# written the way postgres writes integers and numerics back, no sign on zero, no leading zeros, no plus sign
+integer_pattern = re.compile(r'^(0|-?[1-9]\d{0,17})$')
+numeric_pattern = re.compile(r'^-?(0|[1-9]\d{0,30})(\.\d{1,30})?$')
+int4_range = (-2**31, 2**31 - 1)
+# text_format of the columns written back with ::text
+as_text = "text"
+
+
+def infer_column_schema(column):
+    """
+    :param column: a pandas series
+    :return: dictionary of structure { "type": postgres type, "text_format": None when the column is stored as it is,
+    a date format or "text" when it is stored typed and written back as text }, None when the column keeps the type
+    to_sql gives it
+    """
+    if pd.api.types.is_integer_dtype(column.dtype) and not pd.api.types.is_unsigned_integer_dtype(column.dtype):
+        fits_int4 = len(column) == 0 or (column.min() >= int4_range[0] and column.max() <= int4_range[1])
+        return {"type": "INTEGER" if fits_int4 else "BIGINT", "text_format": None}
+    if column.dtype != "object" or pd.api.types.infer_dtype(column, skipna=True) != "string":
+        return None
+
+    values = pd.Series(column.dropna().unique())
+    if len(values) == 0:
+        return None
+    if values.str.fullmatch(integer_pattern).all():
+        numbers = values.astype("int64")
+        fits_int4 = numbers.min() >= int4_range[0] and numbers.max() <= int4_range[1]
+        return {"type": "INTEGER" if fits_int4 else "BIGINT", "text_format": as_text}
+    if values.str.fullmatch(numeric_pattern).all():
+        return {"type": "NUMERIC", "text_format": as_text}
+    date_format = find_date_format(values)
+    if date_format is not None:
+        return {"type": "DATE", "text_format": date_format}
+    return None
+
+def find_date_format(values):
+    """:return: the format every value is written in, None when there is none"""
+    for date_format in date_formats:
+        dates = pd.to_datetime(values, format=date_format, errors='coerce')
+        if dates.notna().all() and (dates.dt.strftime(date_format) == values).all():
+            return date_format
+    return None
+
+def infer_schema(data_frame):
+    """:return: dictionary of structure { column: column schema } of the columns given a narrower type, see
+    infer_column_schema"""
+    schema = {}
+    for column in data_frame.columns:
+        column_schema = infer_column_schema(data_frame[column])
+        if column_schema is not None:
+            schema[str(column)] = column_schema
+    return schema
+
+def database_values(data_frame, schema):
+    """
+    :return: the frame with the values postgres can't read as they are rewritten, dates from their text format to ISO
+    """
+    converted = {}
+    for column in data_frame.columns:
+        text_format = schema.get(str(column), {}).get("text_format")
+        if text_format in date_formats:
+            values = data_frame[column].dropna().unique()
+            iso = pd.to_datetime(pd.Series(values), format=text_format).dt.strftime("%Y-%m-%d")
+            converted[column] = data_frame[column].map(dict(zip(values, iso)))
+    return data_frame.assign(**converted) if converted else data_frame
+
+def restore_expression(column, text_format):
+    """:return: the sql giving back the original text of a typed column"""
+    if text_format in date_formats:
+        return sql.SQL("to_char({}, {}) AS {}").format(
+            sql.Identifier(column), sql.Literal(date_formats[text_format]), sql.Identifier(column))
+    return sql.SQL("{}::text AS {}").format(sql.Identifier(column), sql.Identifier(column))
+
+def save_schema(cursor, table_name, schema):
+    """records the typed columns of a table, replacing what was recorded for it"""
+    cursor.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} (table_name TEXT, column_name TEXT, postgres_type TEXT, "
+                           "text_format TEXT)").format(sql.Identifier(schema_table)))
+    cursor.execute(sql.SQL("DELETE FROM {} WHERE table_name = %s").format(sql.Identifier(schema_table)), (table_name,))
+    for column, column_schema in (schema or {}).items():
+        if column_schema["text_format"] is not None:
+            cursor.execute(sql.SQL("INSERT INTO {} VALUES (%s, %s, %s, %s)").format(sql.Identifier(schema_table)),
+                           (table_name, column, column_schema["type"], column_schema["text_format"]))
+
+def stored_columns(cursor, table_name):
+    """
+    :return: the columns of the table in order and dictionary of structure { column: (postgres type, text_format) } of
+    its typed text columns
+    """
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (schema_table,))
+    typed_columns = {}
+    if cursor.fetchone()[0]:
+        cursor.execute(sql.SQL("SELECT column_name, postgres_type, text_format FROM {} WHERE table_name = %s")
+                       .format(sql.Identifier(schema_table)), (table_name,))
+        typed_columns = {column: (postgres_type, text_format) for column, postgres_type, text_format in cursor.fetchall()}
+    cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_schema = current_schema() "
+                   "AND table_name = %s ORDER BY ordinal_position", (table_name,))
+    return [row[0] for row in cursor.fetchall()], typed_columns
+
+def restored_select_list(columns, typed_columns):
+    """:return: the select list of the columns, the typed text columns written back as they were uploaded"""
+    return sql.SQL(", ").join(restore_expression(column, typed_columns[column][1]) if column in typed_columns
+                              else sql.Identifier(column) for column in columns)
+
+def restored_select_query(connection, table_name):
+    """
+    :param connection: an open sqlalchemy connection
+    :param table_name: the name of a stored table
+    :return: the query reading the table with its typed text columns written back as they were uploaded
+    """
+    with connection.connection.cursor() as cursor:
+        columns, typed_columns = stored_columns(cursor, table_name)
+        if len(typed_columns) == 0:
+            return sql.SQL("SELECT * FROM {}").format(sql.Identifier(table_name)).as_string(cursor)
+        return sql.SQL("SELECT {} FROM {}").format(restored_select_list(columns, typed_columns),
+                                                   sql.Identifier(table_name)).as_string(cursor)
@@ -0,0 +1,140 @@
+"""
+Indexes an uploaded table and its error table once they are loaded, so the reads by ID range and by column do not scan
+the whole table
+
+    ID - a primary key, or a BRIN index past brin_index_rows rows: the IDs follow the order the rows were loaded in,
+         so a BRIN index holding the ID range of every block of pages answers range queries at a fraction of the size
+         and build time of a btree. An ID column which turns out not to be unique also gets the BRIN index
+    columns - a btree on (column, ID) for each of the first max_window_index_columns columns, the table view pages
+              the rows sorted or filtered by a column with it (see row_window). A text column is indexed on the first
+              prefix_characters of its values, a btree entry can't hold more than about 2700 bytes. A column whose
+              index can't be built is read without one
+    errors<table> - a btree on (column_id, row_id), the errors of a column come out in row order, and one on row_id
+                    for the errors of a window of rows
+    CLUSTER - optional, rewrites the table in ID order and packs its pages. Only done when the IDs already follow the
+              order of the "index" column, the whole table reads return the rows in the order they are stored. The
+              error table keeps the order of the detectors for the same reason
+    ANALYZE - the planner gets the statistics of the new tables right away instead of waiting for autovacuum
+
+The indexes are named by index_name, a name made by appending to the table name would be cut at 63 bytes by postgres
+and two long table names could then ask for the same index
+"""
+import hashlib
+import time
+
+import psycopg2
+from psycopg2 import sql
+
+# tables with more rows than this get a BRIN index on ID instead of a primary key
+brin_index_rows = 5000000
+# the longest identifier postgres keeps, in bytes
+max_identifier_bytes = 63
+# the columns after these are not indexed for the table view, every index slows the upload down
+max_window_index_columns = 16
+# the characters of a text value its index holds, 4 bytes each at most
+prefix_characters = 256
+
+
+def index_name(table_name, kind, columns=()):
+    """
+    :param kind: what the index is for, kept in the name
+    :param columns: the columns of the index, part of the name when a table can have several indexes of the kind
+    :return: the name of the index, the start of the table name for reading it followed by the kind and a hash of the
+    table and the columns, at most max_identifier_bytes long
+    """
+    digest = hashlib.blake2b("\0".join([table_name, kind, *columns]).encode(), digest_size=8).hexdigest()
+    suffix = f"_{kind}_{digest}"
+    prefix = table_name.encode()[:max_identifier_bytes - len(suffix)].decode(errors="ignore")
+    return prefix + suffix
+
+def timed(timings, step, cursor, statement):
+    start = time.perf_counter()
+    cursor.execute(statement)
+    timings[step] = time.perf_counter() - start
+
+def index_id(cursor, table_name, rows, timings):
+    """:return: the kind of index the ID column got, "primary key" or "brin" """
+    if rows is None or rows <= brin_index_rows:
+        cursor.execute("SAVEPOINT buckaroo_primary_key")
+        try:
+            timed(timings, "id_index", cursor, sql.SQL('ALTER TABLE {} ADD CONSTRAINT {} PRIMARY KEY ("ID")').format(
+                sql.Identifier(table_name), sql.Identifier(index_name(table_name, "pkey"))))
+            cursor.execute("RELEASE SAVEPOINT buckaroo_primary_key")
+            return "primary key"
+        except (psycopg2.errors.UniqueViolation, psycopg2.errors.NotNullViolation):
+            cursor.execute("ROLLBACK TO SAVEPOINT buckaroo_primary_key")
+    timed(timings, "id_index", cursor, sql.SQL('CREATE INDEX {} ON {} USING brin ("ID")').format(
+        sql.Identifier(index_name(table_name, "id_brin")), sql.Identifier(table_name)))
+    return "brin"
+
+def text_columns(cursor, table_name):
+    """:return: the set of the columns of the table stored as text"""
+    cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_schema = current_schema() "
+                   "AND table_name = %s AND data_type = 'text'", (table_name,))
+    return {row[0] for row in cursor.fetchall()}
+
+def prefix(column):
+    return sql.SQL("left({}, {})").format(sql.Identifier(column), sql.Literal(prefix_characters))
+
+def index_window_columns(cursor, table_name, timings):
+    """
+    creates the btree of (column, ID) of the first max_window_index_columns columns of the table
+    :return: the columns which got one, a failed build is rolled back and the column left without it
+    """
+    cursor.execute("SELECT column_name FROM information_schema.columns WHERE table_schema = current_schema() "
+                   "AND table_name = %s AND column_name NOT IN ('ID', 'index') ORDER BY ordinal_position",
+                   (table_name,))
+    columns = [row[0] for row in cursor.fetchall()][:max_window_index_columns]
+    texts = text_columns(cursor, table_name)
+    indexed = []
+    start = time.perf_counter()
+    for column in columns:
+        expression = prefix(column) if column in texts else sql.Identifier(column)
+        cursor.execute("SAVEPOINT buckaroo_window_index")
+        try:
+            cursor.execute(sql.SQL('CREATE INDEX {} ON {} (({}), "ID")').format(
+                sql.Identifier(index_name(table_name, "window", [column])), sql.Identifier(table_name), expression))
+            cursor.execute("RELEASE SAVEPOINT buckaroo_window_index")
+            indexed.append(column)
+        except psycopg2.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT buckaroo_window_index")
+    timings["window_index"] = time.perf_counter() - start
+    return indexed
+
+def ids_follow_index(cursor, table_name):
+    """:return: whether ordering the table by ID keeps the rows in the order of its index column"""
+    cursor.execute(sql.SQL('SELECT NOT EXISTS (SELECT 1 FROM (SELECT "ID" < lag("ID") OVER (ORDER BY "index") AS '
+                           'descending FROM {}) AS steps WHERE descending)').format(sql.Identifier(table_name)))
+    return cursor.fetchone()[0]
+
+def organize_table(engine, table_name, rows=None, cluster=False):
+    """
+    Indexes a loaded table and its errors<table_name>, then analyzes both
+    :param engine: the database engine
+    :param table_name: the cleaned name of the table
+    :param rows: the rows of the table, chooses the index of the ID column, None when unknown
+    :param cluster: whether the table is rewritten in ID order, done only when its ID got a primary key and follows the
+    order of the rows
+    :return: dictionary of structure { "id_index", "window_columns", "clustered", "seconds": { step: seconds } }
+    """
+    error_table_name = "errors" + table_name
+    timings = {}
+    raw_connection = engine.raw_connection()
+    try:
+        with raw_connection.cursor() as cursor:
+            id_index = index_id(cursor, table_name, rows, timings)
+            window_columns = index_window_columns(cursor, table_name, timings)
+            timed(timings, "error_index", cursor, sql.SQL("CREATE INDEX {} ON {} (column_id, row_id)").format(
+                sql.Identifier(index_name(table_name, "errors_column_row")), sql.Identifier(error_table_name)))
+            timed(timings, "error_row_index", cursor, sql.SQL("CREATE INDEX {} ON {} (row_id)").format(
+                sql.Identifier(index_name(table_name, "errors_row")), sql.Identifier(error_table_name)))
+            clustered = cluster and id_index == "primary key" and ids_follow_index(cursor, table_name)
+            if clustered:
+                timed(timings, "cluster", cursor, sql.SQL("CLUSTER {} USING {}").format(
+                    sql.Identifier(table_name), sql.Identifier(index_name(table_name, "pkey"))))
+            timed(timings, "analyze", cursor, sql.SQL("ANALYZE {}, {}").format(
+                sql.Identifier(table_name), sql.Identifier(error_table_name)))
+        raw_connection.commit()
+    finally:
+        raw_connection.close()
+    return {"id_index": id_index, "window_columns": window_columns, "clustered": clustered, "seconds": timings}
@@ -0,0 +1,119 @@
+"""
+Runs uploads as background jobs on a small pool of threads and tracks how far along each job is
+
+A job moves through the phases of the streaming upload:
+    queued - waiting for a free worker
+    parse - the first pass over the file, finds the dtypes and counts the rows
+    detect - the statistics pass of the detectors
+    load - the flagging pass, every block is copied to the database and its errors staged
+    index - the table is committed and can be read, its error table is being built and both are indexed
+    done / failed
+The rows of the file are known after the parse pass, from then on the rows processed give the fraction of the job
+done and an estimate of the time left
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+upload_workers = 2
+# the passes over the file which each take about the same time, the estimate of the time left assumes so
+timed_phases = ["parse", "detect", "load"]
+# finished jobs are forgotten this long after they end
+finished_job_seconds = 60 * 60
+
+
+class UploadJob:
+    def __init__(self, filename):
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.phase = "queued"
+        self.rows_processed = 0
+        self.total_rows = None
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.lock = threading.Lock()
+
+    def update(self, phase, rows):
+        """progress callback of the upload, see store_csv_in_chunks"""
+        with self.lock:
+            if self.started is None:
+                self.started = time.time()
+            if self.phase == "parse" and phase != "parse":
+                self.total_rows = self.rows_processed
+            self.phase = phase
+            self.rows_processed = rows
+
+    def finish(self, result=None, error=None):
+        with self.lock:
+            self.phase = "failed" if error is not None else "done"
+            self.result = result
+            self.error = error
+            self.finished = time.time()
+
+    def eta_seconds(self):
+        """:return: the estimated seconds left, None before the rows of the file are counted"""
+        if self.phase in ("done", "failed"):
+            return 0.0
+        if self.total_rows is None or self.phase not in timed_phases or self.total_rows == 0:
+            return None
+        done = timed_phases.index(self.phase) + self.rows_processed / self.total_rows
+        fraction = done / len(timed_phases)
+        if fraction == 0:
+            return None
+        elapsed = time.time() - self.started
+        return elapsed * (1 - fraction) / fraction
+
+    def status(self):
+        """:return: dictionary the status endpoint returns"""
+        with self.lock:
+            return {
+                "job_id": self.job_id,
+                "filename": self.filename,
+                "phase": self.phase,
+                "rows_processed": self.rows_processed,
+                "total_rows": self.total_rows,
+                "eta_seconds": self.eta_seconds(),
+                # the table is committed before its error table is built, so the view can start with it
+                "table_ready": self.phase in ("index", "done"),
+                "result": self.result,
+                "error": self.error,
+            }
+
+class UploadJobs:
+    def __init__(self, max_workers=upload_workers):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload")
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, filename, work):
+        """
+        :param filename: the name of the uploaded file
+        :param work: called on a worker with the job, returns the result of the upload, an exception fails the job
+        :return: the new job
+        """
+        job = UploadJob(filename)
+        with self.lock:
+            self.forget_finished()
+            self.jobs[job.job_id] = job
+        self.executor.submit(self.run, job, work)
+        return job
+
+    def run(self, job, work):
+        try:
+            job.finish(result=work(job))
+        except Exception as e:
+            job.finish(error=str(e))
+
+    def get(self, job_id):
+        """:return: the job, None when there is no such job"""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def forget_finished(self):
+        now = time.time()
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job.finished is not None and now - job.finished > finished_job_seconds]:
+            del self.jobs[job_id]
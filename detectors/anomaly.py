@@ -1,31 +1,41 @@
 import numpy as np
-import pandas as pd
 
-def anomaly(data_frame):
-    """
-    determines whether a cell in a column of numeric values has a zscore > 2
-    :return:
-    """
-    error_map = {}
+from detectors.error_table import ErrorTable
+from detectors.fused_statistics import compute_fused_statistics, minimum_numeric_count
 
-    for column in data_frame.columns[1:]:
-        numeric_mask = pd.to_numeric(data_frame[column], errors='coerce').notna()
-        if numeric_mask.sum() < 10: continue
-        #TODO: this doesn't work when trying to upload any dataset other than the stackoverflow one, it has issues with the to_numeric call as well
-        data_frame[[column]] = data_frame[[column]].apply(pd.to_numeric, errors='coerce')
-        column_mean = data_frame[[column]].mean().iloc[0]
-        column_std = data_frame[[column]].std().iloc[0]
+# columns with fewer numeric values than this are not checked
+minimum_count = minimum_numeric_count
 
-        if column_std == 0 or column_std is None: continue
-
-        anomaly_mask = np.abs(data_frame[column] - column_mean) > 2 * column_std
-        row_locations = anomaly_mask[anomaly_mask].index
+def anomaly(data_frame, columns=None, statistics=None):
+    """
+    determines whether a cell in a column of numeric values has a zscore > 2, the input frame is not modified
+    :param data_frame: the datatable to run the detector on, the first column is expected to be the ID column
+    :param columns: the columns to check, all but the ID column by default
+    :param statistics: the fused statistics of the columns when they were already computed
+    :return: an ErrorTable of the anomalous cells
+    """
+    if columns is None:
+        columns = data_frame.columns[1:]
+    if statistics is None:
+        statistics = compute_fused_statistics(data_frame, columns)
+    ids = data_frame['ID'].to_numpy()
 
-        for row in row_locations:
-            if column not in error_map:
-                error_map[column] = {}
-                error_map[column][int(data_frame.loc[row, 'ID'])] = "anomaly"
-            else:
-                error_map[column][int(data_frame.loc[row, 'ID'])] = "anomaly"
-    return error_map
+    column_ids = {}
+    for column in columns:
+        column_statistics = statistics[column]
+        if column_statistics.numeric_count < minimum_count: continue
+        mask = anomaly_mask(column_statistics.numeric_values, column_statistics.mean, column_statistics.std)
+        column_ids[column] = ids[mask]
+    return ErrorTable.from_column_ids(column_ids, "anomaly")
 
+def anomaly_mask(values, mean, std, threshold=2):
+    """
+    flags the values which are more than threshold standard deviations from the mean
+    :param values: float array, nan values are never flagged
+    :return: boolean array with the same shape as values
+    """
+    # columns without any spread can not hold an anomaly
+    if std == 0 or np.isnan(std):
+        return np.zeros(len(values), dtype=bool)
+    with np.errstate(invalid='ignore'):
+        return np.abs(values - mean) > threshold * std
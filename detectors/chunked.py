@@ -0,0 +1,277 @@
+"""
+Runs the four detectors over a csv which is too large to load at once
+
+The file is streamed in blocks of rows three times:
+    1. dtype discovery - finds one dtype per column so every block is parsed the same way (the result matches reading
+       the whole file with low_memory=False), and decides which ID column the table gets
+    2. statistics - mergeable statistics of every column: count, mean and sum of squared deviations for anomaly,
+       merged with Chan's update, value counts for incomplete and type counts for datatype_mismatch
+    3. flagging - every block is checked against the merged statistics
+a column whose value counts were replaced by a sketch adds a pass between 2 and 3 to count its candidates
+
+Only the statistics are kept between the passes, so memory depends on the block size, not on the number of rows.
+With on_errors the errors of every block are handed out as they are found instead of being collected, the only
+state growing with the file is then the ID column of the file while its uniqueness is checked, 8 bytes a row.
+The value counts of a column are exact until they pass value_count_memory_cap, then they are replaced by a
+RareValueSketch (see rare_value_sketch.py) which needs one more pass to count its candidates exactly
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from detectors.anomaly import anomaly_mask, minimum_count
+from detectors.error_table import ErrorTable
+from detectors.fused_statistics import coerce_numeric, holds_mixed_types
+from detectors.incomplete import frequency_threshold, rare_count
+from detectors.missing_value import missing_mask
+from detectors.rare_value_sketch import RareValueSketch
+from detectors.type_profile import classify_values, count_types, find_majority_type
+
+chunk_row_count = 100000
+# the number of bytes the value counts of a single column may take
+value_count_memory_cap = 64 * 1024 * 1024
+# estimate of the bytes a value count takes besides the value itself
+value_count_overhead = 64
+error_types = ["anomaly", "incomplete", "missing", "mismatch"]
+
+
+class MergeableStatistics:
+    def __init__(self, dtype, memory_cap=value_count_memory_cap):
+        self.dtype = dtype
+        self.memory_cap = memory_cap
+        self.numeric_count = 0
+        self.mean = 0.0
+        # sum of the squared deviations from the mean
+        self.m2 = 0.0
+        # every value of a numeric column has the same type, so only the other columns are counted
+        self.type_counts = {} if holds_mixed_types(dtype) else None
+        self.value_counts = {} if dtype == 'object' else None
+        self.value_count_bytes = 0
+        self.sketch = None
+
+    def add_chunk(self, column):
+        """
+        Merges the statistics of a block of the column into these
+        :param column: the block as a pandas series
+        """
+        values = coerce_numeric(column)
+        values = values[~np.isnan(values)]
+        if len(values) > 0:
+            chunk_mean = values.mean()
+            deviations = values - chunk_mean
+            self.merge_moments(len(values), chunk_mean, float((deviations * deviations).sum()))
+
+        # columns with too many numeric values are never checked by incomplete, so their values stop being counted
+        if self.numeric_count > frequency_threshold:
+            self.value_counts = None
+            self.sketch = None
+        if self.type_counts is None:
+            return
+        chunk_counts = column.value_counts(sort=False)
+        for type_of_value, count in count_types(chunk_counts, classify_values(chunk_counts.index)).items():
+            self.type_counts[type_of_value] = self.type_counts.get(type_of_value, 0) + count
+        if self.sketch is not None:
+            self.sketch.add(chunk_counts.index, chunk_counts.to_numpy())
+        elif self.value_counts is not None:
+            self.count_values(chunk_counts)
+
+    def count_values(self, chunk_counts):
+        """merges the exact value counts of a block, switching to a sketch once they take more than the memory cap"""
+        for value, count in chunk_counts.items():
+            if value not in self.value_counts:
+                self.value_count_bytes += sys.getsizeof(value) + value_count_overhead
+            self.value_counts[value] = self.value_counts.get(value, 0) + count
+        if self.value_count_bytes > self.memory_cap:
+            self.sketch = RareValueSketch(self.memory_cap)
+            self.sketch.add(list(self.value_counts.keys()), list(self.value_counts.values()))
+            self.value_counts = None
+
+    def merge_moments(self, count, mean, m2):
+        """Chan's update, combines the moments of two sets of values"""
+        total = self.numeric_count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.numeric_count * count / total
+        self.numeric_count = total
+
+    def std(self):
+        if self.numeric_count < 2:
+            return np.nan
+        return float(np.sqrt(self.m2 / (self.numeric_count - 1)))
+
+    def majority_type(self):
+        return find_majority_type(self.type_counts) if self.type_counts is not None else None
+
+    def rare_values(self):
+        """the values incomplete flags when they are counted exactly, empty when the column is not checked"""
+        if self.value_counts is None:
+            return []
+        return [value for value, count in self.value_counts.items() if count < rare_count]
+
+    def rare_mask(self, column, rare_values):
+        """
+        :param column: a block of the column
+        :param rare_values: the rare values of the column when it is counted exactly
+        :return: boolean array flagging the cells incomplete reports, None when there are none
+        """
+        if self.sketch is not None:
+            return self.sketch.rare_mask(column)
+        if len(rare_values) > 0:
+            return column.isin(rare_values).to_numpy()
+        return None
+
+def read_chunks(source, chunk_size, dtype=None):
+    """
+    Streams a csv in blocks of rows
+    :param source: a path or a seekable file object, file objects are read from their start on every pass
+    """
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return pd.read_csv(source, chunksize=chunk_size, dtype=dtype)
+
+def discover_dtypes(source, chunk_size=chunk_row_count, on_progress=None):
+    """
+    First pass, finds the dtype of every column across all the blocks and the ID column the table gets
+    :param on_progress: called with the number of rows read after every block
+    :return: dictionary of structure { column: dtype } and whether the file's own ID column can be kept as the ID
+    """
+    chunk_dtypes = {}
+    id_values = []
+    id_numeric = True
+    rows = 0
+    for chunk in read_chunks(source, chunk_size):
+        rows += len(chunk)
+        if on_progress is not None:
+            on_progress(rows)
+        for column, dtype in chunk.dtypes.items():
+            chunk_dtypes.setdefault(column, set()).add(dtype)
+        if "ID" in chunk.columns and id_numeric:
+            numeric_ids = pd.to_numeric(chunk["ID"], errors='coerce')
+            id_numeric = bool(numeric_ids.notnull().all())
+            # only numeric ids can be kept, so only those are held for the uniqueness check
+            id_values.append(numeric_ids.to_numpy() if id_numeric else np.empty(0))
+
+    dtypes = {column: unify_dtypes(found) for column, found in chunk_dtypes.items()}
+    keep_id = "ID" in dtypes and id_numeric and pd.Series(np.concatenate(id_values)).is_unique
+    return dtypes, keep_id
+
+def unify_dtypes(dtypes):
+    """the dtype a column gets when its blocks were parsed with different dtypes"""
+    dtypes = set(dtypes)
+    if len(dtypes) == 1:
+        return dtypes.pop()
+    if all(pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype) for dtype in dtypes):
+        return np.dtype('float64')
+    return np.dtype('object')
+
+def with_id_column(chunk, keep_id, first_id):
+    """
+    Gives a block the same ID column set_id_column would give the whole table
+    :param first_id: the ID of the first row of the block when new IDs are made
+    """
+    if keep_id:
+        return chunk[["ID"] + [column for column in chunk.columns if column != "ID"]]
+    chunk = chunk.rename(columns={"ID": "Original_ID"})
+    chunk.insert(0, "ID", range(first_id, first_id + len(chunk)))
+    return chunk
+
+def detect_in_chunks(source, chunk_size=chunk_row_count, on_chunk=None, memory_cap=value_count_memory_cap,
+                     on_errors=None, on_progress=None):
+    """
+    Runs the four detectors over a csv without loading it whole
+    :param source: a path or a seekable file object holding the csv
+    :param chunk_size: the number of rows of a block
+    :param on_chunk: called with every block, with its ID column, during the flagging pass, this lets the caller
+    store the table in the same pass
+    :param memory_cap: the number of bytes the value counts of a single column may take
+    :param on_errors: called with the ErrorTable of every block during the flagging pass, the errors are then not
+    collected, a block's errors are ordered by detector, then column, then row
+    :param on_progress: called with the pass and the number of rows it read after every block, the passes are "parse"
+    for the dtype discovery, "detect" for the statistics and "load" for the flagging
+    :return: an ErrorTable of the errors of every detector, ordered the same way as the detectors on the whole table,
+    None when the errors were handed to on_errors
+    """
+    def report(phase, rows):
+        if on_progress is not None:
+            on_progress(phase, rows)
+
+    dtypes, keep_id = discover_dtypes(source, chunk_size, lambda rows: report("parse", rows))
+
+    statistics = {column: MergeableStatistics(dtype, memory_cap) for column, dtype in dtypes.items()}
+    rows = 0
+    for chunk in read_chunks(source, chunk_size, dtypes):
+        for column, column_statistics in statistics.items():
+            column_statistics.add_chunk(chunk[column])
+        rows += len(chunk)
+        report("detect", rows)
+
+    # the columns counted with a sketch need one more pass to count their candidates exactly
+    sketched = {column: column_statistics.sketch for column, column_statistics in statistics.items()
+                if column_statistics.sketch is not None}
+    if len(sketched) > 0:
+        for chunk in read_chunks(source, chunk_size, dtypes):
+            for column, sketch in sketched.items():
+                sketch.count_candidates(chunk[column].dropna())
+    rare_values = {column: column_statistics.rare_values() for column, column_statistics in statistics.items()}
+
+    flagged = {error_type: {} for error_type in error_types}
+    columns = None
+    first_id = 1
+    for chunk in read_chunks(source, chunk_size, dtypes):
+        chunk = with_id_column(chunk, keep_id, first_id)
+        first_id += len(chunk)
+        columns = list(chunk.columns)
+        if on_chunk is not None:
+            on_chunk(chunk)
+        flag_chunk(chunk, statistics, rare_values, flagged)
+        if on_errors is not None:
+            on_errors(collect_errors(flagged, columns))
+            flagged = {error_type: {} for error_type in error_types}
+        report("load", first_id - 1)
+
+    if on_errors is not None:
+        return None
+    if columns is None:
+        return ErrorTable.empty()
+    return collect_errors(flagged, columns)
+
+def collect_errors(flagged, columns):
+    """
+    :param flagged: dictionary of structure { error_type: { column: list of id arrays } }
+    :return: the ErrorTable of the flagged ids
+    """
+    # the detectors report the errors of a column in row order, and the columns in table order
+    tables = []
+    for error_type in error_types:
+        column_ids = {column: np.concatenate(flagged[error_type][column]) for column in columns
+                      if column in flagged[error_type]}
+        tables.append(ErrorTable.from_column_ids(column_ids, error_type))
+    return ErrorTable.concat(tables)
+
+def flag_chunk(chunk, statistics, rare_values, flagged):
+    """
+    Third pass on a single block, adds the ids it flags to flagged
+    :param flagged: dictionary of structure { error_type: { column: list of id arrays } }
+    """
+    ids = chunk["ID"].to_numpy()
+    for column in chunk.columns[1:]:
+        column_values = chunk[column]
+        column_statistics = statistics[original_name(column)]
+        column_rare_values = rare_values[original_name(column)]
+        masks = {"missing": missing_mask(column_values)}
+        if column_statistics.numeric_count >= minimum_count:
+            masks["anomaly"] = anomaly_mask(coerce_numeric(column_values), column_statistics.mean, column_statistics.std())
+        rare_mask = column_statistics.rare_mask(column_values, column_rare_values)
+        if rare_mask is not None:
+            masks["incomplete"] = rare_mask
+        if column_statistics.type_counts is not None:
+            distinct_values = column_values.dropna().unique()
+            types = classify_values(distinct_values)
+            masks["mismatch"] = column_values.isin(distinct_values[types != column_statistics.majority_type()]).to_numpy()
+        for error_type, mask in masks.items():
+            flagged[error_type].setdefault(column, []).append(ids[mask])
+
+def original_name(column):
+    """the name a column has in the csv, the file's ID column is renamed when it can't be used as the ID"""
+    return "ID" if column == "Original_ID" else column
@@ -0,0 +1,112 @@
+"""
+Running statistics of a column, these are what the detectors need to know about a column to flag its cells:
+    numeric count, sum and sum of squares - the moments anomaly builds its zscore from
+    value counts - how often each value occurs, incomplete flags the rare ones
+    type counts - how many values have each type, datatype_mismatch flags the ones outside the majority type
+
+The statistics of a whole column are computed from its value counts, so every distinct value is classified and coerced
+to a number once. They can then be updated with the values a wrangle removed or added so they don't need to be
+computed over the whole column again, an update returns new statistics so every data state keeps its own
+"""
+import numpy as np
+import pandas as pd
+
+from detectors.fused_statistics import coerce_numeric, holds_mixed_types
+from detectors.datatype_mismatch import value_type
+from detectors.type_profile import classify_values, count_types, find_majority_type
+
+
+class ColumnStatistics:
+    def __init__(self, dtype, numeric_count, shift, shifted_sum, shifted_square_sum, value_counts, type_counts):
+        self.dtype = dtype
+        self.numeric_count = numeric_count
+        # the sums are taken over (value - shift) to keep the variance accurate for large values
+        self.shift = shift
+        self.shifted_sum = shifted_sum
+        self.shifted_square_sum = shifted_square_sum
+        self.value_counts = value_counts
+        self.type_counts = type_counts
+
+    @classmethod
+    def from_series(cls, column):
+        """
+        Computes the statistics of a whole column from its value counts
+        :param column: the column as a pandas series
+        :return: the statistics
+        """
+        value_counts = column.value_counts()
+        if holds_mixed_types(column.dtype):
+            type_counts = count_types(value_counts, classify_values(value_counts.index))
+        elif len(value_counts) > 0:
+            # every value of a numeric or datetime column has the same python type
+            type_counts = {classify_values(value_counts.index[:1])[0]: int(value_counts.sum())}
+        else:
+            type_counts = {}
+
+        numbers = coerce_numeric(pd.Series(value_counts.index))
+        present = ~np.isnan(numbers)
+        numbers = numbers[present]
+        counts = value_counts.to_numpy(dtype=np.float64)[present]
+        numeric_count = int(counts.sum())
+        shift = float((numbers * counts).sum() / numeric_count) if numeric_count > 0 else 0.0
+        shifted = numbers - shift
+        return cls(column.dtype, numeric_count, shift, float((shifted * counts).sum()),
+                   float((shifted * shifted * counts).sum()), value_counts.to_dict(), type_counts)
+
+    def updated(self, removed_values, added_values):
+        """
+        Computes the statistics after some values of the column were removed and some added
+        :param removed_values: series of the values that left the column
+        :param added_values: series of the values that entered the column
+        :return: new statistics, this object is left unchanged
+        """
+        statistics = ColumnStatistics(self.dtype, self.numeric_count, self.shift, self.shifted_sum,
+                                      self.shifted_square_sum, self.value_counts.copy(), self.type_counts.copy())
+        statistics.count_values(removed_values, -1)
+        statistics.count_values(added_values, 1)
+        return statistics
+
+    def count_values(self, values, sign):
+        numeric_values = coerce_numeric(values)
+        shifted = numeric_values[~np.isnan(numeric_values)] - self.shift
+        self.numeric_count += sign * len(shifted)
+        self.shifted_sum += sign * float(shifted.sum())
+        self.shifted_square_sum += sign * float((shifted * shifted).sum())
+        for value, count in values.value_counts().items():
+            add_count(self.value_counts, value, sign * count)
+            add_count(self.type_counts, value_type(value), sign * count)
+
+    """
+    Values derived from the statistics
+    """
+    def mean(self):
+        if self.numeric_count == 0:
+            return np.nan
+        return self.shift + self.shifted_sum / self.numeric_count
+
+    def std(self):
+        if self.numeric_count < 2:
+            return np.nan
+        variance = (self.shifted_square_sum - self.shifted_sum * self.shifted_sum / self.numeric_count) / (self.numeric_count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def majority_type(self):
+        return find_majority_type(self.type_counts)
+
+    def has_majority_tie(self):
+        """
+        whether the majority type depends on the order the types were counted in, which the running counts don't keep
+        """
+        counts = sorted(self.type_counts.values(), reverse=True)
+        return len(counts) > 1 and counts[0] == counts[1]
+
+    def rare_values(self, rare_count):
+        return [value for value, count in self.value_counts.items() if count < rare_count]
+
+def add_count(counts, key, change):
+    """adds change to the count of key, dropping the key once its count reaches zero"""
+    count = counts.get(key, 0) + change
+    if count > 0:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
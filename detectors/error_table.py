@@ -0,0 +1,202 @@
+"""
+Columnar format the detectors use to report the errors they find
+
+Instead of a nested { column: { id: errorType } } dictionary every error is one entry of three parallel arrays:
+    row_id - the ID of the row the error is in
+    column_code - position of the column the error is in, inside column_names
+    error_code - position of the type of the error, inside error_types
+"""
+import gc
+
+import numpy as np
+import pandas as pd
+
+
+class ErrorTable:
+    def __init__(self, row_id, column_code, error_code, column_names, error_types):
+        self.row_id = np.asarray(row_id, dtype=np.int64)
+        self.column_code = np.asarray(column_code, dtype=np.int32)
+        self.error_code = np.asarray(error_code, dtype=np.int8)
+        self.column_names = list(column_names)
+        self.error_types = list(error_types)
+
+    def __len__(self):
+        return len(self.row_id)
+
+    def __repr__(self):
+        return f"ErrorTable({len(self)} errors, columns={self.column_names}, error_types={self.error_types})"
+
+    """
+    Constructors
+    """
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], [], [])
+
+    @classmethod
+    def from_column_ids(cls, column_ids, error_type):
+        """
+        Builds the table of a single detector from the ids it flagged in each column
+        :param column_ids: dictionary of structure { column: array of flagged ids }
+        :param error_type: the error type every flagged id gets
+        :return: the error table
+        """
+        column_ids = {column: np.asarray(ids) for column, ids in column_ids.items() if len(ids) > 0}
+        if len(column_ids) == 0:
+            return cls.empty()
+        lengths = [len(ids) for ids in column_ids.values()]
+        row_id = np.concatenate(list(column_ids.values()))
+        column_code = np.repeat(np.arange(len(column_ids)), lengths)
+        error_code = np.zeros(len(row_id))
+        return cls(row_id, column_code, error_code, column_ids.keys(), [error_type])
+
+    @classmethod
+    def from_dataframe(cls, error_df):
+        """
+        Builds the table from a long dataframe with the columns row_id, column_id and error_type, the format stored in the database
+        :param error_df: the dataframe to convert
+        :return: the error table
+        """
+        error_df = error_df[error_df["error_type"].notna()]
+        column_code, column_names = pd.factorize(error_df["column_id"])
+        error_code, error_types = pd.factorize(error_df["error_type"])
+        return cls(error_df["row_id"].to_numpy(), column_code, error_code, column_names, error_types)
+
+    @classmethod
+    def concat(cls, tables):
+        """
+        Stacks several tables into one, the dictionaries of the tables are merged
+        :param tables: the tables to stack
+        :return: the stacked error table
+        """
+        column_names = []
+        error_types = []
+        row_ids, column_codes, error_codes = [], [], []
+        for table in tables:
+            column_lookup = [merge_into_dictionary(column_names, name) for name in table.column_names]
+            error_lookup = [merge_into_dictionary(error_types, name) for name in table.error_types]
+            row_ids.append(table.row_id)
+            column_codes.append(np.asarray(column_lookup, dtype=np.int32)[table.column_code])
+            error_codes.append(np.asarray(error_lookup, dtype=np.int8)[table.error_code])
+        if len(row_ids) == 0:
+            return cls.empty()
+        return cls(np.concatenate(row_ids), np.concatenate(column_codes), np.concatenate(error_codes),
+                   column_names, error_types)
+
+    """
+    Selection functions, these all return a new table sharing the dictionaries of this one
+    """
+    def take(self, mask):
+        return ErrorTable(self.row_id[mask], self.column_code[mask], self.error_code[mask],
+                          self.column_names, self.error_types)
+
+    def between_ids(self, min_id, max_id):
+        return self.take((self.row_id >= min_id) & (self.row_id <= max_id))
+
+    def for_columns(self, column_names):
+        return self.take(np.isin(self.column_code, self.codes_of_columns(column_names)))
+
+    def without_columns(self, column_names):
+        return self.take(~np.isin(self.column_code, self.codes_of_columns(column_names)))
+
+    def without_ids(self, ids):
+        return self.take(~np.isin(self.row_id, ids))
+
+    def ids_for(self, column_name, error_type):
+        """the ids flagged with error_type in the column, in the order they are stored"""
+        if column_name not in self.column_names or error_type not in self.error_types:
+            return self.row_id[:0]
+        mask = (self.column_code == self.column_names.index(column_name)) & (self.error_code == self.error_types.index(error_type))
+        return self.row_id[mask]
+
+    def codes_of_columns(self, column_names):
+        wanted = set(column_names)
+        return [code for code, name in enumerate(self.column_names) if name in wanted]
+
+    """
+    Conversion functions
+    """
+    def column_id(self):
+        """the column name of every error"""
+        return np.asarray(self.column_names, dtype=object)[self.column_code]
+
+    def error_type(self):
+        """the error type of every error"""
+        return np.asarray(self.error_types, dtype=object)[self.error_code]
+
+    def to_nested_dict(self):
+        """
+        Groups the errors by column and row over the arrays: the (column, row) pairs are numbered in the order they
+        first appear and the errors sorted by column, then by that number, so every column and every pair is a slice and
+        python only makes the lists and dictionaries
+        :return: dictionary of structure { column: { row_id: [errorTypes] } }, the columns, rows and types in the order
+        they are stored
+        """
+        if len(self) == 0:
+            return {}
+        row_span = int(self.row_id.max()) - int(self.row_id.min()) + 1
+        if row_span * len(self.column_names) < 2**62:
+            pair_key = self.column_code.astype(np.int64) * row_span + (self.row_id - self.row_id.min())
+        else:
+            pair_key = pd.MultiIndex.from_arrays([self.column_code, self.row_id])
+        pair_code = pd.factorize(pair_key)[0]
+        column_rank = pd.factorize(self.column_code)[0]
+        order = np.lexsort((pair_code, column_rank))
+        pair_starts = slice_starts(pair_code[order])
+        pair_ends = np.r_[pair_starts[1:], len(order)]
+        pair_columns = self.column_code[order][pair_starts]
+        pair_rows = self.row_id[order][pair_starts].tolist()
+        column_starts = slice_starts(pair_columns)
+        column_ends = np.r_[column_starts[1:], len(pair_columns)]
+        types = self.error_type()[order].tolist()
+        # the lists are not cyclic, collecting while a million of them are made takes longer than making them
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            pair_types = [types[start:end] for start, end in zip(pair_starts.tolist(), pair_ends.tolist())]
+            return {self.column_names[pair_columns[start]]: dict(zip(pair_rows[start:end], pair_types[start:end]))
+                    for start, end in zip(column_starts.tolist(), column_ends.tolist())}
+        finally:
+            if collecting:
+                gc.enable()
+
+    def to_dataframe(self):
+        """
+        :return: long dataframe with the columns row_id, column_id and error_type, the names are stored as categoricals
+        """
+        return pd.DataFrame({
+            "row_id": self.row_id,
+            "column_id": pd.Categorical.from_codes(self.column_code, categories=pd.Index(self.column_names, dtype=object)),
+            "error_type": pd.Categorical.from_codes(self.error_code, categories=pd.Index(self.error_types, dtype=object)),
+        })
+
+    def to_error_map(self):
+        """
+        :return: a dictionary of structure: { column: { id: errorType } }
+        """
+        error_map = {}
+        for column, row_id, error_type in zip(self.column_id().tolist(), self.row_id.tolist(), self.error_type().tolist()):
+            if column not in error_map:
+                error_map[column] = {}
+            error_map[column][row_id] = error_type
+        return error_map
+
+def slice_starts(codes):
+    """the positions where a run of equal codes starts"""
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+def merge_into_dictionary(dictionary, name):
+    """returns the position of name in the dictionary list, appending it when it is not there yet"""
+    if name not in dictionary:
+        dictionary.append(name)
+    return dictionary.index(name)
+
+def as_error_table(errors):
+    """
+    Lets the consumers of the errors accept both the detector output and the long dataframe read from the database
+    :param errors: an ErrorTable or a dataframe with the columns row_id, column_id and error_type
+    :return: the errors as an ErrorTable
+    """
+    if isinstance(errors, ErrorTable):
+        return errors
+    return ErrorTable.from_dataframe(errors)
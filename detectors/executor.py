@@ -0,0 +1,104 @@
+"""
+Runs the four detectors over a table in parallel
+
+The columns are split into contiguous shards which are run on a thread pool, so every worker reads the same
+dataframe - none of the detectors modify their input and the table is never copied. A shard walks its columns one at
+a time, computing the fused statistics of the column once (see fused_statistics.py) and evaluating the four detectors
+on them before the next column, so the arrays of the statistics are only held for the column being checked.
+
+The shards cover ordered slices of the columns, so stacking the tables of a detector shard by shard gives the exact
+same ErrorTable as running the detectors one after another over the whole table
+
+Tall tables are not split into blocks of rows. Every rule compares a cell with statistics of its whole column (the mean
+and std of anomaly, the value counts of incomplete, the majority type of datatype_mismatch), so blocks would each need
+partial statistics merged before any cell is flagged, and moments merged block by block differ from the whole column's
+in the last bits, which can flip a cell sitting on the zscore threshold and break the exact match. A column shard already
+reads its rows in place whatever the height of the table, and the files too large for memory are streamed in blocks of
+rows by detect_in_chunks (see chunked.py), which accepts that merge
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from detectors.anomaly import anomaly
+from detectors.datatype_mismatch import datatype_mismatch
+from detectors.error_table import ErrorTable
+from detectors.fused_statistics import compute_fused_statistics
+from detectors.incomplete import incomplete
+from detectors.missing_value import missing_value
+
+detectors = [("anomaly", anomaly), ("incomplete", incomplete), ("missing", missing_value), ("mismatch", datatype_mismatch)]
+
+
+def default_worker_count():
+    return min(8, os.cpu_count() or 1)
+
+def run_detectors_sequential(data_frame, columns=None):
+    """
+    Runs the detectors one after another over the whole table
+    :param data_frame: the datatable, the first column is expected to be the ID column
+    :param columns: the columns to check, every column by default
+    :return: the ErrorTable of every detector and dictionary of structure { stage: seconds }, the stages are the
+    statistics and each detector
+    """
+    if columns is None:
+        columns = data_frame.columns
+    tables, timings = run_shard(data_frame, list(columns))
+    return ErrorTable.concat([tables[name] for name, _ in detectors]), timings
+
+def run_detectors_parallel(data_frame, max_workers=None, columns=None):
+    """
+    Runs the detectors over shards of the table on a thread pool
+    :param data_frame: the datatable, the first column is expected to be the ID column
+    :param max_workers: the number of threads, defaults to the number of cpus (at most 8)
+    :param columns: the columns to check, every column by default
+    :return: the ErrorTable of every detector and dictionary of structure { stage: seconds }, the seconds of a
+    stage are the sum of the time it took in every shard
+    """
+    if max_workers is None:
+        max_workers = default_worker_count()
+    if columns is None:
+        columns = data_frame.columns
+    if max_workers <= 1:
+        return run_detectors_sequential(data_frame, columns)
+
+    shards = column_shards(columns, max_workers * 2)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(lambda shard: run_shard(data_frame, shard), shards))
+
+    timings = {}
+    for _, shard_timings in results:
+        for stage, seconds in shard_timings.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+    tables = [shard_tables[name] for name, _ in detectors for shard_tables, _ in results]
+    return ErrorTable.concat(tables), timings
+
+def run_shard(data_frame, columns):
+    """
+    Computes the statistics of a slice of the columns and runs every detector on them, column by column
+    :return: dictionary of structure { detector: ErrorTable } and dictionary of structure { stage: seconds }
+    """
+    timings = {"statistics": 0.0, **{name: 0.0 for name, _ in detectors}}
+    column_tables = {name: [] for name, _ in detectors}
+    for column in columns:
+        start = time.perf_counter()
+        # replaced by the next column's, the statistics of a column are dropped once its rules have run
+        statistics = compute_fused_statistics(data_frame, [column])
+        timings["statistics"] += time.perf_counter() - start
+        for name, detector in detectors:
+            # missing_value checks the ID column too, the other detectors skip it
+            if column == data_frame.columns[0] and detector is not missing_value: continue
+            start = time.perf_counter()
+            column_tables[name].append(detector(data_frame, [column], statistics))
+            timings[name] += time.perf_counter() - start
+    return {name: ErrorTable.concat(tables) for name, tables in column_tables.items()}, timings
+
+def column_shards(columns, shard_count):
+    """splits the columns into at most shard_count contiguous, non empty slices"""
+    columns = list(columns)
+    if len(columns) == 0:
+        return []
+    return [list(shard) for shard in np.array_split(np.asarray(columns, dtype=object), min(shard_count, len(columns)))
+            if len(shard) > 0]
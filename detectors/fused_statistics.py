@@ -0,0 +1,71 @@
+"""
+Statistics stage shared by the four detectors
+
+Every column is walked once to compute what the detectors need to know about it:
+    null mask - missing_value
+    numeric coercion, numeric count and moments - anomaly, incomplete checks the numeric count too
+    value counts and the type profile built from them - incomplete and datatype_mismatch
+
+The detectors are then rules evaluated on these results, so no column is coerced or counted more than once. Only the
+null mask and the numeric values are as long as the column, the values are only kept for the columns with enough
+numbers for anomaly to check, and the executor runs the rules column by column so the arrays of a single column are
+held at a time
+"""
+import numpy as np
+import pandas as pd
+
+from detectors.type_profile import ColumnProfile, classify_values
+
+# anomaly does not check the columns with fewer numeric values than this, their values are not kept
+minimum_numeric_count = 10
+
+class FusedStatistics:
+    def __init__(self, column):
+        self.dtype = column.dtype
+        self.null_mask = column.isna().to_numpy()
+        numeric_values = coerce_numeric(column)
+        numeric_mask = ~np.isnan(numeric_values)
+        self.numeric_count = int(np.count_nonzero(numeric_mask))
+        self.mean, self.std = column_moments(numeric_values, numeric_mask, self.numeric_count)
+        self.numeric_values = numeric_values if self.numeric_count >= minimum_numeric_count else None
+
+        # every value of a numeric or datetime column has the same type, so there is nothing to count the types of
+        self.value_counts = None
+        self.profile = None
+        if holds_mixed_types(column.dtype):
+            self.value_counts = column.value_counts()
+            self.profile = ColumnProfile(self.value_counts, classify_values(self.value_counts.index), numeric_mask,
+                                         int(self.null_mask.sum()))
+
+def compute_fused_statistics(data_frame, columns):
+    """
+    :param data_frame: the datatable
+    :param columns: the columns to compute the statistics of
+    :return: dictionary of structure { column: FusedStatistics }
+    """
+    return {column: FusedStatistics(data_frame[column]) for column in columns}
+
+def coerce_numeric(column):
+    """
+    :return: the values of the column as a float array, values which are not numbers become nan
+    """
+    return pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+def column_moments(values, valid, count):
+    """
+    :param values: float array, nan values are ignored
+    :param valid: mask of the values which are not nan
+    :param count: the number of values which are not nan
+    :return: the mean and the sample standard deviation of the values, nan when there are fewer than 2 values
+    """
+    if count < 2:
+        return np.nan, np.nan
+    mean = np.where(valid, values, 0).sum() / count
+    deviations = values - mean
+    std = np.sqrt(np.where(valid, deviations * deviations, 0).sum() / (count - 1))
+    return mean, std
+
+def holds_mixed_types(dtype):
+    """whether the values of a column with this dtype can have different python types"""
+    return not (pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype) or
+                pd.api.types.is_timedelta64_dtype(dtype))
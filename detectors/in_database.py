@@ -0,0 +1,189 @@
+"""
+The four detectors written in SQL, so a table already stored in PostgreSQL can be checked where it lives
+
+install_sql_detectors creates the functions below in the database, run_sql_detectors calls buckaroo_detect which
+fills errors<table> with one INSERT ... SELECT per detector and column, no row of the table goes through python:
+    anomaly - mean and standard deviation as window aggregates over the numeric values of the column
+    incomplete - counts of every value of text columns, the values counted fewer than rare_count times are flagged
+    missing - null cells and the missing strings
+    mismatch - every value of a text column is typed numeric or str with a regex, the values outside the majority type
+               are flagged
+
+The thresholds are passed in from the python detectors so both modes use the same parameters. Text is coerced to a
+number with a regex instead of pd.to_numeric, so spellings like 'inf' or '1e999' are not counted as numbers, and ties
+between the majority types go to the type of the most common value
+"""
+from psycopg2 import sql
+from sqlalchemy import text
+
+from data_management.schema_inference import restored_select_query
+
+from detectors.anomaly import minimum_count
+from detectors.incomplete import frequency_threshold, rare_count
+from detectors.missing_value import missing_strings
+from detectors.type_profile import numeric_string_pattern
+
+install_statements = [
+r"""
+CREATE OR REPLACE FUNCTION buckaroo_numeric(value text) RETURNS double precision
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE WHEN length(value) <= 200 AND value ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d{1,2})?\s*$'
+                THEN value::double precision END
+$$
+""",
+r"""
+CREATE OR REPLACE FUNCTION buckaroo_numeric_expression(column_name text, data_type text) RETURNS text
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN data_type IN ('smallint', 'integer', 'bigint', 'real', 'double precision', 'numeric')
+            THEN format('NULLIF(%I::double precision, ''NaN'')', column_name)
+        WHEN data_type = 'boolean' THEN format('%I::int::double precision', column_name)
+        WHEN data_type IN ('text', 'character varying') THEN format('buckaroo_numeric(%I)', column_name)
+    END
+$$
+""",
+r"""
+CREATE OR REPLACE FUNCTION buckaroo_detect(table_name text, minimum_count int, frequency_threshold int,
+                                           rare_count int, missing_strings text[], numeric_pattern text,
+                                           source_name text)
+RETURNS bigint LANGUAGE plpgsql AS $$
+DECLARE
+    errors_table text := 'errors' || table_name;
+    -- the relation the values are read from, a view giving the typed columns back as the text they were uploaded as
+    source_table text := coalesce(source_name, table_name);
+    order_column text := 'ID';
+    detector text;
+    col record;
+    numeric_expression text;
+    numeric_count bigint;
+    inserted bigint;
+BEGIN
+    -- tables written by to_sql keep the position of each row in their index column
+    IF EXISTS (SELECT 1 FROM information_schema.columns AS c WHERE c.table_schema = current_schema()
+               AND c.table_name = source_table AND c.column_name = 'index') THEN
+        order_column := 'index';
+    END IF;
+
+    EXECUTE format('DROP TABLE IF EXISTS %I', errors_table);
+    EXECUTE format('CREATE TABLE %I ("index" bigint GENERATED BY DEFAULT AS IDENTITY (MINVALUE 0 START WITH 0), '
+                   'row_id bigint, column_id text, error_type text)', errors_table);
+
+    FOREACH detector IN ARRAY ARRAY['anomaly', 'incomplete', 'missing', 'mismatch'] LOOP
+        FOR col IN SELECT c.column_name, c.data_type FROM information_schema.columns AS c
+                   WHERE c.table_schema = current_schema() AND c.table_name = source_table
+                   AND c.column_name <> 'index' ORDER BY c.ordinal_position LOOP
+            -- missing_value is the only detector which checks the ID column
+            CONTINUE WHEN col.column_name = 'ID' AND detector <> 'missing';
+            numeric_expression := buckaroo_numeric_expression(col.column_name, col.data_type);
+
+            IF detector = 'anomaly' AND numeric_expression IS NOT NULL THEN
+                EXECUTE format($query$
+                    INSERT INTO %1$I (row_id, column_id, error_type)
+                    SELECT "ID", %2$L, 'anomaly' FROM (
+                        SELECT "ID", %3$I AS position, value, count(value) OVER () AS n,
+                               avg(value) OVER () AS mean, stddev_samp(value) OVER () AS std
+                        FROM (SELECT "ID", %3$I, %4$s AS value FROM %5$I) AS coerced
+                    ) AS moments
+                    WHERE n >= %6$s AND std > 0 AND abs(value - mean) > 2 * std
+                    ORDER BY position
+                $query$, errors_table, col.column_name, order_column, numeric_expression, source_table, minimum_count);
+
+            ELSIF detector = 'incomplete' AND col.data_type IN ('text', 'character varying') THEN
+                EXECUTE format('SELECT count(%s) FROM %I', numeric_expression, source_table) INTO numeric_count;
+                CONTINUE WHEN numeric_count > frequency_threshold;
+                EXECUTE format($query$
+                    INSERT INTO %1$I (row_id, column_id, error_type)
+                    SELECT "ID", %2$L, 'incomplete' FROM (
+                        SELECT "ID", %3$I AS position, count(*) OVER (PARTITION BY %4$I) AS occurrences
+                        FROM %5$I WHERE %4$I IS NOT NULL
+                    ) AS counted
+                    WHERE occurrences < %6$s
+                    ORDER BY position
+                $query$, errors_table, col.column_name, order_column, col.column_name, source_table, rare_count);
+
+            ELSIF detector = 'missing' THEN
+                EXECUTE format($query$
+                    INSERT INTO %1$I (row_id, column_id, error_type)
+                    SELECT "ID", %2$L, 'missing' FROM %3$I
+                    WHERE %4$I IS NULL OR %4$I::text = ANY(%5$L::text[])
+                        OR (%6$L IN ('real', 'double precision') AND %4$I::text = 'NaN')
+                    ORDER BY %7$I
+                $query$, errors_table, col.column_name, source_table, col.column_name,
+                   CASE WHEN col.data_type IN ('text', 'character varying') THEN missing_strings ELSE ARRAY[]::text[] END,
+                   col.data_type, order_column);
+
+            ELSIF detector = 'mismatch' AND col.data_type IN ('text', 'character varying') THEN
+                EXECUTE format($query$
+                    INSERT INTO %1$I (row_id, column_id, error_type)
+                    WITH typed AS (
+                        SELECT "ID", %3$I AS position, %4$I AS value,
+                               CASE WHEN regexp_replace(%4$I, '^\s+|\s+$', '', 'g') ~ %6$L
+                                    THEN 'numeric' ELSE 'str' END AS value_type
+                        FROM %5$I WHERE %4$I IS NOT NULL
+                    ), value_counts AS (
+                        SELECT value, value_type, count(*) AS occurrences, min(position) AS first_position
+                        FROM typed GROUP BY value, value_type
+                    ), majority AS (
+                        SELECT value_type FROM value_counts GROUP BY value_type
+                        ORDER BY sum(occurrences) DESC, max(occurrences) DESC, min(first_position)
+                        LIMIT 1
+                    )
+                    SELECT "ID", %2$L, 'mismatch' FROM typed
+                    WHERE value_type <> (SELECT value_type FROM majority)
+                    ORDER BY position
+                $query$, errors_table, col.column_name, order_column, col.column_name, source_table, numeric_pattern);
+            END IF;
+        END LOOP;
+    END LOOP;
+
+    EXECUTE format('SELECT count(*) FROM %I', errors_table) INTO inserted;
+    RETURN inserted;
+END
+$$
+""",
+]
+
+
+def install_sql_detectors(connection):
+    """
+    Creates or replaces the detector functions in the database
+    :param connection: an open sqlalchemy connection
+    """
+    # run without parameters so the driver leaves the % of format() alone
+    cursor = connection.connection.cursor()
+    for statement in install_statements:
+        cursor.execute(statement)
+    cursor.close()
+
+def run_sql_detectors(engine, table_name):
+    """
+    Runs the detectors inside the database on a stored table and writes their errors to errors<table_name>, a table
+    with typed text columns is read through a view giving them back as the text they were uploaded as
+    :param engine: the database engine
+    :param table_name: the cleaned name of the table, it needs an ID column
+    :return: the number of errors written
+    """
+    with engine.begin() as connection:
+        install_sql_detectors(connection)
+        source_name = None
+        select_query = restored_select_query(connection, table_name)
+        if not select_query.startswith("SELECT * "):
+            source_name = table_name + "_as_text"
+            with connection.connection.cursor() as cursor:
+                cursor.execute(sql.SQL("CREATE OR REPLACE VIEW {} AS ").format(sql.Identifier(source_name))
+                               .as_string(cursor) + select_query)
+        query = text("SELECT buckaroo_detect(:table_name, :minimum_count, :frequency_threshold, :rare_count, "
+                     ":missing_strings, :numeric_pattern, :source_name)")
+        inserted = connection.execute(query, {
+            "table_name": table_name,
+            "minimum_count": minimum_count,
+            "frequency_threshold": frequency_threshold,
+            "rare_count": rare_count,
+            "missing_strings": list(missing_strings),
+            "numeric_pattern": numeric_string_pattern,
+            "source_name": source_name,
+        }).scalar()
+        if source_name is not None:
+            with connection.connection.cursor() as cursor:
+                cursor.execute(sql.SQL("DROP VIEW {}").format(sql.Identifier(source_name)))
+        return inserted
@@ -1,22 +1,30 @@
-import pandas as pd
-def incomplete(data_frame):
+from detectors.error_table import ErrorTable
+from detectors.fused_statistics import compute_fused_statistics
+
+# columns with more numeric values than this are not checked
+frequency_threshold = 10
+# values seen fewer times than this are incomplete
+rare_count = 3
+
+def incomplete(data_frame, columns=None, statistics=None):
     """
     Flags cells which have a low occurrence (< 3)
-    :return:
+    :param columns: the columns to check, all but the ID column by default
+    :param statistics: the fused statistics of the columns when they were already computed
+    :return: an ErrorTable of the incomplete cells
     """
-    error_map = {}
-    frequency_threshold = 10
-    for column in data_frame.columns[1:]:
-        numeric_mask = pd.to_numeric(data_frame[column], errors='coerce').notna()
-        if numeric_mask.sum() > frequency_threshold: continue
-        if data_frame[column].dtype == 'object':
-            value_counts = data_frame[column].value_counts()
-            rare_values = value_counts[value_counts < 3].index
+    if columns is None:
+        columns = data_frame.columns[1:]
+    if statistics is None:
+        statistics = compute_fused_statistics(data_frame, columns)
+    column_ids = {}
+    for column in columns:
+        column_statistics = statistics[column]
+        if column_statistics.numeric_count > frequency_threshold: continue
+        if column_statistics.dtype == 'object':
+            value_counts = column_statistics.value_counts
+            rare_values = value_counts[value_counts < rare_count].index
+            if len(rare_values) == 0: continue
             mask = data_frame[column].isin(rare_values)
-            rare_ids = data_frame.loc[mask, 'ID'].tolist()
-            if len(rare_ids) > 0:
-                if column not in error_map:
-                    error_map[column] = {}
-                for rare_id in rare_ids:
-                    error_map[column][rare_id] = "incomplete"
-    return error_map
\ No newline at end of file
+            column_ids[column] = data_frame.loc[mask, 'ID'].to_numpy()
+    return ErrorTable.from_column_ids(column_ids, "incomplete")
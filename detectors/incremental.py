@@ -0,0 +1,192 @@
+"""
+Re-evaluates the detectors after a wrangle without running them over the whole table again
+
+The statistics of every column (see column_statistics.py) are updated with only the values the wrangle changed,
+a column is only re-flagged when its updated statistics change which of its cells are errors, otherwise the flags
+of the unchanged cells are kept and only the changed cells are checked
+"""
+import numpy as np
+
+from detectors.anomaly import anomaly_mask, minimum_count
+from detectors.column_statistics import ColumnStatistics
+from detectors.datatype_mismatch import value_type
+from detectors.error_table import ErrorTable
+from detectors.fused_statistics import coerce_numeric
+from detectors.incomplete import frequency_threshold, rare_count
+from detectors.missing_value import missing_mask
+
+error_types = ["anomaly", "incomplete", "missing", "mismatch"]
+
+
+def build_statistics(data_frame):
+    """
+    Computes the statistics of every column the detectors check
+    :param data_frame: the datatable, with an ID column
+    :return: dictionary of structure { column: ColumnStatistics }
+    """
+    return {column: ColumnStatistics.from_series(data_frame[column]) for column in data_frame.columns if column != 'ID'}
+
+def detect_after_impute(data_frame, errors, statistics, column, imputed_ids, previous_values):
+    """
+    Updates the errors after the values of some rows of a single column were replaced
+    :param data_frame: the datatable after the wrangle
+    :param errors: the ErrorTable of the datatable before the wrangle
+    :param statistics: the column statistics of the datatable before the wrangle
+    :param column: the column the wrangle changed
+    :param imputed_ids: the ids of the rows that were changed
+    :param previous_values: series of the values the changed rows held before the wrangle
+    :return: the new ErrorTable and the new column statistics
+    """
+    statistics = dict(statistics)
+    imputed_ids = np.asarray(imputed_ids, dtype=np.int64)
+    changed_mask = data_frame['ID'].isin(imputed_ids).to_numpy()
+    new_values = data_frame.loc[changed_mask, column]
+    old_statistics = statistics[column]
+
+    if old_statistics.dtype != data_frame[column].dtype:
+        # the wrangle changed the type of the whole column, so every cell may have changed
+        statistics[column] = ColumnStatistics.from_series(data_frame[column])
+        return replace_column_errors(errors, column, detect_column(data_frame, column, statistics[column])), statistics
+
+    new_statistics = old_statistics.updated(previous_values, new_values)
+    if new_statistics.has_majority_tie():
+        new_statistics = ColumnStatistics.from_series(data_frame[column])
+    statistics[column] = new_statistics
+
+    ids = data_frame['ID'].to_numpy()
+    column_values = data_frame[column]
+    changed_ids = ids[changed_mask]
+    column_ids = {}
+
+    if is_anomaly_checked(old_statistics) or is_anomaly_checked(new_statistics):
+        column_ids["anomaly"] = ids[anomaly_column_mask(column_values, new_statistics)]
+    else:
+        column_ids["anomaly"] = changed_ids[:0]
+
+    if is_incomplete_checked(old_statistics) != is_incomplete_checked(new_statistics):
+        column_ids["incomplete"] = ids[incomplete_column_mask(column_values, new_statistics)]
+    elif is_incomplete_checked(new_statistics):
+        switched_values = values_changing_rarity(old_statistics, new_statistics, list(previous_values.dropna()) + list(new_values.dropna()))
+        if len(switched_values) > 0:
+            column_ids["incomplete"] = ids[incomplete_column_mask(column_values, new_statistics)]
+        else:
+            rare_values = new_statistics.rare_values(rare_count)
+            column_ids["incomplete"] = keep_and_add(errors.ids_for(column, "incomplete"), imputed_ids,
+                                                    changed_ids[new_values.isin(rare_values).to_numpy()])
+    else:
+        column_ids["incomplete"] = changed_ids[:0]
+
+    column_ids["missing"] = keep_and_add(errors.ids_for(column, "missing"), imputed_ids,
+                                         changed_ids[missing_mask(new_values)])
+
+    if old_statistics.majority_type() != new_statistics.majority_type():
+        column_ids["mismatch"] = ids[mismatch_column_mask(column_values, new_statistics)]
+    else:
+        present = new_values.notna().to_numpy()
+        new_types = np.asarray([value_type(value) for value in new_values[present]], dtype=object)
+        mismatched_ids = changed_ids[present][new_types != new_statistics.majority_type()]
+        column_ids["mismatch"] = keep_and_add(errors.ids_for(column, "mismatch"), imputed_ids, mismatched_ids)
+
+    column_errors = ErrorTable.concat([ErrorTable.from_column_ids({column: column_ids[error_type]}, error_type)
+                                       for error_type in error_types])
+    return replace_column_errors(errors, column, column_errors), statistics
+
+def detect_after_remove(data_frame, errors, statistics, removed_rows):
+    """
+    Updates the errors after some rows were removed from the datatable
+    :param data_frame: the datatable after the wrangle
+    :param errors: the ErrorTable of the datatable before the wrangle
+    :param statistics: the column statistics of the datatable before the wrangle
+    :param removed_rows: dataframe of the rows the wrangle removed
+    :return: the new ErrorTable and the new column statistics
+    """
+    statistics = dict(statistics)
+    errors = errors.without_ids(removed_rows['ID'].to_numpy())
+    if len(removed_rows) == 0:
+        return errors, statistics
+
+    for column in statistics:
+        old_statistics = statistics[column]
+        new_statistics = old_statistics.updated(removed_rows[column], removed_rows[column].iloc[:0])
+        if new_statistics.has_majority_tie():
+            new_statistics = ColumnStatistics.from_series(data_frame[column])
+        statistics[column] = new_statistics
+
+        column_values = data_frame[column]
+        ids = data_frame['ID'].to_numpy()
+
+        anomaly_checked = is_anomaly_checked(old_statistics) or is_anomaly_checked(new_statistics)
+        if anomaly_checked and old_statistics.numeric_count != new_statistics.numeric_count:
+            errors = replace_errors(errors, column, "anomaly", ids[anomaly_column_mask(column_values, new_statistics)])
+
+        if is_incomplete_checked(old_statistics) != is_incomplete_checked(new_statistics) or (
+                is_incomplete_checked(new_statistics) and
+                len(values_changing_rarity(old_statistics, new_statistics, removed_rows[column].dropna().unique())) > 0):
+            errors = replace_errors(errors, column, "incomplete", ids[incomplete_column_mask(column_values, new_statistics)])
+
+        if old_statistics.majority_type() != new_statistics.majority_type():
+            errors = replace_errors(errors, column, "mismatch", ids[mismatch_column_mask(column_values, new_statistics)])
+    return errors, statistics
+
+"""
+Rules of the detectors evaluated on a whole column from its statistics
+"""
+def detect_column(data_frame, column, column_statistics):
+    """
+    runs the four detectors on a single column
+    :return: the ErrorTable of the column
+    """
+    ids = data_frame['ID'].to_numpy()
+    column_values = data_frame[column]
+    masks = [anomaly_column_mask(column_values, column_statistics), incomplete_column_mask(column_values, column_statistics),
+             missing_mask(column_values), mismatch_column_mask(column_values, column_statistics)]
+    return ErrorTable.concat([ErrorTable.from_column_ids({column: ids[mask]}, error_type)
+                              for mask, error_type in zip(masks, error_types)])
+
+def is_anomaly_checked(column_statistics):
+    return column_statistics.numeric_count >= minimum_count
+
+def is_incomplete_checked(column_statistics):
+    return column_statistics.numeric_count <= frequency_threshold and column_statistics.dtype == 'object'
+
+def anomaly_column_mask(column_values, column_statistics):
+    if not is_anomaly_checked(column_statistics):
+        return np.zeros(len(column_values), dtype=bool)
+    return anomaly_mask(coerce_numeric(column_values), column_statistics.mean(), column_statistics.std())
+
+def incomplete_column_mask(column_values, column_statistics):
+    if not is_incomplete_checked(column_statistics):
+        return np.zeros(len(column_values), dtype=bool)
+    return column_values.isin(column_statistics.rare_values(rare_count)).to_numpy()
+
+def mismatch_column_mask(column_values, column_statistics):
+    majority_type = column_statistics.majority_type()
+    mismatched_values = [value for value in column_statistics.value_counts if value_type(value) != majority_type]
+    return column_values.isin(mismatched_values).to_numpy()
+
+def values_changing_rarity(old_statistics, new_statistics, values):
+    """the values whose rare status differs between the old and new statistics, ignoring values no longer present"""
+    switched = []
+    for value in set(values):
+        new_count = new_statistics.value_counts.get(value, 0)
+        if new_count > 0 and (old_statistics.value_counts.get(value, 0) < rare_count) != (new_count < rare_count):
+            switched.append(value)
+    return switched
+
+"""
+Error table helpers
+"""
+def keep_and_add(flagged_ids, changed_ids, newly_flagged_ids):
+    """keeps the flags of the unchanged rows and adds the flags found for the changed rows"""
+    kept_ids = flagged_ids[~np.isin(flagged_ids, changed_ids)]
+    return np.concatenate([kept_ids, np.asarray(newly_flagged_ids, dtype=np.int64)])
+
+def replace_errors(errors, column, error_type, ids):
+    """replaces the flags of a single detector in a single column"""
+    code_mask = np.zeros(len(errors), dtype=bool)
+    if column in errors.column_names and error_type in errors.error_types:
+        code_mask = (errors.column_code == errors.column_names.index(column)) & (errors.error_code == errors.error_types.index(error_type))
+    return ErrorTable.concat([errors.take(~code_mask), ErrorTable.from_column_ids({column: ids}, error_type)])
+
+def replace_column_errors(errors, column, column_errors):
+    return ErrorTable.concat([errors.without_columns([column]), column_errors])
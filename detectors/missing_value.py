@@ -1,26 +1,46 @@
-from zipfile import error
+import numpy as np
 
-import pandas as pd
-from numpy.ma.core import indices
+from detectors.error_table import ErrorTable
+from detectors.fused_statistics import holds_mixed_types
 
+# strings which stand for a missing value
+missing_strings = ['null', 'undefined']
 
-def missing_value(data_frame):
+def missing_value(data_frame, columns=None, statistics=None):
     """
     goes through each cell in the datatable and checks to see if the cell is
     null, undefined, an empty string, or a null/undefined string
+    the cells are marked in a single boolean matrix, the table is never turned into strings
     :param data_frame: the datatable to run the detector on
-    :return: a dictionary of structure: { column: { id: errorType } }
+    :param columns: the columns to check, every column by default
+    :param statistics: the fused statistics of the columns when they were already computed, their null masks are reused
+    :return: an ErrorTable of the missing cells
     """
-    error_map = {}
+    if columns is None:
+        columns = data_frame.columns
+    columns = list(columns)
 
-    mask = data_frame.isna() | (data_frame.astype(str) == 'null') | (data_frame.astype(str) == 'undefined')
-    na_locations = mask.stack()
-    missing_coords = na_locations[na_locations].index.tolist()
+    mask = np.empty((len(columns), len(data_frame)), dtype=bool)
+    for position, column in enumerate(columns):
+        null_mask = statistics[column].null_mask if statistics is not None else None
+        mask[position] = missing_mask(data_frame[column], null_mask)
 
-    for cord in missing_coords:
-        if cord[1] not in error_map:
-            error_map[cord[1]] = {}
-            error_map[cord[1]][int(data_frame.loc[cord[0], 'ID'])] = "missing"
-        else: error_map[cord[1]][int(data_frame.loc[cord[0], 'ID'])] = "missing"
+    # nonzero walks the mask column by column, so the errors come out grouped by column
+    column_positions, row_positions = np.nonzero(mask)
+    flagged_ids = data_frame['ID'].to_numpy()[row_positions]
+    flagged_columns = np.unique(column_positions)
+    return ErrorTable(flagged_ids, np.searchsorted(flagged_columns, column_positions), np.zeros(len(flagged_ids)),
+                      [columns[position] for position in flagged_columns], ["missing"] if len(flagged_ids) > 0 else [])
 
-    return error_map
\ No newline at end of file
+def missing_mask(column, null_mask=None):
+    """
+    :param column: a single column as a pandas series
+    :param null_mask: the null mask of the column when it is already known
+    :return: boolean array flagging the cells of the column the detector reports as missing
+    """
+    if null_mask is None:
+        null_mask = column.isna().to_numpy()
+    # only columns holding objects can hold the missing strings
+    if holds_mixed_types(column.dtype):
+        return null_mask | column.isin(missing_strings).to_numpy()
+    return null_mask
@@ -0,0 +1,105 @@
+"""
+Memory bounded search for the values incomplete flags, the ones seen fewer than rare_count times
+
+A count-min sketch holds an upper bound of the count of every value in a fixed number of counters:
+    values whose bound is below rare_count are rare for sure
+    values whose bound reaches rare_count are candidates, mostly common values plus the few rare values which share
+    their counters with common ones - the candidates are counted exactly in a second pass over the data
+
+The values are stored as 64 bit hashes, the candidates in sorted arrays, so the memory used is set by memory_cap
+instead of the number of distinct values
+"""
+import numpy as np
+import pandas as pd
+
+from detectors.incomplete import rare_count
+
+
+class RareValueSketch:
+    def __init__(self, memory_cap, depth=4):
+        """
+        :param memory_cap: the number of bytes the sketch may use, half for the counters and half for the candidates
+        :param depth: the number of counter rows, each value is counted once per row
+        """
+        counter_bytes = memory_cap // 2
+        self.depth = depth
+        self.width = max(1, counter_bytes // (depth * 4))
+        self.counters = np.zeros((depth, self.width), dtype=np.int32)
+        # a candidate takes a hash and a count, 16 bytes
+        self.candidate_capacity = max(1, (memory_cap - counter_bytes) // 16)
+        self.candidate_hashes = np.empty(0, dtype=np.uint64)
+        self.candidate_counts = np.empty(0, dtype=np.int64)
+        # set when there were more candidates than the capacity, the candidates left out are never flagged
+        self.overflowed = False
+
+    def add(self, values, counts=None):
+        """
+        First pass, counts values into the sketch
+        :param values: the values, without nulls
+        :param counts: how many times each value was seen, once by default
+        """
+        hashes = hash_values(values)
+        counts = np.ones(len(hashes), dtype=np.int32) if counts is None else np.asarray(counts, dtype=np.int32)
+        for row in range(self.depth):
+            np.add.at(self.counters[row], self.positions(hashes, row), counts)
+
+    def count_candidates(self, values):
+        """
+        Second pass, counts exactly the values whose bound reaches rare_count
+        :param values: the values, without nulls
+        """
+        hashes = hash_values(values)
+        hashes = hashes[self.estimate(hashes) >= rare_count]
+        if len(hashes) == 0:
+            return
+        hashes, counts = np.unique(hashes, return_counts=True)
+
+        known = np.isin(hashes, self.candidate_hashes, assume_unique=True)
+        positions = np.searchsorted(self.candidate_hashes, hashes[known])
+        self.candidate_counts[positions] += counts[known]
+
+        new_hashes, new_counts = hashes[~known], counts[~known]
+        room = self.candidate_capacity - len(self.candidate_hashes)
+        if len(new_hashes) > room:
+            self.overflowed = True
+            new_hashes, new_counts = new_hashes[:room], new_counts[:room]
+        all_hashes = np.concatenate([self.candidate_hashes, new_hashes])
+        order = np.argsort(all_hashes)
+        self.candidate_hashes = all_hashes[order]
+        self.candidate_counts = np.concatenate([self.candidate_counts, new_counts])[order]
+
+    def rare_mask(self, column):
+        """
+        :param column: a block of the column as a pandas series
+        :return: boolean array flagging the cells holding a rare value
+        """
+        present = column.notna().to_numpy()
+        hashes = hash_values(column[present])
+        rare = self.estimate(hashes) < rare_count
+
+        candidates = np.flatnonzero(~rare)
+        positions = np.searchsorted(self.candidate_hashes, hashes[candidates])
+        positions = np.minimum(positions, max(len(self.candidate_hashes) - 1, 0))
+        if len(self.candidate_hashes) > 0:
+            found = self.candidate_hashes[positions] == hashes[candidates]
+            rare[candidates[found]] = self.candidate_counts[positions[found]] < rare_count
+
+        mask = np.zeros(len(column), dtype=bool)
+        mask[present] = rare
+        return mask
+
+    def estimate(self, hashes):
+        """the upper bound of the count of each hashed value"""
+        estimates = self.counters[0][self.positions(hashes, 0)]
+        for row in range(1, self.depth):
+            estimates = np.minimum(estimates, self.counters[row][self.positions(hashes, row)])
+        return estimates
+
+    def positions(self, hashes, row):
+        """the counter of each hash in a row, the rows combine the two halves of the hash differently"""
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = hashes >> np.uint64(32)
+        return ((low + np.uint64(row) * high) % np.uint64(self.width)).astype(np.int64)
+
+def hash_values(values):
+    return pd.util.hash_array(np.asarray(values, dtype=object))
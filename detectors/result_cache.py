@@ -0,0 +1,135 @@
+"""
+Cache of the ids each detector flags in a column, addressed by the content of the column
+
+Every detector only looks at the column it checks, so its result is fully set by:
+    the detector and its parameters
+    the content hash of the column, which covers its dtype, its values and the ids of its rows
+A column that hashes the same as one seen before, after a wrangle that left it alone or when the same file is uploaded
+again, takes its results from the cache and is not detected again. The least recently used results are evicted once
+the cache holds more than max_bytes of ids
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from detectors.anomaly import minimum_count
+from detectors.error_table import ErrorTable
+from detectors.executor import detectors, run_detectors_parallel
+from detectors.incomplete import frequency_threshold, rare_count
+from detectors.missing_value import missing_strings
+from detectors.type_profile import numeric_string_pattern
+
+max_cached_bytes = 256 * 1024 * 1024
+
+
+class DetectorResultCache:
+    def __init__(self, max_bytes=max_cached_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.cached_bytes = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """:return: the cached ids of the key, None when they are not cached"""
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.cached_bytes = 0
+
+    def put(self, key, ids):
+        ids = np.array(ids, dtype=np.int64)
+        ids.flags.writeable = False
+        with self.lock:
+            if key in self.entries:
+                self.cached_bytes -= self.entries.pop(key).nbytes
+            self.entries[key] = ids
+            self.cached_bytes += ids.nbytes
+            while self.cached_bytes > self.max_bytes and len(self.entries) > 0:
+                _, evicted = self.entries.popitem(last=False)
+                self.cached_bytes -= evicted.nbytes
+
+def detector_parameters():
+    """the parameters each detector's result depends on, part of the cache key"""
+    return {
+        "anomaly": (minimum_count,),
+        "incomplete": (frequency_threshold, rare_count),
+        "missing": tuple(missing_strings),
+        "mismatch": (numeric_string_pattern,),
+    }
+
+def column_hash(column, ids_digest):
+    """
+    :param column: the column as a pandas series
+    :param ids_digest: digest of the ID column, the detectors report ids so the ids are part of the content
+    :return: hex digest of the content of the column, None when the values can't be hashed
+    """
+    digest = hashlib.blake2b(ids_digest, digest_size=16)
+    digest.update(str(column.dtype).encode())
+    try:
+        digest.update(pd.util.hash_pandas_object(column, index=False).to_numpy().tobytes())
+    except TypeError:
+        return None
+    # values of different types can hash the same (1 and '1'), their types are added when a column mixes them
+    if column.dtype == 'object' and pd.api.types.infer_dtype(column, skipna=True).startswith("mixed"):
+        type_names = np.asarray([type(value).__name__ for value in column], dtype=object)
+        digest.update(pd.util.hash_array(type_names).tobytes())
+    return digest.hexdigest()
+
+def run_detectors_cached(data_frame, cache, max_workers=None):
+    """
+    Runs the detectors only on the columns whose results are not cached
+    :param data_frame: the datatable, the first column is expected to be the ID column
+    :param cache: the DetectorResultCache to read and fill
+    :param max_workers: the number of threads the detectors run on
+    :return: the ErrorTable of every detector and dictionary of structure { stage: seconds }, the stages are hashing,
+    the statistics and each detector
+    """
+    start = time.perf_counter()
+    ids_digest = hashlib.blake2b(data_frame['ID'].to_numpy(dtype=np.int64).tobytes()).digest()
+    hashes = {column: column_hash(data_frame[column], ids_digest) for column in data_frame.columns}
+    parameters = detector_parameters()
+    checked_columns = {name: list(data_frame.columns) if name == "missing" else list(data_frame.columns[1:])
+                       for name, _ in detectors}
+
+    def cache_key(name, column):
+        return (name, hashes[column], parameters[name])
+
+    cached = {}
+    for name, _ in detectors:
+        for column in checked_columns[name]:
+            if hashes[column] is not None:
+                ids = cache.get(cache_key(name, column))
+                if ids is not None:
+                    cached[(name, column)] = ids
+    changed_columns = [column for column in data_frame.columns
+                       if any((name, column) not in cached for name, _ in detectors if column in checked_columns[name])]
+    timings = {"hashing": time.perf_counter() - start}
+
+    if len(changed_columns) > 0:
+        errors, detector_timings = run_detectors_parallel(data_frame, max_workers, changed_columns)
+        timings.update(detector_timings)
+        for name, _ in detectors:
+            for column in changed_columns:
+                if column not in checked_columns[name]: continue
+                ids = errors.ids_for(column, name)
+                cached[(name, column)] = ids
+                if hashes[column] is not None:
+                    cache.put(cache_key(name, column), ids)
+
+    # the detectors report the errors of a column in row order, and the columns in table order
+    tables = [ErrorTable.from_column_ids({column: cached[(name, column)] for column in checked_columns[name]}, name)
+              for name, _ in detectors]
+    return ErrorTable.concat(tables), timings
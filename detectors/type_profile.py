@@ -0,0 +1,96 @@
+"""
+Type profile of a column, computed once per column of a data state and shared by datatype_mismatch and the plots
+which need to know whether a column is categorical:
+    majority type - the type most values have, cells of the other types are mismatches
+    numeric mask - which cells can be coerced to a number
+    cardinality - the number of distinct values
+    null count - the number of null cells
+
+The type of every distinct value is classified in one vectorized pass instead of a python loop with a regex per value
+"""
+import numpy as np
+import pandas as pd
+
+numeric_string_pattern = r'^\d+(\.\d+)?$'
+
+
+class ColumnProfile:
+    def __init__(self, value_counts, value_types, numeric_mask, null_count):
+        self.value_counts = value_counts
+        self.value_types = value_types
+        self.type_counts = count_types(value_counts, value_types)
+        self.majority_type = find_majority_type(self.type_counts)
+        self.numeric_mask = numeric_mask
+        self.cardinality = len(value_counts)
+        self.null_count = null_count
+
+    @classmethod
+    def from_series(cls, column):
+        """
+        Profiles a whole column
+        :param column: the column as a pandas series
+        :return: the profile
+        """
+        value_counts = column.value_counts()
+        numeric_mask = pd.to_numeric(column, errors='coerce').notna().to_numpy()
+        return cls(value_counts, classify_values(value_counts.index), numeric_mask, int(column.isna().sum()))
+
+    def mismatched_values(self):
+        """the distinct values whose type is not the majority type"""
+        return self.value_counts.index[self.value_types != self.majority_type]
+
+    def is_categorical(self):
+        """
+        a column is categorical when strings are its most common type, the first type counted wins a tie here
+        """
+        largest_type = None
+        largest_count = 0
+        for type_of_value, count in self.type_counts.items():
+            if count > largest_count:
+                largest_count = count
+                largest_type = type_of_value
+        return largest_type is None or largest_type == "str"
+
+def classify_values(values):
+    """
+    :param values: index of distinct values
+    :return: object array with the type name of each value, strings holding a number count as "numeric"
+    """
+    values = list(values)
+    if len(values) == 0:
+        return np.asarray([], dtype=object)
+    types = np.asarray([type(value).__name__ for value in values], dtype=object)
+
+    is_string = types == "str"
+    if is_string.any():
+        strings = pd.Series(np.asarray(values, dtype=object)[is_string], dtype=object)
+        is_numeric = strings.str.strip().str.fullmatch(numeric_string_pattern).to_numpy(dtype=bool)
+        types[np.flatnonzero(is_string)[is_numeric]] = "numeric"
+    return types
+
+def count_types(value_counts, value_types):
+    """
+    :return: dictionary of structure { type: number of values of the type }, in the order the types are first seen
+    """
+    if len(value_counts) == 0:
+        return {}
+    type_counts = pd.Series(value_counts.to_numpy()).groupby(value_types, sort=False).sum()
+    return {type_of_value: int(count) for type_of_value, count in type_counts.items()}
+
+def find_majority_type(type_count):
+    """
+    :param type_count: dictionary of structure { type: number of values of the type }
+    :return: the type most values have, ties are won by int or float, otherwise by the type counted first
+    """
+    majority_type = None
+    majority_count = 0
+
+    #set the majority type
+    for key, value in type_count.items():
+        if value == majority_count and (key == "int" or key == "float"):
+            majority_type = key
+            majority_count = value
+        elif value > majority_count:
+            majority_count = value
+            majority_type = key
+    return majority_type
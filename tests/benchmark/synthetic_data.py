@@ -0,0 +1,108 @@
+"""
+Synthetic tables modeled on provided_datasets/complaints-*.csv, of any number of rows
+
+The columns keep what makes the complaints data hard for the detectors:
+    categories with a few common values and a long tail of rare ones (incomplete)
+    missing cells, both as nulls and as the 'null' / 'undefined' sentinels (missing_value)
+    zip codes mixing numbers with masked values like 'XXXXX' and '972XX' (datatype_mismatch)
+    long free text narratives, mostly missing (incomplete, memory)
+    numeric columns with outliers and text mixed into them (anomaly, datatype_mismatch)
+Every column is built with numpy so 10 million rows take seconds, the values are drawn from pools so the cells share
+their string objects and the table stays small enough to benchmark 10 million rows
+"""
+import numpy as np
+import pandas as pd
+
+issues = ["Dealing with your lender or servicer", "Struggling to repay your loan", "Improper use of your report",
+          "Problem with a credit reporting company's investigation", "Incorrect information on your report",
+          "Getting a loan", "Problem with a purchase shown on your statement", "Closing your account"]
+companies = ["MOHELA", "Nelnet, Inc.", "Maximus Federal Services, Inc.", "EdFinancial Services",
+             "Aidvantage", "Navient Solutions, LLC.", "Higher Education Loan Authority of the State of Missouri"]
+responses = ["Closed with explanation", "In progress", "Untimely response", "Closed with monetary relief"]
+states = ["CA", "TX", "FL", "NY", "GA", "IL", "PA", "OH", "NC", "MI", "NJ", "VA", "WA", "AZ", "MA", "TN", "IN", "MD"]
+narrative_words = ["my", "loan", "servicer", "payment", "account", "information", "forgiveness", "report", "credit",
+                   "interest", "balance", "student", "federal", "records", "violation", "request", "months", "the"]
+narrative_pool_size = 2000
+rare_value_rate = 0.002
+sentinel_rate = 0.001
+
+
+def zipf_choice(rng, values, rows, exponent=1.2):
+    """draws the values with a few of them common and the rest in a long tail, like the categories of the data"""
+    weights = 1.0 / np.arange(1, len(values) + 1) ** exponent
+    return np.asarray(values, dtype=object)[rng.choice(len(values), rows, p=weights / weights.sum())]
+
+def with_rare_values(rng, column, prefix):
+    """replaces a few cells with values seen only once"""
+    rare = np.flatnonzero(rng.random(len(column)) < rare_value_rate)
+    column[rare] = np.char.add(prefix, rare.astype(str)).astype(object)
+    return column
+
+def with_missing(rng, column, rate, sentinels=True):
+    """replaces cells with nulls and, when sentinels is set, a few with the missing strings"""
+    column[rng.random(len(column)) < rate] = None
+    if sentinels:
+        flagged = np.flatnonzero(rng.random(len(column)) < sentinel_rate)
+        column[flagged] = rng.choice(np.array(["null", "undefined"], dtype=object), len(flagged))
+    return column
+
+def narratives(rng, rows):
+    pool_lengths = rng.integers(20, 400, narrative_pool_size)
+    pool = np.array([" ".join(rng.choice(narrative_words, length)) for length in pool_lengths], dtype=object)
+    return with_missing(rng, pool[rng.integers(0, narrative_pool_size, rows)], 0.78, sentinels=False)
+
+def dates(rng, rows):
+    days = pd.date_range("2025-01-01", periods=108).strftime("%m/%d/%y").to_numpy(dtype=object)
+    return days[np.sort(rng.integers(0, len(days), rows))]
+
+def zip_codes(rng, rows):
+    """five digit codes, some masked whole ('XXXXX') and some in part ('972XX')"""
+    codes = np.arange(10000, 100000).astype(str).astype(object)
+    masked_codes = np.char.add(np.arange(100, 1000).astype(str), "XX").astype(object)
+    pool = np.concatenate([codes, masked_codes, np.array(["XXXXX"], dtype=object)])
+    masked = rng.random(rows)
+    picks = rng.integers(0, len(codes), rows)
+    partial = (masked >= 0.03) & (masked < 0.05)
+    picks[partial] = len(codes) + rng.integers(0, len(masked_codes), partial.sum())
+    picks[masked < 0.03] = len(pool) - 1
+    return pool[picks]
+
+def amounts(rng, rows):
+    values = rng.lognormal(10, 0.5, rows)
+    outliers = rng.random(rows) < 0.005
+    values[outliers] *= rng.uniform(20, 100, outliers.sum())
+    values[rng.random(rows) < 0.02] = np.nan
+    return values
+
+def payments(rng, rows):
+    """a mostly numeric column with text mixed in, parsed as strings like such columns are"""
+    values = np.arange(50, 2000).astype(str).astype(object)[rng.integers(0, 1950, rows)]
+    text = rng.random(rows) < 0.01
+    values[text] = rng.choice(np.array(["N/A", "unknown", "see notes"], dtype=object), text.sum())
+    return with_missing(rng, values, 0.01)
+
+def generate_complaints(rows, seed=0):
+    """
+    :param rows: the number of rows of the table
+    :param seed: the seed of the random generator, the same seed gives the same table
+    :return: a dataframe shaped like the complaints data, with an ID column first
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "ID": np.arange(1, rows + 1),
+        "Date received": dates(rng, rows),
+        "Product": zipf_choice(rng, ["Student loan"], rows),
+        "Issue": zipf_choice(rng, issues, rows),
+        "Sub-issue": with_missing(rng, with_rare_values(rng, zipf_choice(rng, issues[::-1], rows), "Other issue "), 0.004),
+        "Consumer complaint narrative": narratives(rng, rows),
+        "Company": with_rare_values(rng, zipf_choice(rng, companies, rows), "Servicer "),
+        "State": with_missing(rng, with_rare_values(rng, zipf_choice(rng, states, rows), "S"), 0.002),
+        "ZIP code": zip_codes(rng, rows),
+        "Submitted via": zipf_choice(rng, ["Web", "Phone", "Referral", "Postal mail"], rows, exponent=4),
+        "Company response to consumer": zipf_choice(rng, responses, rows),
+        "Timely response?": zipf_choice(rng, ["Yes", "No"], rows, exponent=3),
+        "Consumer disputed?": np.full(rows, np.nan),
+        "Loan amount": amounts(rng, rows),
+        "Monthly payment": payments(rng, rows),
+        "Complaint ID": rng.permutation(rows) + 11000000,
+    })
@@ -0,0 +1,195 @@
+"""
+Scaling benchmarks of the detectors on synthetic complaints data, see synthetic_data.py
+
+Every detector and run_detectors are timed and their peak memory traced at each size in benchmark_rows, the results
+are compared to baselines.json and the test fails when one is slower or larger than its baseline by more than the
+tolerance. The benchmarks take minutes, so they only run when BUCKAROO_BENCHMARK is set:
+    BUCKAROO_BENCHMARK=1 python -m pytest tests/benchmark
+    BUCKAROO_BENCHMARK_ROWS=10000,100000 limits the sizes
+    python -m tests.benchmark.test_detector_benchmarks --update records new baselines
+The baselines depend on the machine, record them again on the machine the benchmarks are compared on
+"""
+import argparse
+import ctypes
+import ctypes.util
+import gc
+import json
+import os
+import time
+import tracemalloc
+import unittest
+
+from app.service_helpers import run_detectors
+from app import detector_cache
+from detectors.anomaly import anomaly
+from detectors.datatype_mismatch import datatype_mismatch
+from detectors.incomplete import incomplete
+from detectors.missing_value import missing_value
+from tests.benchmark.synthetic_data import generate_complaints
+
+benchmark_rows = [10_000, 100_000, 1_000_000, 10_000_000]
+baseline_path = os.path.join(os.path.dirname(__file__), "baselines.json")
+# a result regresses when it passes its baseline times the tolerance plus the slack, the slack keeps the timer noise
+# of the small sizes from failing the run
+time_tolerance = 1.5
+time_slack_seconds = 0.05
+memory_tolerance = 1.25
+memory_slack_bytes = 1024 * 1024
+# the small sizes are timed a few times and the fastest run kept
+timing_repeats = {10_000: 5, 100_000: 3}
+
+
+def run_detectors_cold(data_frame):
+    """run_detectors without the results cached by an earlier run"""
+    detector_cache.clear()
+    return run_detectors(data_frame)
+
+benchmarked_detectors = [
+    ("anomaly", anomaly),
+    ("incomplete", incomplete),
+    ("missing_value", missing_value),
+    ("datatype_mismatch", datatype_mismatch),
+    ("run_detectors", run_detectors_cold),
+]
+
+def tracks_peak_resident_memory():
+    """whether the peak resident memory of the process can be reset before a run, linux only"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def release_free_memory():
+    """returns the memory freed by earlier runs to the system, so reusing it counts toward the next run's peak"""
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None:
+        return
+    libc = ctypes.CDLL(libc_name)
+    if hasattr(libc, "malloc_trim"):
+        libc.malloc_trim(0)
+
+def resident_memory():
+    """:return: the resident and the peak resident bytes of the process"""
+    memory = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("VmRSS", "VmHWM"):
+                memory[name] = int(value.split()[0]) * 1024
+    return memory["VmRSS"], memory["VmHWM"]
+
+def measure(detector, data_frame, repeats=1):
+    """
+    The peak memory is read from the resident memory of the process where it can be reset before a run, elsewhere
+    from tracemalloc in an extra run, tracing every allocation makes the detectors many times slower
+    :return: dictionary of structure { "seconds": fastest run time, "peak_bytes": most memory added during a run }
+    """
+    tracks_resident = tracks_peak_resident_memory()
+    seconds = []
+    peak_bytes = 0
+    for _ in range(repeats):
+        gc.collect()
+        if tracks_resident:
+            release_free_memory()
+            tracks_peak_resident_memory()
+            start_bytes, _ = resident_memory()
+        start = time.perf_counter()
+        detector(data_frame)
+        seconds.append(time.perf_counter() - start)
+        if tracks_resident:
+            peak_bytes = max(peak_bytes, resident_memory()[1] - start_bytes)
+
+    if not tracks_resident:
+        gc.collect()
+        tracemalloc.start()
+        detector(data_frame)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"seconds": min(seconds), "peak_bytes": peak_bytes}
+
+def run_benchmarks(rows_list, report=print, on_size=None):
+    """
+    :param on_size: called with the results so far after every size, so the sizes finished are kept if a larger one
+    runs out of memory
+    :return: dictionary of structure { rows: { detector: measurement } }, rows as a string like in baselines.json
+    """
+    results = {}
+    for rows in rows_list:
+        data_frame = generate_complaints(rows)
+        results[str(rows)] = {}
+        for name, detector in benchmarked_detectors:
+            measurement = measure(detector, data_frame, timing_repeats.get(rows, 1))
+            results[str(rows)][name] = measurement
+            report(f"{rows:>10} rows  {name:<18} {measurement['seconds']:9.3f}s {measurement['peak_bytes'] / 2**20:10.1f} MiB")
+        del data_frame
+        detector_cache.clear()
+        if on_size is not None:
+            on_size(results)
+    return results
+
+def find_regressions(results, baselines):
+    """:return: a message for every measurement past its baseline, the ones without a baseline are not checked"""
+    regressions = []
+    for rows, measurements in results.items():
+        for name, measurement in measurements.items():
+            baseline = baselines.get(rows, {}).get(name)
+            if baseline is None:
+                continue
+            if measurement["seconds"] > baseline["seconds"] * time_tolerance + time_slack_seconds:
+                regressions.append(f"{name} at {rows} rows took {measurement['seconds']:.3f}s, "
+                                   f"baseline {baseline['seconds']:.3f}s")
+            if measurement["peak_bytes"] > baseline["peak_bytes"] * memory_tolerance + memory_slack_bytes:
+                regressions.append(f"{name} at {rows} rows peaked at {measurement['peak_bytes']} bytes, "
+                                   f"baseline {baseline['peak_bytes']} bytes")
+    return regressions
+
+def load_baselines():
+    if not os.path.exists(baseline_path):
+        return {}
+    with open(baseline_path) as f:
+        return json.load(f)
+
+def save_baselines(results):
+    """adds the results to baselines.json, replacing the baselines of the same sizes"""
+    baselines = load_baselines()
+    baselines.update(results)
+    with open(baseline_path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+
+def selected_rows():
+    """the sizes in BUCKAROO_BENCHMARK_ROWS, every size of benchmark_rows by default"""
+    rows = os.environ.get("BUCKAROO_BENCHMARK_ROWS")
+    return [int(size) for size in rows.split(",")] if rows else benchmark_rows
+
+
+class TestDetectorBenchmarks(unittest.TestCase):
+
+    @unittest.skipUnless(os.environ.get("BUCKAROO_BENCHMARK"), "set BUCKAROO_BENCHMARK=1 to run the benchmarks")
+    def test_detectors_within_baselines(self):
+        results = run_benchmarks(selected_rows())
+        regressions = find_regressions(results, load_baselines())
+        self.assertEqual(regressions, [], "\n".join(regressions))
+
+    def test_regression_past_tolerance_is_reported(self):
+        baselines = {"10000": {"anomaly": {"seconds": 1.0, "peak_bytes": 100 * 2**20}}}
+        within = {"10000": {"anomaly": {"seconds": 1.2, "peak_bytes": 110 * 2**20}}}
+        slower = {"10000": {"anomaly": {"seconds": 2.0, "peak_bytes": 110 * 2**20}}}
+        larger = {"10000": {"anomaly": {"seconds": 1.0, "peak_bytes": 200 * 2**20}}}
+        self.assertEqual(find_regressions(within, baselines), [])
+        self.assertEqual(len(find_regressions(slower, baselines)), 1)
+        self.assertEqual(len(find_regressions(larger, baselines)), 1)
+        self.assertEqual(find_regressions(slower, {}), [])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Runs the detector benchmarks")
+    parser.add_argument("--rows", help="comma separated sizes, every size by default")
+    parser.add_argument("--update", action="store_true", help="store the results as the new baselines")
+    arguments = parser.parse_args()
+    rows_list = [int(size) for size in arguments.rows.split(",")] if arguments.rows else selected_rows()
+    results = run_benchmarks(rows_list, on_size=save_baselines if arguments.update else None)
+    if not arguments.update:
+        for regression in find_regressions(results, load_baselines()):
+            print("REGRESSION", regression)
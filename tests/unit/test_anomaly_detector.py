@@ -19,7 +19,7 @@ class TestAnomalyTests(unittest.TestCase):
             # 1 clear anomalies
         }
         df = pd.DataFrame(test_data)
-        detected_df = anomaly(set_id_column(df))
+        detected_df = anomaly(set_id_column(df)).to_error_map()
         error_map = {"normal_col":{10: "anomaly"},"anomaly_col":{8:"anomaly"}}
         self.assertEqual(error_map,detected_df)
 
@@ -35,20 +35,42 @@ class TestAnomalyTests(unittest.TestCase):
             # 1 clear anomaly because the string row has some strings so doesn't meet the required threshold of numeric values
         }
         df = pd.DataFrame(test_data)
-        detected_df = anomaly(set_id_column(df))
+        detected_df = anomaly(set_id_column(df)).to_error_map()
         error_map = {"normal_col":{10: "anomaly"},"anomaly_col":{8:"anomaly"}}
         self.assertDictEqual(error_map,detected_df)
 
+    def test_anomaly_does_not_modify_input(self):
+        np.random.seed(12)
+        test_data = {
+            'ID': range(1, 13),
+            'anomaly_col': np.concatenate([np.random.normal(50, 5, 7), [2000, 300, -100, 250, 180]]),
+            'string_col': np.concatenate([np.random.normal(50, 5, 7), [2000, "hi", "hello", "bonjour", "oui"]]),
+        }
+        df = pd.DataFrame(test_data)
+        original_df = df.copy()
+        anomaly(df)
+        pd.testing.assert_frame_equal(original_df, df)
+
+    def test_anomaly_ignores_non_numeric_cells(self):
+        test_data = {
+            'ID': range(1, 14),
+            'mixed_col': [10, 11, 10, 12, 11, 10, 11, 12, 10, 11, 10, 500, "oops"],
+        }
+        df = pd.DataFrame(test_data)
+        detected_df = anomaly(df).to_error_map()
+        error_map = {"mixed_col": {12: "anomaly"}}
+        self.assertDictEqual(error_map, detected_df)
+
     def test_uncleaned_stackoverflow_with_main_detector_result(self):
         test_dataframe = pd.read_csv('../../provided_datasets/stackoverflow_db_uncleaned.csv')
         top_200_rows = test_dataframe.head(200)
-        detected_df = anomaly(set_id_column(top_200_rows))
+        detected_df = anomaly(set_id_column(top_200_rows)).to_error_map()
         expected_error_map = {"ConvertedSalary":{13:"anomaly",58:"anomaly",100:"anomaly",115:"anomaly",141:"anomaly", 214:"anomaly",222:"anomaly"}}
         self.assertDictEqual(expected_error_map, detected_df)
 
     def test_crimes_report_with_main_detector_result(self):
         test_dataframe = pd.read_csv('../../provided_datasets/Crimes_-_One_year_prior_to_present_20250421.csv')
-        detected_df = anomaly(set_id_column(test_dataframe.head(200)))
+        detected_df = anomaly(set_id_column(test_dataframe.head(200))).to_error_map()
         expected_error_map = {
             " IUCR": {
                 "1": "anomaly",
@@ -103,7 +125,7 @@ class TestAnomalyTests(unittest.TestCase):
     #
     def test_complaints_with_main_detector_result(self):
         test_dataframe = pd.read_csv('../../provided_datasets/complaints-2025-04-21_17_31.csv')
-        detected_df = anomaly(set_id_column(test_dataframe.head(200)))
+        detected_df = anomaly(set_id_column(test_dataframe.head(200))).to_error_map()
         expected_error_map = {'Complaint ID': {35: 'anomaly',
                   58: 'anomaly',
                   59: 'anomaly',
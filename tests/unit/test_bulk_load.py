@@ -0,0 +1,77 @@
+import io
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import data_management.bulk_load as bulk_load_module
+from app import engine
+from app.service_helpers import run_detectors, store_csv_in_chunks
+from data_management.bulk_load import bulk_load
+
+
+class TestBulkLoad(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.table_name = "test_bulk_load"
+        self.reference_name = "test_bulk_load_reference"
+        self.df = pd.DataFrame({
+            'ID': [1, 2, 3, 4, 5],
+            'Salary': [50000.5, np.nan, 1e300, -0.25, 7.0],
+            'Country': ['USA', None, 'Comma, "quoted"', '', '\\N'],
+            'Notes': ['line\nbreak', 'null', 'tab\there', None, 'ok'],
+            'Active': [True, False, True, True, False],
+            'Mixed': [1, 'two', 3.5, None, 'five'],
+        })
+
+    def tearDown(self):
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.table_name}"')
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.reference_name}"')
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "errors{self.table_name}"')
+
+    def read_table(self, name):
+        return pd.read_sql_query(f'SELECT * FROM "{name}" ORDER BY "index"', engine)
+
+    def column_types(self, name):
+        query = ("SELECT column_name, data_type FROM information_schema.columns "
+                 f"WHERE table_name = '{name}' ORDER BY ordinal_position")
+        return pd.read_sql_query(query, engine).values.tolist()
+
+    def test_same_table_as_to_sql(self):
+        report = bulk_load(engine, self.table_name, self.df)
+        self.df.to_sql(self.reference_name, engine, if_exists='replace')
+        self.assertEqual(report["rows"], len(self.df))
+        self.assertEqual(self.column_types(self.table_name), self.column_types(self.reference_name))
+        pd.testing.assert_frame_equal(self.read_table(self.table_name), self.read_table(self.reference_name))
+
+    def test_parallel_load_keeps_row_order(self):
+        original_rows, original_block = bulk_load_module.parallel_load_rows, bulk_load_module.copy_block_rows
+        bulk_load_module.parallel_load_rows, bulk_load_module.copy_block_rows = 2, 1
+        try:
+            bulk_load(engine, self.table_name, self.df)
+        finally:
+            bulk_load_module.parallel_load_rows, bulk_load_module.copy_block_rows = original_rows, original_block
+        stored = self.read_table(self.table_name)
+        self.assertEqual(stored["index"].tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(stored["Country"].tolist(), ['USA', None, 'Comma, "quoted"', '', '\\N'])
+
+    def test_streamed_errors_keep_detector_order(self):
+        np.random.seed(8)
+        df = pd.DataFrame({
+            'Salary': np.concatenate([np.random.normal(100, 10, 57), [400, np.nan, -50]]),
+            'Country': ['USA', 'Canada', 'USA', 'Germany', 'Canada'] * 11 + ['Peru', 'Chile', None, 'null', '42'],
+        })
+        csv_file = io.StringIO(df.to_csv(index=False))
+        table_load, error_load = store_csv_in_chunks(csv_file, self.table_name, engine, chunk_size=7)
+        expected = run_detectors(pd.read_csv(io.StringIO(df.to_csv(index=False)))).to_dataframe()
+        stored = self.read_table("errors" + self.table_name)
+        self.assertEqual((table_load["rows"], error_load["rows"]), (len(df), len(expected)))
+        self.assertEqual(stored["index"].tolist(), list(range(len(expected))))
+        self.assertEqual(list(zip(expected.row_id, expected.column_id, expected.error_type)),
+                         list(zip(stored.row_id, stored.column_id, stored.error_type)))
+
+
+if __name__ == '__main__':
+    unittest.main()
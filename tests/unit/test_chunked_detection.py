@@ -0,0 +1,74 @@
+import io
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.service_helpers import run_detectors
+from detectors.chunked import MergeableStatistics, detect_in_chunks, unify_dtypes
+
+
+def error_triples(errors):
+    return list(zip(errors.row_id.tolist(), errors.column_id().tolist(), errors.error_type().tolist()))
+
+
+class TestChunkedDetection(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        np.random.seed(8)
+        size = 60
+        self.df = pd.DataFrame({
+            'Salary': np.concatenate([np.random.normal(100, 10, size - 3), [400, np.nan, -50]]),
+            'Country': ['USA', 'Canada', 'USA', 'Germany', 'Canada'] * 11 + ['Peru', 'Chile', None, 'null', '42'],
+            # numbers in the first blocks, text in the last ones
+            'Age': [str(age) for age in np.random.randint(18, 70, size - 3)] + ['old', 'undefined', 'young'],
+            'Count': np.random.randint(0, 5, size),
+        })
+
+    def csv_file(self, df):
+        return io.StringIO(df.to_csv(index=False))
+
+    def test_matches_full_run(self):
+        expected = error_triples(run_detectors(pd.read_csv(self.csv_file(self.df), low_memory=False)))
+        for chunk_size in [7, 25, 1000]:
+            self.assertEqual(expected, error_triples(detect_in_chunks(self.csv_file(self.df), chunk_size)))
+
+    def test_keeps_a_usable_id_column(self):
+        df = self.df.copy()
+        df.insert(2, 'ID', np.arange(len(df))[::-1] * 3)
+        expected = run_detectors(pd.read_csv(self.csv_file(df), low_memory=False))
+        self.assertEqual(error_triples(expected), error_triples(detect_in_chunks(self.csv_file(df), 9)))
+
+    def test_chunks_get_ids(self):
+        chunks = []
+        detect_in_chunks(self.csv_file(self.df), 25, on_chunk=chunks.append)
+        self.assertEqual([len(chunk) for chunk in chunks], [25, 25, 10])
+        self.assertEqual(list(chunks[1].columns), ['ID', 'Salary', 'Country', 'Age', 'Count'])
+        self.assertEqual(chunks[1]['ID'].tolist(), list(range(26, 51)))
+
+    def test_errors_handed_out_per_block(self):
+        blocks = []
+        self.assertIsNone(detect_in_chunks(self.csv_file(self.df), 25, on_errors=blocks.append))
+        self.assertEqual(len(blocks), 3)
+        streamed = [triple for block in blocks for triple in error_triples(block)]
+        expected = error_triples(detect_in_chunks(self.csv_file(self.df), 25))
+        self.assertEqual(sorted(expected), sorted(streamed))
+        self.assertTrue(all(row_id <= 25 for row_id, _, _ in error_triples(blocks[0])))
+
+    def test_merged_moments(self):
+        column = pd.Series(np.random.normal(5, 2, 100))
+        statistics = MergeableStatistics(column.dtype)
+        for start in range(0, 100, 30):
+            statistics.add_chunk(column.iloc[start:start + 30])
+        self.assertEqual(statistics.numeric_count, 100)
+        self.assertAlmostEqual(statistics.mean, column.mean())
+        self.assertAlmostEqual(statistics.std(), column.std())
+
+    def test_unify_dtypes(self):
+        self.assertEqual(unify_dtypes([np.dtype('int64'), np.dtype('float64')]), np.dtype('float64'))
+        self.assertEqual(unify_dtypes([np.dtype('int64'), np.dtype('object')]), np.dtype('object'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -187,6 +187,42 @@ class TestDataState(unittest.TestCase):
         self.assertEqual(len(self.data_state.right_state_stack), 1)
         self.assertEqual(len(self.data_state.left_state_stack), 1)
 
+    def test_sessions_do_not_grow_the_stacks(self):
+        self.data_state.start_session(self.sample_df1, self.sample_error_df, ("table", (1, 2)))
+        self.data_state.set_current_state({"df": self.sample_df2, "error_df": self.sample_error_df})
+        version = self.data_state.version
+        self.data_state.restart_session()
+        self.data_state.restart_session()
+
+        self.assertEqual(len(self.data_state.left_state_stack), 0)
+        self.assertEqual(len(self.data_state.right_state_stack), 1)
+        self.assertIs(self.data_state.get_current_state()["df"], self.sample_df1)
+        self.assertEqual(self.data_state.dataset, ("table", (1, 2)))
+        self.assertGreater(self.data_state.version, version)
+
+    def test_restart_keeps_the_original_statistics(self):
+        statistics = {"Name": object()}
+        self.data_state.start_session(self.sample_df1, self.sample_error_df, None, statistics)
+        self.data_state.set_current_state({"df": self.sample_df2, "error_df": self.sample_error_df})
+        self.data_state.restart_session()
+        self.assertIs(self.data_state.get_current_state()["statistics"], statistics)
+
+    def test_version_counts_state_changes(self):
+        version = self.data_state.version
+        self.data_state.set_current_state(self.data_instance1)
+        self.data_state.set_current_state(self.data_instance2)
+        self.data_state.undo()
+        self.data_state.redo()
+        self.assertEqual(self.data_state.version, version + 5)
+
+    def test_state_keeps_its_version_through_undo(self):
+        self.data_state.start_session(self.sample_df1, self.sample_error_df)
+        original_version = self.data_state.current_state_version()
+        self.data_state.set_current_state({"df": self.sample_df2, "error_df": self.sample_error_df})
+        self.assertGreater(self.data_state.current_state_version(), original_version)
+        self.data_state.undo()
+        self.assertEqual(self.data_state.current_state_version(), original_version)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -20,7 +20,7 @@ class TestDataTypeMismatch(unittest.TestCase):
         }
         expected_data = {"enrollment_cap":{1:"mismatch",2:"mismatch",8:"mismatch",9:"mismatch",10:"mismatch"}}
         df = pd.DataFrame(test_data)
-        detected_df = datatype_mismatch(df)
+        detected_df = datatype_mismatch(df).to_error_map()
         self.assertEqual(expected_data,detected_df)
 
     def test_no_mismatch(self):
@@ -33,19 +33,19 @@ class TestDataTypeMismatch(unittest.TestCase):
         }
         expected_data = {}
         df = pd.DataFrame(test_data)
-        detected_df = datatype_mismatch(df)
+        detected_df = datatype_mismatch(df).to_error_map()
         self.assertEqual(expected_data,detected_df)
 
     def test_stackoverflow(self):
         test_dataframe = pd.read_csv('../../provided_datasets/stackoverflow_db_uncleaned.csv')
-        detected_df = datatype_mismatch(test_dataframe)
+        detected_df = datatype_mismatch(test_dataframe).to_error_map()
         error_map = {"Age": {4: "mismatch", 5: "mismatch"}}
         self.assertEqual(error_map, detected_df)
 
     #----------Should finish building these tests if full integration doesn't work down the line-------#
     def test_crimes_report_with_main_detector_result(self):
         test_dataframe = pd.read_csv('../../provided_datasets/Crimes_-_One_year_prior_to_present_20250421.csv')
-        detected_df = datatype_mismatch(set_id_column(test_dataframe.head(200)))
+        detected_df = datatype_mismatch(set_id_column(test_dataframe.head(200))).to_error_map()
         expected_error_map = {
   "FBI CD": {
     1: "mismatch",
@@ -57,7 +57,7 @@ class TestDataTypeMismatch(unittest.TestCase):
 
     def test_complaints_with_main_detector_result(self):
         test_dataframe = pd.read_csv('../../provided_datasets/complaints-2025-04-21_17_31.csv')
-        detected_df = datatype_mismatch(set_id_column(test_dataframe.head(200)))
+        detected_df = datatype_mismatch(set_id_column(test_dataframe.head(200))).to_error_map()
         expected_error_map = {
   "ZIP code": {
     5: "mismatch",
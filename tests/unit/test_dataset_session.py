@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import app.routes as routes
+import app.service_helpers as service_helpers
+from app import data_state_manager, engine
+from app.service_helpers import run_detectors
+from data_management.bulk_load import bulk_load
+
+
+class TestDatasetSession(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.table_name = "test_dataset_session"
+        self.df = pd.DataFrame({
+            'ID': [1, 2, 3, 4],
+            'Country': ['USA', None, 'Canada', 'USA'],
+            'Salary': [50000.0, np.nan, 52000.0, 1e6],
+        })
+        self.client = routes.app.test_client()
+
+    def tearDown(self):
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.table_name}"')
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "errors{self.table_name}"')
+
+    def store(self, df):
+        bulk_load(engine, self.table_name, df)
+        bulk_load(engine, "errors" + self.table_name, run_detectors(df).to_dataframe())
+
+    def get_sample(self, rows):
+        return self.client.get(f"/api/get-sample?filename={self.table_name}.csv&datasize={rows}").get_json()
+
+    def test_table_is_loaded_once_per_version(self):
+        self.store(self.df)
+        with mock.patch.object(service_helpers.pd, "read_sql_query", wraps=pd.read_sql_query) as read_sql_query:
+            first = self.get_sample(2)
+            loaded = data_state_manager.get_original_df()
+            second = self.get_sample(3)
+            self.assertEqual(read_sql_query.call_count, 2)
+        self.assertEqual(first, [{'index': 0, 'ID': 1, 'Country': 'USA', 'Salary': 50000.0},
+                                 {'index': 1, 'ID': 2, 'Country': None, 'Salary': None}])
+        self.assertEqual(second[:2], first)
+        self.assertIs(data_state_manager.get_original_df(), loaded)
+        self.assertEqual(len(data_state_manager.left_state_stack), 0)
+        self.assertEqual(len(data_state_manager.right_state_stack), 1)
+
+        # a new upload of the table is a new version
+        self.store(self.df.assign(Country=['Mexico'] * 4))
+        self.assertEqual(self.get_sample(1)[0]["Country"], 'Mexico')
+
+    def test_missing_table_is_an_error(self):
+        self.assertFalse(self.get_sample(2)["success"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from detectors.executor import run_detectors_parallel, run_detectors_sequential
+
+
+class TestDetectorExecutor(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        np.random.seed(4)
+        size = 60
+        self.df = pd.DataFrame({
+            'ID': range(1, size + 1),
+            'Salary': np.concatenate([np.random.normal(100, 10, size - 3), [400, None, -50]]),
+            'Country': ['USA', 'Canada', 'USA', 'Germany', 'Canada'] * 11 + ['Peru', 'Chile', None, 'null', '42'],
+            'Age': [str(age) for age in np.random.randint(18, 70, size - 3)] + ['old', 'undefined', 'young'],
+            'Score': np.random.normal(0, 1, size),
+            'Notes': ['ok'] * (size - 2) + [None, 'rare'],
+        })
+
+    def assert_same_tables(self, expected, actual):
+        np.testing.assert_array_equal(expected.row_id, actual.row_id)
+        np.testing.assert_array_equal(expected.column_code, actual.column_code)
+        np.testing.assert_array_equal(expected.error_code, actual.error_code)
+        self.assertEqual(expected.column_names, actual.column_names)
+        self.assertEqual(expected.error_types, actual.error_types)
+
+    def test_parallel_matches_sequential(self):
+        expected, _ = run_detectors_sequential(self.df)
+        for max_workers in [2, 3, 8]:
+            actual, _ = run_detectors_parallel(self.df, max_workers)
+            self.assert_same_tables(expected, actual)
+
+    def test_timings_per_detector(self):
+        _, timings = run_detectors_parallel(self.df, 2)
+        self.assertEqual(list(timings), ["statistics", "anomaly", "incomplete", "missing", "mismatch"])
+        self.assertTrue(all(seconds >= 0 for seconds in timings.values()))
+
+    def test_input_not_modified(self):
+        original = self.df.copy()
+        run_detectors_parallel(self.df, 4)
+        pd.testing.assert_frame_equal(original, self.df)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from detectors.error_table import ErrorTable, as_error_table
+
+
+class TestErrorTable(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.anomaly_table = ErrorTable.from_column_ids({"Age": [3, 7], "Salary": [7]}, "anomaly")
+        self.missing_table = ErrorTable.from_column_ids({"Salary": [1], "Country": []}, "missing")
+
+    def test_from_column_ids(self):
+        self.assertEqual(len(self.anomaly_table), 3)
+        self.assertEqual(self.anomaly_table.column_names, ["Age", "Salary"])
+        self.assertEqual(self.anomaly_table.error_types, ["anomaly"])
+        self.assertEqual(self.anomaly_table.to_error_map(), {"Age": {3: "anomaly", 7: "anomaly"}, "Salary": {7: "anomaly"}})
+
+    def test_empty_columns_are_skipped(self):
+        self.assertEqual(self.missing_table.column_names, ["Salary"])
+        self.assertEqual(len(ErrorTable.from_column_ids({}, "missing")), 0)
+
+    def test_concat_merges_dictionaries(self):
+        combined = ErrorTable.concat([self.anomaly_table, self.missing_table])
+        self.assertEqual(len(combined), 4)
+        self.assertEqual(combined.column_names, ["Age", "Salary"])
+        self.assertEqual(combined.error_types, ["anomaly", "missing"])
+        self.assertEqual(combined.column_id().tolist(), ["Age", "Age", "Salary", "Salary"])
+        self.assertEqual(combined.error_type().tolist(), ["anomaly", "anomaly", "anomaly", "missing"])
+
+    def test_concat_nothing(self):
+        self.assertEqual(len(ErrorTable.concat([])), 0)
+
+    def test_dataframe_round_trip(self):
+        combined = ErrorTable.concat([self.anomaly_table, self.missing_table])
+        error_df = combined.to_dataframe()
+        self.assertEqual(list(error_df.columns), ["row_id", "column_id", "error_type"])
+        self.assertEqual(error_df["row_id"].tolist(), [3, 7, 7, 1])
+
+        round_trip = ErrorTable.from_dataframe(error_df)
+        np.testing.assert_array_equal(round_trip.row_id, combined.row_id)
+        self.assertEqual(round_trip.column_id().tolist(), combined.column_id().tolist())
+        self.assertEqual(round_trip.error_type().tolist(), combined.error_type().tolist())
+
+    def test_from_dataframe_drops_null_error_types(self):
+        error_df = pd.DataFrame({
+            'row_id': [1, 2, 3],
+            'column_id': ['Country', 'Country', 'Gender'],
+            'error_type': ['missing', None, 'incomplete']
+        })
+        errors = as_error_table(error_df)
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(errors.error_type().tolist(), ['missing', 'incomplete'])
+
+    def test_as_error_table_keeps_tables(self):
+        self.assertIs(as_error_table(self.anomaly_table), self.anomaly_table)
+
+    def test_selections(self):
+        combined = ErrorTable.concat([self.anomaly_table, self.missing_table])
+        self.assertEqual(combined.between_ids(2, 5).row_id.tolist(), [3])
+        self.assertEqual(combined.for_columns(["Salary"]).row_id.tolist(), [7, 1])
+        self.assertEqual(len(combined.for_columns(["NonExistentColumn"])), 0)
+
+    def test_nested_dict_keeps_stored_order(self):
+        combined = ErrorTable.concat([self.anomaly_table, self.missing_table,
+                                      ErrorTable.from_column_ids({"Age": [3], "Salary": [7]}, "mismatch")])
+        nested = combined.to_nested_dict()
+        self.assertEqual(nested, {"Age": {3: ["anomaly", "mismatch"], 7: ["anomaly"]},
+                                  "Salary": {7: ["anomaly", "mismatch"], 1: ["missing"]}})
+        self.assertEqual(list(nested["Salary"]), [7, 1])
+        self.assertEqual(ErrorTable.empty().to_nested_dict(), {})
+
+    def test_nested_dict_matches_cell_by_cell_grouping(self):
+        rng = np.random.default_rng(0)
+        for rows in [50, 2**62]:
+            table = ErrorTable(rng.integers(1, rows, 500), rng.integers(0, 4, 500), rng.integers(0, 3, 500),
+                               ["a", "b", "c", "d"], ["anomaly", "missing", "mismatch"])
+            expected = {}
+            for column, row_id, error_type in zip(table.column_id(), table.row_id.tolist(), table.error_type()):
+                expected.setdefault(column, {}).setdefault(row_id, []).append(error_type)
+            nested = table.to_nested_dict()
+            self.assertEqual(nested, expected)
+            self.assertEqual([list(rows) for rows in nested.values()], [list(rows) for rows in expected.values()])
+
+
+if __name__ == '__main__':
+    unittest.main()
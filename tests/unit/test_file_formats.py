@@ -0,0 +1,64 @@
+import gzip
+import io
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.service_helpers import clean_table_name
+from data_management.file_formats import detect_format, read_upload
+
+
+class TestFileFormats(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.csv = (b'ID,Date,Zip,Flag,Bits,Empty,Notes\n'
+                    b'1,2025-04-21,97201,True,1,,"line\nbreak"\n'
+                    b'2,2025-04-22,XXXXX,False,0,,null\n'
+                    b'3,2025-04-23,10001,true,1,,N/A\n')
+        self.df = pd.read_csv(io.BytesIO(self.csv))
+
+    def test_detects_format_from_bytes(self):
+        self.assertEqual(detect_format(gzip.compress(self.csv)[:8]), "gzip")
+        self.assertEqual(detect_format(b"PAR1\x15\x04"), "parquet")
+        self.assertEqual(detect_format(b"ARROW1\x00\x00"), "arrow")
+        self.assertEqual(detect_format(self.csv[:8]), "csv")
+
+    def test_csv_reads_like_pandas(self):
+        for data in [self.csv, gzip.compress(self.csv)]:
+            pd.testing.assert_frame_equal(read_upload(io.BytesIO(data)), self.df)
+
+    def test_repeated_header_reads_like_pandas(self):
+        data = b"a,a,b\n1,2,x\n3,4,y\n"
+        pd.testing.assert_frame_equal(read_upload(io.BytesIO(data)), pd.read_csv(io.BytesIO(data)))
+
+    def test_integers_past_int64_read_like_pandas(self):
+        for data in [b"a,b\n1,18446744073709551615\n2,3\n", b"a,b\n1,-99999999999999999999999\n2,\n",
+                     b"a,b\n1,1e19\n2,3\n"]:
+            expected = pd.read_csv(io.BytesIO(data))
+            pd.testing.assert_frame_equal(read_upload(io.BytesIO(data)), expected)
+        self.assertEqual(read_upload(io.BytesIO(b"a\n-99999999999999999999999\n"))["a"][0], "-99999999999999999999999")
+
+    def test_arrow_formats(self):
+        parquet_file = io.BytesIO()
+        self.df.to_parquet(parquet_file)
+        feather_file = io.BytesIO()
+        self.df.to_feather(feather_file)
+        stream_file = io.BytesIO()
+        table = pa.Table.from_pandas(self.df)
+        with pa.ipc.new_stream(stream_file, table.schema) as writer:
+            writer.write_table(table)
+        for uploaded in [parquet_file, feather_file, stream_file]:
+            uploaded.seek(0)
+            pd.testing.assert_frame_equal(read_upload(uploaded), self.df)
+        self.assertTrue(np.isnan(self.df["Notes"][1]))
+
+    def test_table_name_without_format_extension(self):
+        self.assertEqual(clean_table_name("sales_data.parquet"), "sales_data")
+        self.assertEqual(clean_table_name("Sales Data.csv.gz"), "sales_data")
+
+
+if __name__ == '__main__':
+    unittest.main()
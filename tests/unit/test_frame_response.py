@@ -0,0 +1,54 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import app.routes as routes
+from app import data_state_manager
+from app.frame_response import arrow_stream_type
+
+
+class TestFrameResponse(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.df = pd.DataFrame({
+            'ID': [1, 2, 3],
+            'Country': ['USA', None, 'Canada'],
+            'Salary': [50000.0, np.nan, 52000.0],
+            'Zip': [97201, 'XXXXX', 10001],
+        })
+        self.client = routes.app.test_client()
+        data_state_manager.start_session(self.df, pd.DataFrame(columns=["row_id", "column_id", "error_type"]), None)
+
+    def test_records_stay_the_default(self):
+        response = self.client.get("/api/plots/undo")
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertIn("Accept", response.headers["Vary"])
+        body = response.get_json()
+        self.assertTrue(body["success"])
+        self.assertEqual(len(body["df"]), 3)
+        self.assertEqual(body["df"][1]["Country"], None)
+
+    def test_arrow_stream(self):
+        response = self.client.get("/api/plots/undo", headers={"Accept": arrow_stream_type})
+        self.assertEqual(response.mimetype, arrow_stream_type)
+        table = pa.ipc.open_stream(response.data).read_all()
+        self.assertEqual(json.loads(table.schema.metadata[b"buckaroo"]), {"success": True})
+        self.assertEqual(table.column_names, ["ID", "Country", "Salary", "Zip"])
+        self.assertEqual(table.schema.field("Salary").type, pa.float64())
+        self.assertEqual(table.column("Salary").to_pylist(), [50000.0, None, 52000.0])
+        # a column mixing types is sent as text
+        self.assertEqual(table.column("Zip").to_pylist(), ["97201", "XXXXX", "10001"])
+
+    def test_column_lists(self):
+        body = self.client.get("/api/plots/undo?format=columns").get_json()
+        self.assertEqual(body["df"]["ID"], [1, 2, 3])
+        self.assertEqual(body["df"]["Salary"], [50000.0, None, 52000.0])
+        self.assertEqual(body["df"]["Country"], ["USA", None, "Canada"])
+
+
+if __name__ == '__main__':
+    unittest.main()
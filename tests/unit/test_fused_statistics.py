@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from detectors.anomaly import anomaly
+from detectors.fused_statistics import FusedStatistics, compute_fused_statistics
+from detectors.missing_value import missing_value
+
+
+class TestFusedStatistics(unittest.TestCase):
+
+    def test_object_column(self):
+        statistics = FusedStatistics(pd.Series(['USA', '12', None, 'null', 3.5], dtype=object))
+        np.testing.assert_array_equal(statistics.null_mask, [False, False, True, False, False])
+        self.assertEqual(statistics.numeric_count, 2)
+        self.assertEqual(statistics.value_counts['USA'], 1)
+        self.assertEqual(statistics.profile.null_count, 1)
+        self.assertEqual(statistics.mean, 7.75)
+        # too few numbers for anomaly to check, the coerced values are not kept
+        self.assertIsNone(statistics.numeric_values)
+
+    def test_numeric_column_is_not_counted(self):
+        column = pd.Series([1.0, 2.0, 4.0, np.nan])
+        statistics = FusedStatistics(column)
+        self.assertIsNone(statistics.value_counts)
+        self.assertIsNone(statistics.profile)
+        self.assertAlmostEqual(statistics.mean, column.mean())
+        self.assertAlmostEqual(statistics.std, column.std())
+
+    def test_numeric_values_kept_for_anomaly(self):
+        statistics = FusedStatistics(pd.Series(['x'] + [str(value) for value in range(10)], dtype=object))
+        np.testing.assert_array_equal(statistics.numeric_values, [np.nan] + list(range(10)))
+
+    def test_single_value_has_no_moments(self):
+        statistics = FusedStatistics(pd.Series([5.0]))
+        self.assertTrue(np.isnan(statistics.mean))
+        self.assertTrue(np.isnan(statistics.std))
+
+    def test_detectors_reuse_statistics(self):
+        df = pd.DataFrame({'ID': range(1, 13), 'Salary': [10.0] * 11 + [500.0], 'Name': ['a'] * 11 + ['undefined']})
+        statistics = compute_fused_statistics(df, df.columns)
+        self.assertEqual(anomaly(df, ['Salary'], statistics).to_error_map(), anomaly(df).to_error_map())
+        self.assertEqual(missing_value(df, list(df.columns), statistics).to_error_map(), {'Name': {12: 'missing'}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app import engine
+from detectors.executor import run_detectors_sequential
+from detectors.in_database import run_sql_detectors
+
+
+class TestInDatabaseDetectors(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        np.random.seed(4)
+        size = 60
+        self.table_name = "test_in_database_detectors"
+        self.df = pd.DataFrame({
+            'ID': range(1, size + 1),
+            'Salary': np.concatenate([np.random.normal(100, 10, size - 3), [400, np.nan, -50]]),
+            'Country': ['USA', 'Canada', 'USA', 'Germany', 'Canada'] * 11 + ['Peru', 'Chile', None, 'null', '42'],
+            'Age': [str(age) for age in np.random.randint(18, 70, size - 3)] + ['old', 'undefined', 'young'],
+            'Score': np.random.normal(0, 1, size),
+            'Notes': ['ok'] * (size - 2) + [None, 'rare'],
+        })
+        self.df.to_sql(self.table_name, engine, if_exists='replace')
+
+    def tearDown(self):
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.table_name}"')
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "errors{self.table_name}"')
+
+    def test_matches_pandas_detectors(self):
+        inserted = run_sql_detectors(engine, self.table_name)
+        actual = pd.read_sql_query(f'SELECT * FROM "errors{self.table_name}" ORDER BY "index"', engine)
+        expected = run_detectors_sequential(self.df)[0].to_dataframe()
+        self.assertEqual(inserted, len(expected))
+        self.assertEqual(list(zip(expected.row_id, expected.column_id, expected.error_type)),
+                         list(zip(actual.row_id, actual.column_id, actual.error_type)))
+
+    def test_runs_again_on_the_same_table(self):
+        first = run_sql_detectors(engine, self.table_name)
+        self.assertEqual(first, run_sql_detectors(engine, self.table_name))
+
+
+if __name__ == '__main__':
+    unittest.main()
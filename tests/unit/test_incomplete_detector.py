@@ -25,7 +25,7 @@ class TestIncompleteTesting(unittest.TestCase):
                                 "professor":{1: "incomplete", 2: "incomplete", 3: "incomplete", 4: "incomplete", 5: "incomplete"}
                                 }
         data_frame = pd.DataFrame(test_data)
-        detected_frame = incomplete(data_frame)
+        detected_frame = incomplete(data_frame).to_error_map()
         self.assertEqual(expected_dictionary, detected_frame)
 
     def test_none_incomplete(self):
@@ -43,12 +43,12 @@ class TestIncompleteTesting(unittest.TestCase):
 
         expected_dictionary = {}
         data_frame = pd.DataFrame(test_data)
-        detected_frame = incomplete(data_frame)
+        detected_frame = incomplete(data_frame).to_error_map()
         self.assertEqual(expected_dictionary, detected_frame)
 
     def test_uncleaned_stackoverflow_with_main_detector_result(self):
         test_dataframe = pd.read_csv('../../provided_datasets/stackoverflow_db_uncleaned.csv')
-        detected_df = incomplete(test_dataframe.head(200))
+        detected_df = incomplete(test_dataframe.head(200)).to_error_map()
         expected_error_map = {
             "Age": {3: "incomplete", 4: "incomplete", 5: "incomplete", 105: "incomplete", 159: "incomplete"},
             "Country": {61: "incomplete", 85: "incomplete", 107: "incomplete", 147: "incomplete", 204: "incomplete",
@@ -64,7 +64,7 @@ class TestIncompleteTesting(unittest.TestCase):
     #----------Should finish building these tests if full integration doesn't work down the line-------#
     def test_crimes_report_with_main_detector_result(self):
         test_dataframe = pd.read_csv('../../provided_datasets/Crimes_-_One_year_prior_to_present_20250421.csv')
-        detected_df = incomplete(set_id_column(test_dataframe.head(200)))
+        detected_df = incomplete(set_id_column(test_dataframe.head(200))).to_error_map()
         expected_error_map = {
   " LOCATION DESCRIPTION": {
     1: "incomplete",
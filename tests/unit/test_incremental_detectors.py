@@ -0,0 +1,106 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.service_helpers import run_detectors
+from detectors.column_statistics import ColumnStatistics
+from detectors.incremental import build_statistics, detect_after_impute, detect_after_remove
+from wranglers.impute_average import impute_average_on_ids
+from wranglers.remove_data import remove_data
+
+
+def error_triples(errors):
+    return sorted(zip(errors.row_id.tolist(), errors.column_id().tolist(), errors.error_type().tolist()))
+
+
+class TestColumnStatistics(unittest.TestCase):
+    def test_moments(self):
+        column = pd.Series([1.0, 2.0, None, 4.0, "text"], dtype=object)
+        statistics = ColumnStatistics.from_series(column)
+        self.assertEqual(statistics.numeric_count, 3)
+        self.assertAlmostEqual(statistics.mean(), pd.Series([1.0, 2.0, 4.0]).mean())
+        self.assertAlmostEqual(statistics.std(), pd.Series([1.0, 2.0, 4.0]).std())
+
+    def test_update_matches_recount(self):
+        column = pd.Series(["a", "a", "b", "10", "c", "c"])
+        statistics = ColumnStatistics.from_series(column)
+        updated = statistics.updated(pd.Series(["c", "10"]), pd.Series(["a", "d"]))
+        recounted = ColumnStatistics.from_series(pd.Series(["a", "a", "b", "c", "a", "d"]))
+
+        self.assertEqual(updated.value_counts, recounted.value_counts)
+        self.assertEqual(updated.type_counts, recounted.type_counts)
+        self.assertEqual(updated.numeric_count, recounted.numeric_count)
+        # the original statistics are left alone
+        self.assertEqual(statistics.value_counts["c"], 2)
+
+    def test_counts_match_the_types_of_every_value(self):
+        column = pd.Series([3, "3", " 7 ", "x", 2.5, None, "x", 3], dtype=object)
+        statistics = ColumnStatistics.from_series(column)
+        self.assertEqual(statistics.type_counts, {"int": 2, "str": 2, "numeric": 2, "float": 1})
+        self.assertEqual(statistics.numeric_count, 5)
+        self.assertAlmostEqual(statistics.mean(), pd.Series([3, 3, 7, 2.5, 3]).mean())
+        self.assertEqual(ColumnStatistics.from_series(pd.Series([4, 5, 4])).type_counts, {"int": 3})
+
+
+class TestIncrementalDetectors(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        np.random.seed(3)
+        size = 40
+        self.df = pd.DataFrame({
+            'ID': range(1, size + 1),
+            'Salary': np.concatenate([np.random.normal(100, 10, size - 2), [400, None]]),
+            'Country': ['USA', 'Canada', 'USA', 'Germany', 'Canada'] * 7 + ['Peru', 'Chile', 'Chile', 'Chile', '42'],
+            'Age': [str(age) for age in np.random.randint(18, 70, size - 3)] + ['old', 'null', 'young'],
+        })
+        self.errors = run_detectors(self.df)
+        self.statistics = build_statistics(self.df)
+
+    def test_remove_matches_full_run(self):
+        removed_ids = [2, 36, 39]
+        wrangled_df = remove_data(self.df, list(removed_ids))
+        removed_rows = self.df[self.df['ID'].isin(removed_ids)]
+
+        errors, _ = detect_after_remove(wrangled_df, self.errors, self.statistics, removed_rows)
+        self.assertEqual(error_triples(run_detectors(wrangled_df)), error_triples(errors))
+
+    def test_remove_makes_value_rare(self):
+        # removing one of the three Chile rows makes the other two incomplete
+        self.assertNotIn((37, 'Country', 'incomplete'), error_triples(self.errors))
+        wrangled_df = remove_data(self.df, [38])
+        errors, _ = detect_after_remove(wrangled_df, self.errors, self.statistics, self.df[self.df['ID'] == 38])
+
+        self.assertIn((37, 'Country', 'incomplete'), error_triples(errors))
+        self.assertIn((39, 'Country', 'incomplete'), error_triples(errors))
+        self.assertEqual(error_triples(run_detectors(wrangled_df)), error_triples(errors))
+
+    def test_impute_matches_full_run(self):
+        for column, imputed_ids in [('Salary', [39, 40]), ('Country', [36]), ('Age', [38, 39])]:
+            previous_values = self.df.loc[self.df['ID'].isin(imputed_ids), column]
+            wrangled_df = impute_average_on_ids(column, self.df, list(imputed_ids))
+
+            errors, _ = detect_after_impute(wrangled_df, self.errors, self.statistics, column, imputed_ids, previous_values)
+            self.assertEqual(error_triples(run_detectors(wrangled_df)), error_triples(errors))
+
+    def test_chained_wrangles(self):
+        df, errors, statistics = self.df, self.errors, self.statistics
+        wrangled_df = remove_data(df, [40])
+        errors, statistics = detect_after_remove(wrangled_df, errors, statistics, df[df['ID'] == 40])
+        df = wrangled_df
+
+        previous_values = df.loc[df['ID'].isin([37]), 'Country']
+        wrangled_df = impute_average_on_ids('Country', df, [37])
+        errors, statistics = detect_after_impute(wrangled_df, errors, statistics, 'Country', [37], previous_values)
+        self.assertEqual(error_triples(run_detectors(wrangled_df)), error_triples(errors))
+
+    def test_previous_statistics_unchanged(self):
+        wrangled_df = remove_data(self.df, [1, 2])
+        _, statistics = detect_after_remove(wrangled_df, self.errors, self.statistics, self.df[self.df['ID'].isin([1, 2])])
+        self.assertEqual(self.statistics['Country'].value_counts['USA'], 14)
+        self.assertEqual(statistics['Country'].value_counts['USA'], 13)
+
+
+if __name__ == '__main__':
+    unittest.main()
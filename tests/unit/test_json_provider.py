@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import app.routes as routes
+
+
+class TestJsonProvider(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.json = routes.app.json
+        self.df = pd.DataFrame({
+            'ID': [1, 2],
+            'Salary': [50000.0, np.nan],
+            'Date': pd.to_datetime(['2025-04-21', None]),
+        })
+
+    def test_numpy_values(self):
+        encoded = self.json.dumps({"mean": np.float64(2.5), "count": np.int64(3), "flag": np.bool_(True),
+                                   "values": np.array([1.0, np.nan, np.inf]), "strided": self.df.to_numpy()[:, 0]})
+        self.assertEqual(self.json.loads(encoded), {"mean": 2.5, "count": 3, "flag": True,
+                                                    "values": [1.0, None, None], "strided": [1, 2]})
+
+    def test_pandas_values(self):
+        encoded = self.json.dumps({"table": self.df, "bin": pd.Interval(0, 10), "categories": pd.Index(["a", "b"])})
+        self.assertEqual(self.json.loads(encoded), {
+            "table": [{"ID": 1, "Salary": 50000.0, "Date": "2025-04-21T00:00:00"},
+                      {"ID": 2, "Salary": None, "Date": None}],
+            "bin": {"x0": 0, "x1": 10},
+            "categories": ["a", "b"],
+        })
+
+    def test_keys_are_strings(self):
+        self.assertEqual(self.json.loads(self.json.dumps({1: [np.int64(2)], np.int64(3): "x"})),
+                         {"1": [2], "3": "x"})
+
+    def test_unknown_type_raises(self):
+        with self.assertRaises(TypeError):
+            self.json.dumps({"value": object()})
+
+
+if __name__ == '__main__':
+    unittest.main()
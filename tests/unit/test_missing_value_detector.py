@@ -14,36 +14,47 @@ class TestMissing(unittest.TestCase):
         :return:
         """
         df = pd.DataFrame({"ID": range(1,4),"animals":['ant', 'bee', 'cat'], "pets":['dog', None, 'fly']})
-        detected_df = missing_value(df)
+        detected_df = missing_value(df).to_error_map()
         error_map = {"pets":{2:"missing"}}
         self.assertEqual(error_map,detected_df)
 
     def test_many_None(self):
         df = pd.DataFrame({"ID": range(1,4),"animals":['ant', None, 'cat'], "pets":['dog', None, None]})
-        detected_df = missing_value(df)
+        detected_df = missing_value(df).to_error_map()
         error_map = {"animals":{2: "missing"},"pets":{2:"missing",3:"missing"}}
         self.assertEqual(error_map,detected_df)
 
     def test_many_NaNs(self):
         df = pd.DataFrame({"ID": range(1,4),"animals":['ant', np.nan, 'cat'], "pets":['dog', np.nan, np.nan]})
-        detected_df = missing_value(df)
+        detected_df = missing_value(df).to_error_map()
         error_map = {"animals":{2: "missing"},"pets":{2:"missing",3:"missing"}}
         self.assertEqual(error_map,detected_df)
 
     def test_missing_value_strings(self):
         df = pd.DataFrame({"ID": range(1,4),"animals":['ant', "null", 'cat'], "pets":['dog', "undefined", "null"]})
-        detected_df = missing_value(df)
+        detected_df = missing_value(df).to_error_map()
         error_map = {"animals":{2: "missing"},"pets":{2:"missing",3:"missing"}}
         self.assertEqual(error_map, detected_df)
     def test_missing_value_mix(self):
         df = pd.DataFrame({"ID": range(1,4),"animals":['ant', "null", None], "pets":[np.nan, "undefined", None]})
-        detected_df = missing_value(df)
+        detected_df = missing_value(df).to_error_map()
         error_map = {"animals":{2: "missing",3: "missing"},"pets":{1:"missing",2:"missing",3:"missing"}}
         self.assertEqual(error_map, detected_df)
 
+    def test_missing_value_typed_columns(self):
+        df = pd.DataFrame({"ID": range(1,4), "salary": [1.5, np.nan, 3.0], "joined": pd.to_datetime(["2020-01-01", None, "2021-01-01"]),
+                           "animals": pd.Series(['ant', 'null', 'cat'], dtype="category")})
+        detected_df = missing_value(df).to_error_map()
+        error_map = {"salary": {2: "missing"}, "joined": {2: "missing"}, "animals": {2: "missing"}}
+        self.assertEqual(error_map, detected_df)
+
+    def test_nothing_missing(self):
+        df = pd.DataFrame({"ID": range(1,4), "animals": ['ant', 'bee', 'cat']})
+        self.assertEqual(len(missing_value(df)), 0)
+
     def test_uncleaned_stackoverflow_with_main_detector_result(self):
         test_dataframe = pd.read_csv('../../provided_datasets/stackoverflow_db_uncleaned.csv')
-        detected_df = missing_value(test_dataframe.head(200))
+        detected_df = missing_value(test_dataframe.head(200)).to_error_map()
         expected_error_map = {"Continent":{8:"missing",9:"missing",10:"missing",12:"missing",13:"missing",14:"missing",15:"missing",
                                            16:"missing",17:"missing"}}
         self.assertEqual(expected_error_map, detected_df)
@@ -51,7 +62,7 @@ class TestMissing(unittest.TestCase):
     #----------Should finish building these tests if full integration doesn't work down the line-------#
     def test_crimes_report_with_main_detector_result(self):
         test_dataframe = pd.read_csv('../../provided_datasets/Crimes_-_One_year_prior_to_present_20250421.csv')
-        detected_df = missing_value(set_id_column(test_dataframe.head(200)))
+        detected_df = missing_value(set_id_column(test_dataframe.head(200))).to_error_map()
         expected_error_map = {
   "LATITUDE": {
     1: "missing",
@@ -91,7 +102,7 @@ class TestMissing(unittest.TestCase):
 #         #              "NULL", "NaN", "nan", "null", "undefined"]
 #         # test_dataframe = pd.read_csv('../provided_datasets/complaints-2025-04-21_17_31.csv',na_values=na_values,keep_default_na=False)
 #         test_dataframe = pd.read_csv('../provided_datasets/complaints-2025-04-21_17_31.csv')
-#         detected_df = missing_value(set_id_column(test_dataframe.head(200)))
+#         detected_df = missing_value(set_id_column(test_dataframe.head(200))).to_error_map()
 #         expected_error_map = {
 #                 "Company public response": {
 #     1: "missing",
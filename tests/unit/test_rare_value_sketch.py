@@ -0,0 +1,49 @@
+import io
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.service_helpers import run_detectors
+from detectors.chunked import detect_in_chunks
+from detectors.rare_value_sketch import RareValueSketch
+
+
+class TestRareValueSketch(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        np.random.seed(9)
+        common = [f"common{number}" for number in range(20)] * 5
+        rare = [f"rare{number}" for number in range(200)] + ["twice", "twice"]
+        self.column = pd.Series(np.random.permutation(np.array(common + rare + [None] * 3, dtype=object)))
+
+    def sketch_of(self, column, memory_cap):
+        sketch = RareValueSketch(memory_cap)
+        sketch.add(column.dropna())
+        sketch.count_candidates(column.dropna())
+        return sketch
+
+    def test_matches_exact_counts(self):
+        value_counts = self.column.value_counts()
+        expected = self.column.isin(value_counts[value_counts < 3].index).to_numpy()
+        # a small sketch puts many values in the same counters, the candidates are still counted exactly
+        for memory_cap in [8192, 1 << 20]:
+            np.testing.assert_array_equal(self.sketch_of(self.column, memory_cap).rare_mask(self.column), expected)
+
+    def test_overflow_never_flags_common_values(self):
+        sketch = self.sketch_of(self.column, 64)
+        self.assertTrue(sketch.overflowed)
+        flagged = set(self.column[sketch.rare_mask(self.column)])
+        self.assertFalse(any(str(value).startswith("common") for value in flagged))
+
+    def test_chunked_detection_with_sketch(self):
+        df = pd.DataFrame({"Name": self.column, "Score": np.random.normal(0, 1, len(self.column))})
+        csv = df.to_csv(index=False)
+        expected = run_detectors(pd.read_csv(io.StringIO(csv), low_memory=False))
+        detected = detect_in_chunks(io.StringIO(csv), 50, memory_cap=8192)
+        self.assertEqual(expected.to_error_map(), detected.to_error_map())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import app.plot_routes as plot_routes
+import app.routes as routes
+from app import data_state_manager, response_cache
+from data_management.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.cache = ResponseCache(max_bytes=10)
+        self.df = pd.DataFrame({'ID': [1, 2, 3], 'Salary': [50000.0, 52000.0, 1e6]})
+        self.client = routes.app.test_client()
+        response_cache.clear()
+        data_state_manager.start_session(self.df, pd.DataFrame(columns=["row_id", "column_id", "error_type"]),
+                                         ("test_response_cache", (1, 2)))
+
+    def test_least_recently_used_are_evicted(self):
+        self.cache.put("a", b"1234", "application/json")
+        self.cache.put("b", b"1234", "application/json")
+        self.assertEqual(self.cache.get("a"), (b"1234", "application/json"))
+        self.cache.put("c", b"1234", "application/json")
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.statistics(), {"entries": 2, "bytes": 8, "max_bytes": 10, "hits": 1, "misses": 1})
+
+        self.cache.put("a", b"12345678", "application/json")
+        self.assertEqual(list(self.cache.entries), ["a"])
+        self.assertEqual(self.cache.cached_bytes, 8)
+
+    def test_undo_serves_the_earlier_state(self):
+        url = "/api/plots/2-d-histogram-data?x_column=ID&y_column=Salary"
+        with mock.patch.object(plot_routes, "generate_2d_histogram_data",
+                               side_effect=lambda *args: {"rows": len(data_state_manager.get_current_state()["df"])}) \
+                as generate:
+            self.assertEqual(self.client.get(url).get_json()["binned_data"], {"rows": 3})
+            self.assertEqual(self.client.get(url).get_json()["binned_data"], {"rows": 3})
+            self.assertEqual(generate.call_count, 1)
+
+            data_state_manager.set_current_state({"df": self.df.head(2), "error_df": None})
+            self.assertEqual(self.client.get(url).get_json()["binned_data"], {"rows": 2})
+            data_state_manager.undo()
+            self.assertEqual(self.client.get(url).get_json()["binned_data"], {"rows": 3})
+            self.assertEqual(generate.call_count, 2)
+
+        statistics = self.client.get("/api/plots/cache-statistics").get_json()["data"]
+        self.assertEqual((statistics["hits"], statistics["misses"], statistics["entries"]), (2, 2, 2))
+
+    def test_failures_are_not_cached(self):
+        url = "/api/plots/summaries?min_id=0&max_id=10"
+        with mock.patch.object(plot_routes, "generate_complete_json", side_effect=ValueError("no table")):
+            self.assertFalse(self.client.get(url).get_json()["success"])
+        self.assertEqual(len(response_cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
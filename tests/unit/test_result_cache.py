@@ -0,0 +1,67 @@
+import hashlib
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from detectors.executor import run_detectors_sequential
+from detectors.result_cache import DetectorResultCache, column_hash, run_detectors_cached
+
+
+class TestDetectorResultCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        np.random.seed(10)
+        size = 40
+        self.df = pd.DataFrame({
+            'ID': range(1, size + 1),
+            'Salary': np.concatenate([np.random.normal(100, 10, size - 2), [400, None]]),
+            'Country': ['USA', 'Canada', 'USA', 'Germany', 'Canada'] * 7 + ['Peru', 'Chile', None, 'null', '42'],
+        })
+        self.cache = DetectorResultCache()
+
+    def test_matches_uncached_run(self):
+        expected, _ = run_detectors_sequential(self.df)
+        for _ in range(2):
+            errors, _ = run_detectors_cached(self.df, self.cache)
+            self.assertEqual(expected.to_error_map(), errors.to_error_map())
+            np.testing.assert_array_equal(expected.row_id, errors.row_id)
+
+    def test_only_changed_columns_run(self):
+        run_detectors_cached(self.df, self.cache)
+        _, timings = run_detectors_cached(self.df, self.cache)
+        self.assertEqual(list(timings), ["hashing"])
+
+        changed_df = self.df.copy()
+        changed_df.loc[3, 'Country'] = 'Chile'
+        errors, timings = run_detectors_cached(changed_df, self.cache)
+        self.assertIn("statistics", timings)
+        self.assertEqual(run_detectors_sequential(changed_df)[0].to_error_map(), errors.to_error_map())
+
+    def test_hash_tells_types_apart(self):
+        ids_digest = hashlib.blake2b(np.arange(3).tobytes()).digest()
+        numbers = column_hash(pd.Series([1, 'a', 2], dtype=object), ids_digest)
+        strings = column_hash(pd.Series(['1', 'a', '2'], dtype=object), ids_digest)
+        self.assertNotEqual(numbers, strings)
+        self.assertEqual(numbers, column_hash(pd.Series([1, 'a', 2], dtype=object), ids_digest))
+
+    def test_hash_covers_ids(self):
+        column = pd.Series(['a', 'b'])
+        first = column_hash(column, hashlib.blake2b(np.array([1, 2]).tobytes()).digest())
+        second = column_hash(column, hashlib.blake2b(np.array([1, 3]).tobytes()).digest())
+        self.assertNotEqual(first, second)
+
+    def test_least_recently_used_are_evicted(self):
+        cache = DetectorResultCache(max_bytes=16)
+        cache.put("first", [1])
+        cache.put("second", [2])
+        cache.get("first")
+        cache.put("third", [3])
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(cache.get("first").tolist(), [1])
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import app.routes as routes
+from app import engine
+from app.service_helpers import run_detectors
+from data_management.bulk_load import bulk_load
+from data_management.row_window import fetch_row_window
+from data_management.schema_inference import infer_schema
+from data_management.table_layout import index_name, organize_table
+
+
+class TestRowWindow(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.table_name = "test_row_window"
+        rng = np.random.default_rng(0)
+        rows = 57
+        self.df = pd.DataFrame({
+            'ID': np.arange(1, rows + 1),
+            'Date': pd.Series(pd.date_range("2025-01-01", periods=5).strftime("%m/%d/%y"))[rng.integers(0, 5, rows)]
+                .to_numpy(dtype=object),
+            'Country': np.array(['USA', 'Canada', None, 'Mexico'], dtype=object)[rng.integers(0, 4, rows)],
+            'Salary': np.where(rng.random(rows) < 0.2, np.nan, rng.integers(1, 6, rows) * 1000.0),
+        })
+        bulk_load(engine, self.table_name, self.df, schema=infer_schema(self.df))
+        bulk_load(engine, "errors" + self.table_name, run_detectors(self.df).to_dataframe())
+        organize_table(engine, self.table_name, rows)
+
+    def tearDown(self):
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.table_name}"')
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "errors{self.table_name}"')
+
+    def page_ids(self, **window_args):
+        ids, after = [], None
+        while True:
+            window = fetch_row_window(engine, self.table_name, after=after, limit=10, **window_args)
+            ids.extend(row["ID"] for row in window["rows"])
+            after = window["next_after"]
+            if after is None:
+                return ids
+
+    def test_pages_follow_the_sort(self):
+        for column in ['ID', 'Country', 'Salary']:
+            for descending in [False, True]:
+                expected = self.df.sort_values([column, 'ID'], ascending=not descending, kind="stable",
+                                               na_position='first' if descending else 'last')["ID"].tolist()
+                self.assertEqual(self.page_ids(sort_column=column, descending=descending), expected,
+                                 f"{column} descending={descending}")
+
+    def test_filter_on_typed_column(self):
+        expected = self.df[self.df['Date'] == '01/03/25'].sort_values('Salary', na_position='last', kind="stable")
+        ids = self.page_ids(sort_column='Salary', filter_column='Date', filter_value='01/03/25')
+        self.assertEqual(sorted(ids), sorted(expected["ID"].tolist()))
+        window = fetch_row_window(engine, self.table_name, filter_column='Date', filter_value='01/03/25')
+        self.assertTrue(all(row['Date'] == '01/03/25' for row in window["rows"]))
+
+    def test_window_errors(self):
+        window = fetch_row_window(engine, self.table_name, after=20, limit=15)
+        self.assertEqual([row["ID"] for row in window["rows"]], list(range(21, 36)))
+        errors = run_detectors(self.df).to_dataframe()
+        expected = errors[errors["row_id"].between(21, 35)]
+        self.assertEqual(sum(len(types) for rows in window["errors"].values() for types in rows.values()),
+                         len(expected))
+        for column_id, row_id, error_type in expected[["column_id", "row_id", "error_type"]].values.tolist():
+            self.assertIn(error_type, window["errors"][column_id][row_id])
+
+    def test_get_errors_reads_the_range(self):
+        client = routes.app.test_client()
+        body = client.get(f"/api/get-errors?filename={self.table_name}.csv&datasize=30").get_json()
+        errors = run_detectors(self.df)
+        expected = {column: {str(row_id): types for row_id, types in rows.items()}
+                    for column, rows in errors.between_ids(1, 30).to_nested_dict().items()}
+        self.assertEqual(body, expected)
+
+    def test_values_longer_than_a_btree_entry(self):
+        # random text does not compress below the size of a btree entry
+        text = "".join(np.random.default_rng(1).choice(list("abcdefghijklmnopqrstuvwxyz"), 9000))
+        narrative = np.array(['b' + text, 'a' + text + 'z', 'a' + text + 'y', None, 'c'], dtype=object)
+        self.df = self.df.assign(Narrative=narrative[np.arange(len(self.df)) % len(narrative)])
+        bulk_load(engine, self.table_name, self.df, schema=infer_schema(self.df))
+        bulk_load(engine, "errors" + self.table_name, run_detectors(self.df).to_dataframe())
+        self.assertIn('Narrative', organize_table(engine, self.table_name, len(self.df))["window_columns"])
+        for descending in [False, True]:
+            expected = self.df.sort_values(['Narrative', 'ID'], ascending=not descending, kind="stable",
+                                           na_position='first' if descending else 'last')["ID"].tolist()
+            self.assertEqual(self.page_ids(sort_column='Narrative', descending=descending), expected)
+        ids = self.page_ids(sort_column='Salary', filter_column='Narrative', filter_value='a' + text + 'y')
+        self.assertEqual(sorted(ids), self.df.loc[self.df['Narrative'] == 'a' + text + 'y', 'ID'].tolist())
+
+    def test_windows_do_not_build_indexes(self):
+        query = f"SELECT count(*) AS indexes FROM pg_indexes WHERE tablename = '{self.table_name}'"
+        indexes = pd.read_sql_query(query, engine)["indexes"][0]
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'DROP INDEX "{index_name(self.table_name, "window", ["Country"])}"')
+        ids = self.page_ids(sort_column='Country', filter_column='Salary', filter_value='3000')
+        self.assertEqual(sorted(ids), self.df.loc[self.df['Salary'] == 3000, 'ID'].tolist())
+        self.assertEqual(pd.read_sql_query(query, engine)["indexes"][0], indexes - 1)
+
+    def test_endpoint(self):
+        client = routes.app.test_client()
+        response = client.get(f"/api/get-rows?filename={self.table_name}.csv&limit=5&sort=Country&order=desc")
+        body = response.get_json()
+        self.assertTrue(body["success"])
+        self.assertEqual(len(body["rows"]), 5)
+        self.assertFalse(client.get(f"/api/get-rows?filename={self.table_name}.csv&sort=Nope").get_json()["success"])
+
+
+if __name__ == '__main__':
+    unittest.main()
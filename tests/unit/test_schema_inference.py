@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app import engine
+from app.service_helpers import get_stored_table_query
+from data_management.bulk_load import bulk_load
+from data_management.schema_inference import infer_column_schema, infer_schema
+from detectors.in_database import run_sql_detectors
+
+
+class TestSchemaInference(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.table_name = "test_schema_inference"
+        self.df = pd.DataFrame({
+            'ID': [1, 2, 3, 4, 5, 6],
+            'Date received': ['04/21/25', '04/20/25', None, '12/31/24', '04/21/25', '01/02/25'],
+            'Zip': ['97201', '10001', 'XXXXX', '97201', None, '30301'],
+            'Count': ['12', '-3', '0', '4000000000', '7', None],
+            'Price': ['1.50', '2', '0.25', '-3.125', None, '10'],
+            'Padded': ['007', '12', '3', '4', '5', '6'],
+            'Salary': [50000.5, np.nan, 61000.0, 58000.0, 1e6, 52000.0],
+            'Name': ['a', 'b', 'c', 'd', 'e', 'f'],
+        })
+
+    def tearDown(self):
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.table_name}"')
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "errors{self.table_name}"')
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "errors{self.table_name}_plain"')
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.table_name}_plain"')
+
+    def test_narrowest_types(self):
+        schema = infer_schema(self.df)
+        self.assertEqual(schema['ID'], {"type": "INTEGER", "text_format": None})
+        self.assertEqual(schema['Date received'], {"type": "DATE", "text_format": "%m/%d/%y"})
+        self.assertEqual(schema['Count'], {"type": "BIGINT", "text_format": "text"})
+        self.assertEqual(schema['Price'], {"type": "NUMERIC", "text_format": "text"})
+        # values the type writes back differently, or which the detectors report, stay text
+        for column in ['Zip', 'Padded', 'Salary', 'Name']:
+            self.assertNotIn(column, schema)
+
+    def test_dates_not_written_back_the_same_stay_text(self):
+        self.assertIsNone(infer_column_schema(pd.Series(['4/21/25', '04/20/25'])))
+        self.assertIsNone(infer_column_schema(pd.Series(['2025-04-21', '04/20/25'])))
+
+    def test_typed_table_reads_back_as_uploaded(self):
+        bulk_load(engine, self.table_name, self.df, schema=infer_schema(self.df))
+        types = dict(pd.read_sql_query("SELECT column_name, data_type FROM information_schema.columns "
+                                       f"WHERE table_name = '{self.table_name}'", engine).values.tolist())
+        self.assertEqual(types['Date received'], 'date')
+        self.assertEqual(types['Price'], 'numeric')
+        stored = pd.read_sql_query(get_stored_table_query(self.table_name, engine), engine)
+        pd.testing.assert_frame_equal(stored.drop(columns="index"), self.df)
+
+    def test_detectors_in_database_see_the_uploaded_text(self):
+        bulk_load(engine, self.table_name, self.df, schema=infer_schema(self.df))
+        bulk_load(engine, self.table_name + "_plain", self.df)
+        self.assertEqual(run_sql_detectors(engine, self.table_name),
+                         run_sql_detectors(engine, self.table_name + "_plain"))
+        typed = pd.read_sql_query(f'SELECT * FROM "errors{self.table_name}"', engine)
+        plain = pd.read_sql_query(f'SELECT * FROM "errors{self.table_name}_plain"', engine)
+        pd.testing.assert_frame_equal(typed, plain)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import app.db_plot_routes as db_plot_routes
+import app.plot_routes as plot_routes
+import app.routes as routes
+from app import data_state_manager, engine
+from data_management.bulk_load import bulk_load
+
+
+class TestStateEtags(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.table_name = "test_state_etags"
+        self.df = pd.DataFrame({'ID': [1, 2, 3], 'Salary': [50000.0, 52000.0, 1e6]})
+        self.client = routes.app.test_client()
+        data_state_manager.start_session(self.df, pd.DataFrame(columns=["row_id", "column_id", "error_type"]), None)
+
+    def tearDown(self):
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.table_name}"')
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "errors{self.table_name}"')
+
+    def test_unchanged_state_answers_not_modified(self):
+        url = "/api/plots/1-d-histogram-data?column=Salary&bins=4&min_id=0&max_id=10"
+        with mock.patch.object(plot_routes, "generate_1d_histogram_data", return_value=[{"count": 3}]) as generate:
+            first = self.client.get(url)
+            etag = first.headers["ETag"]
+            self.assertEqual(first.status_code, 200)
+            self.assertTrue(first.cache_control.no_cache)
+
+            again = self.client.get(url, headers={"If-None-Match": etag})
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again.headers["ETag"], etag)
+            self.assertEqual(generate.call_count, 1)
+
+            # the same parameters in another order are the same request
+            reordered = "/api/plots/1-d-histogram-data?max_id=10&min_id=0&bins=4&column=Salary"
+            self.assertEqual(self.client.get(reordered, headers={"If-None-Match": etag}).status_code, 304)
+            self.assertNotEqual(self.client.get(url.replace("bins=4", "bins=5")).headers["ETag"], etag)
+
+            data_state_manager.set_current_state({"df": self.df.head(2), "error_df": None})
+            changed = self.client.get(url, headers={"If-None-Match": etag})
+            self.assertEqual(changed.status_code, 200)
+            self.assertNotEqual(changed.headers["ETag"], etag)
+            self.assertEqual(generate.call_count, 3)
+
+    def test_cached_responses_are_tagged(self):
+        url = "/api/plots/1-d-histogram-data?column=Salary&bins=4"
+        with mock.patch.object(plot_routes, "generate_1d_histogram_data", return_value=[{"count": 3}]) as generate:
+            etag = self.client.get(url).headers["ETag"]
+            cached = self.client.get(url)
+            self.assertEqual(cached.headers["ETag"], etag)
+            self.assertEqual(cached.get_json()["binned_data"], [{"count": 3}])
+            self.assertEqual(generate.call_count, 1)
+
+    def test_failures_are_not_tagged(self):
+        url = "/api/plots/scatterplot?x_column=ID&y_column=Nope"
+        with mock.patch.object(plot_routes, "generate_scatterplot_sample_data", side_effect=KeyError("Nope")) as generate:
+            response = self.client.get(url)
+            self.assertFalse(response.get_json()["Success"])
+            self.assertNotIn("ETag", response.headers)
+            self.assertEqual(self.client.get(url, headers={"If-None-Match": "*"}).status_code, 200)
+            self.assertEqual(generate.call_count, 2)
+
+    def test_stored_table_tag_follows_uploads(self):
+        url = f"/api/plots/1-d-histogram-data-db?tablename={self.table_name}.csv&column=Salary"
+        histogram = pd.DataFrame({"generate_one_d_histogram_with_errors": [{"bins": []}]})
+        with mock.patch.object(db_plot_routes.pd, "read_sql_query", return_value=histogram) as read_sql_query:
+            bulk_load(engine, self.table_name, self.df)
+            bulk_load(engine, "errors" + self.table_name, pd.DataFrame({"row_id": [1], "column_id": ["Salary"],
+                                                                        "error_type": ["anomaly"]}))
+            etag = self.client.get(url).headers["ETag"]
+            self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 304)
+            self.assertEqual(read_sql_query.call_count, 1)
+
+            bulk_load(engine, self.table_name, self.df.head(2))
+            self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
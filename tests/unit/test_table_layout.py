@@ -0,0 +1,102 @@
+import unittest
+
+import pandas as pd
+
+import data_management.table_layout as table_layout_module
+from app import engine
+from app.service_helpers import run_detectors
+from data_management.bulk_load import bulk_load
+from data_management.table_layout import index_name, organize_table
+
+
+class TestTableLayout(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.table_name = "test_table_layout"
+        self.df = pd.DataFrame({
+            'ID': [1, 2, 3, 4, 5, 6],
+            'Country': ['USA', None, 'USA', 'Canada', 'null', 'USA'],
+            'Salary': [50000.0, 52000.0, 51000.0, 1e6, 49000.0, 50500.0],
+        })
+
+    def tearDown(self):
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "{self.table_name}"')
+            connection.exec_driver_sql(f'DROP TABLE IF EXISTS "errors{self.table_name}"')
+
+    def load(self, df):
+        bulk_load(engine, self.table_name, df)
+        bulk_load(engine, "errors" + self.table_name, run_detectors(df).to_dataframe())
+
+    def index_definitions(self, name):
+        query = f"SELECT indexdef FROM pg_indexes WHERE tablename = '{name}'"
+        return pd.read_sql_query(query, engine)["indexdef"].tolist()
+
+    def test_primary_key_and_error_index(self):
+        self.load(self.df)
+        layout = organize_table(engine, self.table_name, len(self.df))
+        self.assertEqual(layout["id_index"], "primary key")
+        self.assertFalse(layout["clustered"])
+        self.assertEqual(set(layout["seconds"]),
+                         {"id_index", "window_index", "error_index", "error_row_index", "analyze"})
+        self.assertEqual(layout["window_columns"], ["Country", "Salary"])
+        self.assertTrue(any("PRIMARY KEY" in d or "_pkey" in d for d in self.index_definitions(self.table_name)))
+        self.assertTrue(any("(column_id, row_id)" in d for d in self.index_definitions("errors" + self.table_name)))
+
+    def test_window_indexes_are_capped_and_skipped_when_they_cannot_be_built(self):
+        self.load(self.df)
+        original_columns, original_characters = table_layout_module.max_window_index_columns, \
+            table_layout_module.prefix_characters
+        # a prefix this long no longer fits a btree entry
+        table_layout_module.max_window_index_columns = 1
+        table_layout_module.prefix_characters = 100000
+        try:
+            with engine.begin() as connection:
+                connection.exec_driver_sql(f"UPDATE \"{self.table_name}\" SET \"Country\" = md5(random()::text) || "
+                                           "(SELECT string_agg(md5(random()::text), '') FROM generate_series(1, 300))")
+            layout = organize_table(engine, self.table_name, len(self.df))
+        finally:
+            table_layout_module.max_window_index_columns = original_columns
+            table_layout_module.prefix_characters = original_characters
+        self.assertEqual(layout["id_index"], "primary key")
+        self.assertEqual(layout["window_columns"], [])
+        self.assertFalse(any("_window_" in d for d in self.index_definitions(self.table_name)))
+
+    def test_long_table_name_gets_distinct_index_names(self):
+        # postgres cut the names made by appending to a name this long to the same 63 bytes
+        self.table_name = "test_table_layout_" + "x" * 37
+        self.load(self.df)
+        layout = organize_table(engine, self.table_name, len(self.df), cluster=True)
+        self.assertEqual(layout["id_index"], "primary key")
+        self.assertTrue(layout["clustered"])
+        self.assertEqual(len(self.index_definitions("errors" + self.table_name)), 2)
+        self.assertTrue(all(len(index_name(self.table_name, kind).encode()) <= 63 for kind in ["pkey", "errors_row"]))
+
+    def test_large_or_duplicated_ids_get_brin(self):
+        self.load(self.df)
+        original_rows = table_layout_module.brin_index_rows
+        table_layout_module.brin_index_rows = 3
+        try:
+            layout = organize_table(engine, self.table_name, len(self.df))
+        finally:
+            table_layout_module.brin_index_rows = original_rows
+        self.assertEqual(layout["id_index"], "brin")
+
+        self.load(self.df.assign(ID=[1, 1, 2, 3, 4, 5]))
+        layout = organize_table(engine, self.table_name, len(self.df))
+        self.assertEqual(layout["id_index"], "brin")
+        self.assertTrue(any("USING brin" in d for d in self.index_definitions(self.table_name)))
+
+    def test_cluster_keeps_the_row_order(self):
+        self.load(self.df)
+        self.assertTrue(organize_table(engine, self.table_name, len(self.df), cluster=True)["clustered"])
+
+        self.load(self.df.assign(ID=[6, 5, 4, 3, 2, 1]))
+        self.assertFalse(organize_table(engine, self.table_name, len(self.df), cluster=True)["clustered"])
+        stored = pd.read_sql_query(f'SELECT * FROM "{self.table_name}"', engine)
+        self.assertEqual(stored["ID"].tolist(), [6, 5, 4, 3, 2, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.service_helpers import get_column_profile, profile_without_columns
+from detectors.type_profile import ColumnProfile, classify_values
+
+
+class TestColumnProfile(unittest.TestCase):
+
+    def test_classify_values(self):
+        types = classify_values(pd.Index(['abc', '12', ' 3.5 ', '1.', 4, 2.5, True], dtype=object))
+        self.assertEqual(types.tolist(), ['str', 'numeric', 'numeric', 'str', 'int', 'float', 'bool'])
+
+    def test_profile(self):
+        column = pd.Series(['USA', 'USA', '42', None, 'Peru', 7], dtype=object)
+        profile = ColumnProfile.from_series(column)
+        self.assertEqual(profile.majority_type, 'str')
+        self.assertEqual(profile.type_counts, {'str': 3, 'numeric': 1, 'int': 1})
+        self.assertEqual(profile.cardinality, 4)
+        self.assertEqual(profile.null_count, 1)
+        np.testing.assert_array_equal(profile.numeric_mask, [False, False, True, False, False, True])
+        self.assertEqual(sorted(profile.mismatched_values().tolist(), key=str), ['42', 7])
+        self.assertTrue(profile.is_categorical())
+
+    def test_numeric_column(self):
+        profile = ColumnProfile.from_series(pd.Series([1.5, 2.5, np.nan]))
+        self.assertEqual(profile.majority_type, 'float')
+        self.assertEqual(profile.null_count, 1)
+        self.assertFalse(profile.is_categorical())
+
+    def test_empty_column_is_categorical(self):
+        profile = ColumnProfile.from_series(pd.Series([None, None], dtype=object))
+        self.assertEqual(profile.cardinality, 0)
+        self.assertTrue(profile.is_categorical())
+
+
+class TestDataStateProfile(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.state = {"df": pd.DataFrame({'ID': [1, 2, 3], 'Country': ['USA', 'Peru', 'USA'], 'Age': [20, 30, 40]})}
+
+    def test_profile_is_computed_once(self):
+        profile = get_column_profile(self.state, 'Country')
+        self.assertIs(get_column_profile(self.state, 'Country'), profile)
+        self.assertEqual(list(self.state["profile"]), ['Country'])
+
+    def test_only_wrangled_columns_are_dropped(self):
+        country_profile = get_column_profile(self.state, 'Country')
+        get_column_profile(self.state, 'Age')
+        kept_profile = profile_without_columns(self.state, ['Age'])
+        self.assertEqual(list(kept_profile), ['Country'])
+        self.assertIs(kept_profile['Country'], country_profile)
+
+
+if __name__ == '__main__':
+    unittest.main()
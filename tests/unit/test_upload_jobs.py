@@ -0,0 +1,46 @@
+import threading
+import unittest
+
+from data_management.upload_jobs import UploadJob, UploadJobs
+
+
+class TestUploadJobs(unittest.TestCase):
+
+    def test_phases_and_total_rows(self):
+        job = UploadJob("sales.csv")
+        self.assertEqual(job.status()["phase"], "queued")
+        job.update("parse", 50)
+        job.update("parse", 100)
+        self.assertIsNone(job.status()["total_rows"])
+        self.assertIsNone(job.eta_seconds())
+        job.update("detect", 50)
+        status = job.status()
+        self.assertEqual((status["phase"], status["rows_processed"], status["total_rows"]), ("detect", 50, 100))
+        self.assertGreaterEqual(status["eta_seconds"], 0)
+        self.assertFalse(status["table_ready"])
+        job.update("index", 100)
+        self.assertTrue(job.status()["table_ready"])
+
+    def test_job_result_and_failure(self):
+        jobs = UploadJobs(max_workers=1)
+        release = threading.Event()
+
+        def work(job):
+            job.update("parse", 10)
+            release.wait(5)
+            return {"rows": 10}
+
+        job = jobs.submit("sales.csv", work)
+        self.assertIs(jobs.get(job.job_id), job)
+        release.set()
+        failed = jobs.submit("broken.csv", lambda job: 1 / 0)
+        jobs.executor.shutdown(wait=True)
+        self.assertEqual(job.status()["phase"], "done")
+        self.assertEqual(job.status()["result"], {"rows": 10})
+        self.assertEqual(failed.status()["phase"], "failed")
+        self.assertIn("division", failed.status()["error"])
+        self.assertIsNone(jobs.get("unknown"))
+
+
+if __name__ == '__main__':
+    unittest.main()